@@ -0,0 +1,70 @@
+"""
+Compares dashboard queries answered from the analytics rollups with full scans of the fact table.
+
+The store is filled with synthetic daily snapshots of the catalogue, then the
+average price and rating by day x Gender x Size is computed both from
+`daily_rollup` (`AnalyticsStore.query`) and by aggregating every product row.
+
+Usage:
+    python -m benchmarks.bench_analytics --days 30 365 --products 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.analytics import AnalyticsStore
+
+SIZES = ("S", "M", "L", "XL", "XXL")
+GENDERS = ("Men", "Women", "Unisex")
+FULL_SCAN = ("SELECT day, gender, size, COUNT(*), AVG(price), MIN(price), MAX(price), AVG(rating), MIN(rating), "
+             "MAX(rating) FROM products GROUP BY day, gender, size ORDER BY day, gender, size")
+
+
+def snapshot(day, products):
+    timestamp = datetime(2025, 1, 1) + timedelta(days=day)
+    return pd.DataFrame({
+        "Title": [f"Product {i}" for i in range(products)],
+        "Price (IDR)": [16000.0 * ((i + day) % 500 + 1) for i in range(products)],
+        "Rating": [1 + ((i + day) % 40) / 10 for i in range(products)],
+        "Colors": [i % 8 + 1 for i in range(products)],
+        "Size": [SIZES[i % len(SIZES)] for i in range(products)],
+        "Gender": [GENDERS[i % len(GENDERS)] for i in range(products)],
+        "Timestamp": [timestamp] * products,
+    })
+
+
+def best_of(function, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365])
+    parser.add_argument("--products", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'days':>5} {'rows':>9} {'append/day s':>13} {'rollup ms':>10} {'scan ms':>9}")
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as directory, \
+                AnalyticsStore(os.path.join(directory, "analytics.sqlite")) as store:
+            start = time.perf_counter()
+            for day in range(days):
+                store.append(snapshot(day, args.products))
+            append = (time.perf_counter() - start) / days
+
+            rollup = best_of(lambda: store.query(by=("day", "gender", "size")))
+            scan = best_of(lambda: store.connection.execute(FULL_SCAN).fetchall())
+            print(f"{days:>5} {len(store):>9} {append:>13.3f} {rollup * 1000:>10.1f} {scan * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
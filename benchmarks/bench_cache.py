@@ -0,0 +1,40 @@
+"""
+Compares a cold and a warm scrape through the conditional-GET response cache.
+
+Usage:
+    python -m benchmarks.bench_cache --pages 50
+"""
+import argparse
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks.fixtures import serve_catalogue
+from utils.extract import scrape
+from utils.fetch import FetchClient
+from utils.http_cache import ResponseCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated server latency in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir, serve_catalogue(args.pages, latency=args.latency) as server:
+        print(f"{'run':>5} {'seconds':>9} {'bytes sent':>11} {'cache hits':>11} {'products':>9}")
+        for run in ("cold", "warm"):
+            client = FetchClient(cache=ResponseCache(cache_dir))
+            sent_before = server.bytes_sent
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                products = scrape(server.base_url, max_pages=args.pages + 1, delay=0, client=client)
+            elapsed = time.perf_counter() - start
+            print(f"{run:>5} {elapsed:>9.3f} {server.bytes_sent - sent_before:>11} "
+                  f"{client.cache.hits:>11} {len(products):>9}")
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures cold-start import time of the CLI entry point with `python -X importtime`.
+
+Every scenario runs in a fresh interpreter. "eager" imports every module the
+entry point imported at startup before the sinks were loaded lazily; the other
+scenarios import what `main.py` needs today for a given kind of run.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+PIPELINE = "import pandas, utils.checkpoint, utils.incremental, utils.load, utils.transform"
+SCENARIOS = {
+    "eager": "import pandas, utils.checkpoint, utils.fetch, utils.history, utils.http_cache, utils.extract, "
+             "utils.incremental, utils.metrics, utils.postgres, utils.sheets, utils.load, utils.parquet, "
+             "utils.scheduler, utils.transform",
+    "main --help": "import main",
+    "csv only": f"import main; {PIPELINE}; main.build_sinks(('csv',))",
+    "all sinks": f"import main; {PIPELINE}; main.build_sinks(main.SINK_NAMES); "
+                 "import utils.postgres, utils.sheets, utils.parquet",
+}
+
+
+def import_time(code):
+    """
+    Runs `code` in a fresh interpreter and returns the total import time and wall time.
+
+    Returns:
+        tuple: `(import_seconds, wall_seconds, slowest)` where `slowest` lists the top-level
+            imports with their cumulative seconds, slowest first.
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            check=True)
+    wall = time.perf_counter() - start
+
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented below the module that triggered them
+        if not name[1:].startswith(" "):
+            top_level.append((name.strip(), int(cumulative) / 1e6))
+
+    return sum(seconds for _, seconds in top_level), wall, sorted(top_level, key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per scenario; medians are reported")
+    parser.add_argument("--top", type=int, default=3, help="slowest top-level imports shown per scenario")
+    args = parser.parse_args()
+
+    print(f"{'scenario':>12} {'imports s':>10} {'wall s':>8}  slowest top-level imports")
+    for scenario, code in SCENARIOS.items():
+        runs = [import_time(code) for _ in range(args.repeat)]
+        imports = statistics.median(run[0] for run in runs)
+        wall = statistics.median(run[1] for run in runs)
+        slowest = ", ".join(f"{name} {seconds:.2f}" for name, seconds in runs[-1][2][:args.top])
+        print(f"{scenario:>12} {imports:>10.3f} {wall:>8.3f}  {slowest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Measures how clean_data_parallel scales with the number of worker processes.
+
+Usage:
+    python -m benchmarks.bench_parallel_transform --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks.bench_transform import synthetic_raw_frame
+from utils.transform import clean_data_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--start-method", default=None, help="fork, spawn or forkserver")
+    args = parser.parse_args()
+
+    records = synthetic_raw_frame(args.rows).to_dict("records")
+    print(f"rows: {args.rows}, CPUs available: {os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'rows out':>9}")
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            cleaned = clean_data_parallel(records, workers=workers, chunk_size=args.chunk_size,
+                                          start_method=args.start_method)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.2f}x {len(cleaned):>9}")
+
+
+if __name__ == "__main__":
+    main()
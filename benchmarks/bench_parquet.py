@@ -0,0 +1,82 @@
+"""
+Compares file size and read-back time of the CSV and Parquet sinks.
+
+Usage:
+    python -m benchmarks.bench_parquet --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_transform import GENDERS, SIZES
+from utils.load import save_to_csv
+from utils.parquet import read_parquet, save_to_parquet
+from utils.transform import EXCHANGE_RATE_USD_TO_IDR, convert_dtypes
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def synthetic_clean_frame(rows, days=30, seed=0):
+    """
+    Builds cleaned, type-converted products spread over `days` scrape dates.
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows)
+    return pd.DataFrame({
+        "Title": np.char.add("T-shirt ", index.astype(str)).astype(object),
+        "Price (IDR)": np.round(rng.uniform(10, 500, rows) * 100) / 100 * EXCHANGE_RATE_USD_TO_IDR,
+        "Rating": np.round(rng.uniform(1, 5, rows), 1),
+        "Colors": rng.integers(1, 9, rows),
+        "Size": SIZES[index % len(SIZES)],
+        "Gender": GENDERS[index % len(GENDERS)],
+        "Timestamp": pd.Timestamp("2025-01-01T08:00:00") + pd.to_timedelta(index % days, unit="D")
+                     + pd.to_timedelta(rng.integers(0, 36_000_000, rows), unit="ms"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="cleaned rows written")
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+
+    df = synthetic_clean_frame(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "products.csv")
+        parquet_dir = os.path.join(tmp, "products_parquet")
+
+        with redirect_stdout(StringIO()):
+            start = time.perf_counter()
+            save_to_csv(df, csv_path)
+            csv_write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            save_to_parquet(df, parquet_dir, compression=args.compression)
+            parquet_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        convert_dtypes(pd.read_csv(csv_path))
+        csv_read = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_parquet(parquet_dir)
+        parquet_read = time.perf_counter() - start
+
+        print(f"rows: {len(df)}")
+        print(f"{'format':>8} {'size MiB':>9} {'write s':>8} {'read s':>8}")
+        print(f"{'csv':>8} {os.path.getsize(csv_path) / 2 ** 20:>9.1f} {csv_write:>8.2f} {csv_read:>8.2f}")
+        print(f"{'parquet':>8} {directory_size(parquet_dir) / 2 ** 20:>9.1f} {parquet_write:>8.2f} "
+              f"{parquet_read:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Compares the CPU time per page of the HTML parser backends.
+
+Usage:
+    python -m benchmarks.bench_parse --pages 50 --cards 20
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import catalogue_page
+from utils.extract import PARSER_BACKENDS, lxml_html, parse_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=20, help="product cards per page")
+    args = parser.parse_args()
+
+    pages = [catalogue_page(page, args.cards) for page in range(1, args.pages + 1)]
+    backends = [backend for backend in PARSER_BACKENDS if backend != "lxml" or lxml_html is not None]
+
+    print(f"{'backend':>12} {'ms/page':>9} {'speedup':>8} {'products':>9}")
+    baseline = None
+    for backend in backends:
+        start = time.process_time()
+        products = sum(len(parse_page(page, backend=backend)) for page in pages)
+        per_page = (time.process_time() - start) / len(pages) * 1000
+        baseline = baseline or per_page
+        print(f"{backend:>12} {per_page:>9.2f} {baseline / per_page:>7.1f}x {products:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Times every pipeline stage at several catalogue sizes and writes the results to JSON.
+
+Each size is served by the local catalogue server, with every n-th card an
+invalid placeholder. The stages timed are scrape, clean, convert and every sink
+that can run here:
+- CSV, history append and Parquet always run, Parquet only when pyarrow is installed.
+- PostgreSQL runs only with BENCH_DATABASE_URL set.
+- Google Sheets runs only with BENCH_SHEETS_ENDPOINT (a fake API endpoint) and
+  BENCH_SPREADSHEET_ID set.
+
+Results are keyed by commit, so two result files can be compared to spot regressions.
+
+Usage:
+    python -m benchmarks.bench_pipeline --pages 10 50 200 --output .cache/benchmarks/head.json
+    python -m benchmarks.bench_pipeline --compare .cache/benchmarks/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+
+import pandas as pd
+
+from benchmarks.fixtures import serve_catalogue
+from utils.extract import scrape
+from utils.fetch import FetchClient
+from utils.history import append_csv_atomic
+from utils.load import save_to_csv
+from utils.parquet import pa as pyarrow, save_to_parquet
+from utils.transform import clean_data, convert_dtypes
+
+DEFAULT_OUTPUT = os.path.join(".cache", "benchmarks", "latest.json")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def available_sinks(tmp):
+    sinks = {
+        "csv": lambda df: save_to_csv(df, os.path.join(tmp, "products.csv")),
+        "csv_history": lambda df: append_csv_atomic(df, os.path.join(tmp, "history.csv")),
+    }
+    skipped = {}
+
+    if pyarrow is not None:
+        sinks["parquet"] = lambda df: save_to_parquet(df, root_dir=os.path.join(tmp, "parquet"))
+    else:
+        skipped["parquet"] = "pyarrow is not installed"
+
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if database_url:
+        from utils.postgres import get_engine, timed_upsert
+        engine = get_engine(database_url)
+        sinks["postgresql"] = lambda df: timed_upsert(df, "bench_pipeline_products", engine=engine)
+    else:
+        skipped["postgresql"] = "BENCH_DATABASE_URL is not set"
+
+    endpoint, spreadsheet_id = os.getenv("BENCH_SHEETS_ENDPOINT"), os.getenv("BENCH_SPREADSHEET_ID")
+    if endpoint and spreadsheet_id:
+        from utils.sheets import get_service, write_frame
+        service = get_service(endpoint)
+        sinks["google_sheets"] = lambda df: write_frame(df, spreadsheet_id, "Sheet1!A1", service=service,
+                                                        snapshot_dir=os.path.join(tmp, "sheets"))
+    else:
+        skipped["google_sheets"] = "BENCH_SHEETS_ENDPOINT and BENCH_SPREADSHEET_ID are not set"
+
+    return sinks, skipped
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_once(base_url, pages, workers, tmp):
+    timings = {}
+    client = FetchClient()
+    try:
+        raw_data, timings["scrape"] = timed(scrape, base_url, pages + 1, 0, workers, None, client)
+    finally:
+        client.close()
+
+    cleaned, timings["clean"] = timed(clean_data, raw_data)
+    df, timings["convert"] = timed(lambda: convert_dtypes(pd.DataFrame(cleaned)))
+
+    sinks, skipped = available_sinks(tmp)
+    for name, sink in sinks.items():
+        _, timings[f"sink:{name}"] = timed(sink, df.copy())
+
+    counts = {"rows_raw": len(raw_data), "rows_clean": len(df)}
+    return timings, counts, skipped
+
+
+def summarise(runs):
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "max": max(runs),
+        "runs": runs,
+    }
+
+
+def run_size(pages, args):
+    stage_runs, counts, skipped = {}, {}, {}
+    with serve_catalogue(pages, cards_per_page=args.cards_per_page, invalid_every=args.invalid_every) as server:
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                timings, counts, skipped = run_once(server.base_url, pages, args.workers, tmp)
+            for stage, seconds in timings.items():
+                stage_runs.setdefault(stage, []).append(seconds)
+
+    return {
+        "pages": pages,
+        **counts,
+        "stages": {stage: summarise(runs) for stage, runs in stage_runs.items()},
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(result["pages"], stage): timing["median"]
+                for result in baseline["results"] for stage, timing in result["stages"].items()}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    print(f"{'pages':>6} {'stage':>20} {'before s':>9} {'after s':>9} {'change':>8}")
+    for result in current["results"]:
+        for stage, timing in result["stages"].items():
+            before = previous.get((result["pages"], stage))
+            if before:
+                change = (timing["median"] - before) / before
+                print(f"{result['pages']:>6} {stage:>20} {before:>9.4f} {timing['median']:>9.4f} {change:>+8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--cards-per-page", type=int, default=20)
+    parser.add_argument("--invalid-every", type=int, default=10, help="every n-th card is an invalid placeholder")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent page requests while scraping")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the median is reported")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--compare", help="a previous results file to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"cards_per_page": args.cards_per_page, "invalid_every": args.invalid_every,
+                     "workers": args.workers, "repeat": args.repeat},
+        "results": [],
+    }
+
+    print(f"{'pages':>6} {'rows':>7} {'stage':>20} {'median s':>9} {'rows/s':>10}")
+    for pages in args.pages:
+        result = run_size(pages, args)
+        report["results"].append(result)
+        for stage, timing in result["stages"].items():
+            rows = result["rows_raw"] if stage in ("scrape", "clean") else result["rows_clean"]
+            print(f"{pages:>6} {rows:>7} {stage:>20} {timing['median']:>9.4f} {rows / timing['median']:>10.0f}")
+        for sink, reason in result["skipped"].items():
+            print(f"{pages:>6} {'':>7} {'sink:' + sink:>20} skipped: {reason}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}.")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
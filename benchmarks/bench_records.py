@@ -0,0 +1,86 @@
+"""
+Compares the memory held by cleaned products as dicts, typed records and a columnar batch.
+
+Each representation is built from the same synthetic stream of cleaned
+products; the memory it retains is measured with tracemalloc, together with
+the time taken to turn it into a DataFrame.
+
+Usage:
+    python -m benchmarks.bench_records --rows 10000 100000 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.records import CleanProduct, ProductBatch
+from utils.transform import convert_dtypes
+
+SIZES = ("S", "M", "L", "XL", "XXL")
+GENDERS = ("Men", "Women", "Unisex")
+
+
+def synthetic_products(rows):
+    start = datetime(2025, 1, 1)
+    for i in range(rows):
+        yield {
+            "Title": f"Product {i}",
+            "Price (IDR)": float(16000 * (i % 500 + 1)),
+            "Rating": round(1 + (i % 40) / 10, 1),
+            "Colors": i % 8 + 1,
+            "Size": SIZES[i % len(SIZES)],
+            "Gender": GENDERS[i % len(GENDERS)],
+            "Timestamp": (start + timedelta(microseconds=137 * i)).isoformat(),
+        }
+
+
+def build_dicts(rows):
+    return list(synthetic_products(rows))
+
+
+def build_records(rows):
+    return [CleanProduct.from_dict(item) for item in synthetic_products(rows)]
+
+
+def build_batch(rows):
+    return ProductBatch.from_records(synthetic_products(rows))
+
+
+def to_frame(container):
+    if isinstance(container, ProductBatch):
+        return container.to_frame()
+    if container and isinstance(container[0], CleanProduct):
+        return convert_dtypes(pd.DataFrame([record.to_dict() for record in container]))
+    return convert_dtypes(pd.DataFrame(container))
+
+
+def measure(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    container = build(rows)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    to_frame(container)
+    return held, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    modes = [("dicts", build_dicts), ("records", build_records), ("batch", build_batch)]
+    print(f"{'rows':>9} {'mode':>8} {'held MiB':>9} {'B/row':>7} {'to_frame s':>11}")
+    for rows in args.rows:
+        for mode, build in modes:
+            held, elapsed = measure(build, rows)
+            print(f"{rows:>9} {mode:>8} {held / 2 ** 20:>9.1f} {held / rows:>7.0f} {elapsed:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
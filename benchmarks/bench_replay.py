@@ -0,0 +1,62 @@
+"""
+Measures how fast archived pages are decompressed, and replayed through parse and clean.
+
+A temporary archive is filled with a simulated history of hourly scrapes of a
+synthetic catalogue, in which every page changes once a day. It is then
+streamed back with `iter_archive` (decompression only) and `replay_archive`
+(decompression, parsing and cleaning) with several thread counts.
+
+Usage:
+    python -m benchmarks.bench_replay --pages 50 --days 7 --workers 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+
+from benchmarks.fixtures import catalogue_page
+from utils.archive import PageArchive, iter_archive, replay_archive
+
+
+def fill_archive(archive, pages, days):
+    start = datetime(2025, 1, 1)
+    for hour in range(days * 24):
+        day = hour // 24
+        for page in range(1, pages + 1):
+            # Shifting the card indices by the day changes every page once a day
+            body = catalogue_page(page + day * pages, cards_per_page=20)
+            archive.append(f"https://example.com/page{page}", body, fetched_at=start + timedelta(hours=hour))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, PageArchive(directory) as archive:
+        start = time.perf_counter()
+        fill_archive(archive, args.pages, args.days)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"Archived {len(archive)} fetches in {time.perf_counter() - start:.2f}s "
+              f"({size / 2 ** 20:.1f} MiB on disk)")
+
+        print(f"{'workers':>7} {'decompress s':>13} {'pages/s':>9} {'replay s':>9} {'rows/s':>9}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            pages = sum(1 for _ in iter_archive(archive, workers=workers))
+            decompress = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                rows = sum(1 for _ in replay_archive(archive, workers=workers))
+            replay = time.perf_counter() - start
+            print(f"{workers:>7} {decompress:>13.2f} {pages / decompress:>9.0f} {replay:>9.2f} {rows / replay:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Measures scrape throughput against a local stub server as concurrency grows.
+
+Usage:
+    python -m benchmarks.bench_scrape --pages 50 --latency 0.05
+"""
+import argparse
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks.fixtures import serve_catalogue
+from utils.extract import scrape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency in seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with serve_catalogue(args.pages, latency=args.latency) as server:
+        print(f"{'workers':>8} {'seconds':>9} {'pages/sec':>10} {'products':>9}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                products = scrape(server.base_url, max_pages=args.pages + 1, delay=0, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8} {elapsed:>9.3f} {args.pages / elapsed:>10.1f} {len(products):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares peak memory of the streaming pipeline with the list-based pipeline.
+
+Both paths scrape an in-memory synthetic catalogue, clean it and write a CSV;
+peak memory is measured with tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_stream_memory --pages 50 500 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pandas as pd
+
+from benchmarks.fixtures import SyntheticClient
+from utils.extract import iter_scrape, scrape
+from utils.load import save_to_csv, stream_to_csv
+from utils.transform import clean_data, convert_dtypes, iter_clean_data, iter_frames
+
+
+def run_list(pages, filename, *_):
+    raw_data = scrape("http://bench/", max_pages=pages + 1, delay=0, client=SyntheticClient(pages))
+    save_to_csv(convert_dtypes(pd.DataFrame(clean_data(raw_data))), filename)
+
+
+def run_stream(pages, filename, chunk_size, max_seen):
+    products = iter_scrape("http://bench/", max_pages=pages + 1, delay=0, client=SyntheticClient(pages))
+    frames = iter_frames(iter_clean_data(products, max_seen=max_seen), chunk_size=chunk_size)
+    for _ in stream_to_csv(frames, filename):
+        pass
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--chunk-size", type=int, default=2_000, help="rows per chunk in the streaming path")
+    parser.add_argument("--max-seen", type=int, default=20_000, help="dedup keys remembered by the streaming path")
+    parser.add_argument("--skip-list", action="store_true", help="only measure the streaming path")
+    args = parser.parse_args()
+
+    print(f"{'pages':>7} {'mode':>7} {'peak MiB':>9} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            modes = [("stream", run_stream)] + ([] if args.skip_list else [("list", run_list)])
+            for mode, func in modes:
+                # The streaming sink appends, so every measurement gets its own file
+                filename = os.path.join(tmp, f"{mode}-{pages}.csv")
+                peak, elapsed = measure(func, pages, filename, args.chunk_size, args.max_seen)
+                print(f"{pages:>7} {mode:>7} {peak / 2 ** 20:>9.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the row-loop transform (clean_data + convert_dtypes) with the vectorized clean_frame.
+
+Usage:
+    python -m benchmarks.bench_transform --rows 1000000
+"""
+import argparse
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from utils.transform import clean_data, clean_frame, convert_dtypes
+
+SIZES = np.array(["S", "M", "L", "XL", "XXL"], dtype=object)
+GENDERS = np.array(["Men", "Women", "Unisex"], dtype=object)
+
+
+def synthetic_raw_frame(rows, seed=0):
+    """
+    Builds raw product rows in the exact string format `extract_fashion_data` produces,
+    including the invalid rows the transform has to drop.
+    """
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, rows // 2 + 1, size=rows)  # roughly half the rows are duplicates
+    prices = np.char.mod("$%.2f", 10 + (index * 7.31) % 490).astype(object)
+    ratings = np.char.mod("Rating: ⭐ %.1f / 5", 1 + (index * 0.37) % 4).astype(object)
+
+    invalid = rng.random(rows)
+    titles = np.char.add("T-shirt ", index.astype(str)).astype(object)
+    titles[invalid < 0.02] = "Unknown Product"
+    prices[(invalid >= 0.02) & (invalid < 0.04)] = "Price Unavailable"
+    ratings[(invalid >= 0.04) & (invalid < 0.06)] = "Rating: ⭐ Invalid Rating / 5"
+
+    return pd.DataFrame({
+        "Title": titles,
+        "Price": prices,
+        "Rating": ratings,
+        "Colors": np.char.add((1 + index % 8).astype(str), " Colors").astype(object),
+        "Size": np.char.add("Size: ", SIZES[index % len(SIZES)].astype(str)).astype(object),
+        "Gender": np.char.add("Gender: ", GENDERS[index % len(GENDERS)].astype(str)).astype(object),
+        "Timestamp": "2025-01-01T10:00:00.000000",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    raw_frame = synthetic_raw_frame(args.rows)
+    records = raw_frame.to_dict("records")
+
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        expected = convert_dtypes(pd.DataFrame(clean_data(records)))
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = clean_frame(raw_frame)
+    frame_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(actual, expected)
+    print(f"rows in: {args.rows}, rows out: {len(actual)}")
+    print(f"{'clean_data + convert_dtypes':>28}: {loop_seconds:8.2f}s")
+    print(f"{'clean_frame':>28}: {frame_seconds:8.2f}s ({loop_seconds / frame_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
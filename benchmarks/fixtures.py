@@ -0,0 +1,219 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.exceptions import HTTPError
+
+from utils.fetch import LatencyHistogram
+
+CARD_TEMPLATE = """
+<div class="collection-card">
+    <div style="position: relative;">
+        <img src="https://picsum.photos/280/350?random={index}" class="collection-image" alt="{title}">
+    </div>
+    <div class="product-details">
+        <h3 class="product-title">{title}</h3>
+        <div class="price-container"><span class="price">${price:.2f}</span></div>
+            <p style="font-size: 14px; color: #777;">Rating: ⭐ {rating:.1f} / 5</p>
+            <p style="font-size: 14px; color: #777;">{colors} Colors</p>
+            <p style="font-size: 14px; color: #777;">Size: {size}</p>
+            <p style="font-size: 14px; color: #777;">Gender: {gender}</p>
+        </div>
+</div>
+"""
+
+# The placeholder card the real site renders for products it has no data for
+INVALID_CARD_TEMPLATE = """
+<div class="collection-card">
+    <div style="position: relative;">
+        <img src="https://picsum.photos/280/350?random={index}" class="collection-image" alt="Unknown Product">
+    </div>
+    <div class="product-details">
+        <h3 class="product-title">Unknown Product</h3>
+        <div class="price-container"><p class="price">Price Unavailable</p></div>
+            <p style="font-size: 14px; color: #777;">Rating: ⭐ Invalid Rating / 5</p>
+            <p style="font-size: 14px; color: #777;">5 Colors</p>
+            <p style="font-size: 14px; color: #777;">Size: M</p>
+            <p style="font-size: 14px; color: #777;">Gender: Men</p>
+        </div>
+</div>
+"""
+
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+
+
+def pagination(page, links):
+    """
+    Renders a pagination bar linking the given page numbers, plus "Next" when there is a page after `page`.
+
+    Args:
+        page (int): The current page.
+        links (iterable): The page numbers to link.
+
+    Returns:
+        str: The `ul.pagination` HTML, or an empty string when there is nothing to link.
+    """
+    links = sorted(links)
+    if not links:
+        return ""
+    items = [f'<li class="page-item"><a class="page-link" href="{"/" if n == 1 else f"/page{n}"}">{n}</a></li>'
+             for n in links]
+    if links[-1] > page:
+        items.append(f'<li class="page-item next"><a class="page-link" href="/page{page + 1}">Next</a></li>')
+    return f'<ul class="pagination">{"".join(items)}</ul>'
+
+
+def catalogue_page(page, cards_per_page=20, invalid_every=0, links=()):
+    """
+    Renders one synthetic catalogue page in the `.collection-card` structure.
+
+    Args:
+        page (int): The 1-based page number.
+        cards_per_page (int): The number of product cards on the page.
+        invalid_every (int): Render every n-th card of the catalogue as an
+            "Unknown Product" / "Price Unavailable" placeholder. 0 renders none.
+        links (iterable): Page numbers linked from the page's pagination bar. Empty renders no bar.
+
+    Returns:
+        bytes: The HTML of the page.
+    """
+    cards = []
+    for offset in range(cards_per_page):
+        index = (page - 1) * cards_per_page + offset
+        if invalid_every and index % invalid_every == invalid_every - 1:
+            cards.append(INVALID_CARD_TEMPLATE.format(index=index))
+            continue
+        cards.append(CARD_TEMPLATE.format(
+            index=index,
+            title=f"T-shirt {index}",
+            price=10 + (index * 7.31) % 490,
+            rating=1 + (index * 0.37) % 4,
+            colors=1 + index % 8,
+            size=SIZES[index % len(SIZES)],
+            gender=GENDERS[index % len(GENDERS)],
+        ))
+    return f"<html><body>{''.join(cards)}{pagination(page, links)}</body></html>".encode("utf-8")
+
+
+def page_links(page, pages, window):
+    """
+    Returns the page numbers a pagination bar shows: up to `window` pages either side of `page`, within the catalogue.
+    """
+    return range(max(page - window, 1), min(page + window, pages) + 1) if window else ()
+
+
+class SyntheticClient:
+    """
+    A stand-in for `FetchClient` that renders catalogue pages in memory.
+
+    Pages are generated on demand, so arbitrarily large catalogues can be
+    scraped without a server and without holding every page at once. With a
+    `pagination_window`, each page links the pages within that distance of it;
+    every URL requested is recorded in `requested`.
+    """
+
+    def __init__(self, pages, cards_per_page=20, invalid_every=0, pagination_window=0):
+        self.pages = pages
+        self.cards_per_page = cards_per_page
+        self.invalid_every = invalid_every
+        self.pagination_window = pagination_window
+        self.requested = []
+        self.histogram = LatencyHistogram()
+        self.cache = None
+
+    def fetch(self, url):
+        path = url.rstrip("/").rsplit("/", 1)[-1]
+        page = int(path[4:]) if path.startswith("page") and path[4:].isdigit() else 1
+        self.requested.append(url)
+        if page > self.pages:
+            raise HTTPError(f"404 Client Error: Not Found for url: {url}")
+        return catalogue_page(page, self.cards_per_page, self.invalid_every,
+                              page_links(page, self.pages, self.pagination_window))
+
+
+class CatalogueServer:
+    """
+    Connection details and traffic counters of a running catalogue server.
+    """
+
+    def __init__(self):
+        self.base_url = None
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+@contextmanager
+def serve_catalogue(pages, cards_per_page=20, latency=0.0, invalid_every=0, pagination_window=0):
+    """
+    Serves a synthetic catalogue on a local HTTP server.
+
+    Page 1 is served at `/` and page n at `/page{n}`; any page beyond `pages`
+    returns 404, just like the real site. Pages carry an `ETag` and answer a
+    matching `If-None-Match` with `304 Not Modified`.
+
+    Args:
+        pages (int): The number of catalogue pages.
+        cards_per_page (int): The number of product cards per page.
+        latency (float): Seconds each response is delayed to simulate a remote host.
+        invalid_every (int): Render every n-th card as an invalid placeholder; see `catalogue_page`.
+        pagination_window (int): Link the pages within this distance of each page; 0 renders no pagination.
+
+    Yields:
+        CatalogueServer: The running server; `base_url` ends with a slash.
+    """
+    bodies = {page: catalogue_page(page, cards_per_page, invalid_every,
+                                   page_links(page, pages, pagination_window))
+              for page in range(1, pages + 1)}
+    etags = {page: f'"{hashlib.sha1(body).hexdigest()}"' for page, body in bodies.items()}
+    stats = CatalogueServer()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            path = self.path.strip("/")
+            page = 1 if not path else int(path[4:]) if path[4:].isdigit() else 0
+            if latency:
+                time.sleep(latency)
+
+            body = bodies.get(page)
+            with stats.lock:
+                stats.requests += 1
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if self.headers.get("If-None-Match") == etags[page]:
+                self.send_response(304)
+                self.send_header("ETag", etags[page])
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etags[page])
+            self.end_headers()
+            self.wfile.write(body)
+            with stats.lock:
+                stats.bytes_sent += len(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stats.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        yield stats
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,47 +1,424 @@
+import argparse
 import os
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+from importlib.util import find_spec
 
-import pandas as pd
 from dotenv import load_dotenv
 
-from utils.extract import scrape
-from utils.load import save_to_csv, save_to_google_sheets, load_to_postgresql
-from utils.transform import clean_data, convert_dtypes
+from utils.metrics import METRICS, dump_profiles, enable_profiling
+from utils.scheduler import LOCK_FILE, RunLock, run_forever, stop_on_signals
+
+# The pipeline modules (pandas, bs4, SQLAlchemy, googleapiclient, pyarrow) are imported inside the
+# functions that use them, so `--help`, bad arguments and runs with few sinks start quickly.
 
 load_dotenv()
 
 BASE_URL = "https://fashion-studio.dicoding.dev/"
+# Page limit when pages are walked in order (--stream, --no-discover); batch runs discover the page count
 MAX_PAGES = 50
+DELAY = 1
+# Pages in flight, so page N+1 is being fetched while page N is parsed and cleaned
+PIPELINE_DEPTH = 2
+HTTP_CACHE_DIR = ".cache/http"
+PAGE_STORE_DIR = ".cache/pages"
+INDEX_FILE = ".cache/products.sqlite"
+ANALYTICS_FILE = "fashion_products_analytics.sqlite"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", ".cache/archive")
+# --replay writes the CSV and Parquet sinks here instead of over the live history
+REPLAY_DIR = os.getenv("REPLAY_DIR", "replay")
 
+CSV_FILE = "fashion_products.csv"
+TABLE_NAME = "fashion_products"
+# --replay loads PostgreSQL into this table; the live table is kept in step with the product index
+REPLAY_TABLE_NAME = f"{TABLE_NAME}_replay"
 SPREADSHEET_ID = os.getenv("SPREADSHEET_ID")
 SHEET_RANGE = "Sheet1!A1"
+METRICS_FILE = os.getenv("METRICS_FILE")
+PIPELINE_INTERVAL = float(os.getenv("PIPELINE_INTERVAL", 3600))
+
+SINK_NAMES = ("csv", "google_sheets", "postgresql", "analytics", "parquet")
+STREAMING_SINKS = ("csv", "postgresql", "analytics")
+# Sinks that record the whole catalogue on every run, so they are loaded even when nothing changed
+SNAPSHOT_SINKS = ("analytics",)
+# Sinks that can load a replay day by day; Google Sheets mirrors the live catalogue only
+REPLAY_SINKS = ("csv", "postgresql", "analytics", "parquet")
+# Parquet is on by default only where pyarrow is installed; find_spec checks without importing it
+DEFAULT_SINKS = SINK_NAMES if find_spec("pyarrow") else SINK_NAMES[:-1]
+
+
+def sink_list(value):
+    """Parses a comma-separated list of sink names for argparse."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SINK_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown sink(s): {', '.join(unknown)} (choose from {', '.join(SINK_NAMES)})")
+    return tuple(dict.fromkeys(names))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape, clean and load the fashion catalogue.")
+    parser.add_argument("--sinks", type=sink_list, default=DEFAULT_SINKS, metavar="NAMES",
+                        help=f"comma-separated sinks to load (default: {','.join(DEFAULT_SINKS)})")
+    parser.add_argument("--dry-run", action="store_true", help="scrape and clean, but do not load any sink")
+    parser.add_argument("--max-pages", type=int, default=None,
+                        help=f"the maximum number of pages to scrape (default: every discovered page, "
+                             f"or {MAX_PAGES} with --stream or --no-discover)")
+    parser.add_argument("--no-discover", action="store_true",
+                        help="walk pages in order until one is missing instead of discovering the page count first")
+    parser.add_argument("--delay", type=float, default=DELAY, help="minimum seconds between requests to the site")
+    parser.add_argument("--full-load", action="store_true",
+                        help="load the whole catalogue instead of only the changes since the previous run")
+    parser.add_argument("--index-history", action="store_true",
+                        help="keep every version of each product in the index's product_history table")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream pages through clean and load in fixed-size chunks "
+                             "(CSV, PostgreSQL and analytics only)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per chunk in --stream mode")
+    parser.add_argument("--replay", action="store_true",
+                        help="reprocess the archived raw pages instead of scraping the site (no network)")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, metavar="ISO_DATE",
+                        help="with --replay, only pages fetched at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, metavar="ISO_DATE",
+                        help="with --replay, only pages fetched before this time")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="resume an interrupted run (the latest unfinished one by default)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and start a pipeline run every --interval seconds")
+    parser.add_argument("--interval", type=float, default=PIPELINE_INTERVAL,
+                        help="seconds between the starts of runs in --daemon mode")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="write run metrics here, as JSON for a .json path and Prometheus text otherwise")
+    parser.add_argument("--profile-dir", default=None, help="write a cProfile dump per pipeline stage here")
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        args.sinks = ()
+    return args
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    Returns the HTTP client shared by every run of this process, so its connections stay warm.
+    Every page it fetches is archived for `--replay`.
+    """
+    from utils.archive import PageArchive
+    from utils.fetch import FetchClient
+    from utils.http_cache import ResponseCache
+
+    return FetchClient(cache=ResponseCache(HTTP_CACHE_DIR), archive=PageArchive(ARCHIVE_DIR))
+
+
+def build_sinks(names, snapshot=None, deleted=None, as_of=None, csv_file=CSV_FILE, parquet_dir=None,
+                table_name=TABLE_NAME):
+    """
+    Builds the selected load sinks, importing each one's dependencies only when it is selected.
+
+    Args:
+        names (iterable): Sink names from `SINK_NAMES`.
+        snapshot (pd.DataFrame, optional): The full catalogue, when the sinks are given only the changed rows.
+            Google Sheets mirrors the catalogue and the analytics rollups describe it, so both always
+            receive the full frame.
+        deleted (pd.DataFrame, optional): Products removed since the previous run; PostgreSQL deletes them.
+        as_of (datetime, optional): When the run scraped the catalogue. The analytics store keeps the
+            latest snapshot of each day under it; without it, rows are appended by their `Timestamp`.
+        csv_file (str): The CSV history the csv sink appends to.
+        parquet_dir (str, optional): The root of the Parquet dataset. Defaults to `utils.parquet.PARQUET_DIR`.
+        table_name (str): The PostgreSQL table to load.
+
+    Returns:
+        dict: Sink names mapped to callables taking the DataFrame to load.
+    """
+    sinks = {}
+    for name in names:
+        if name == "csv":
+            from utils.history import append_csv_atomic
+            sinks[name] = lambda frame: append_csv_atomic(frame, filename=csv_file)
+        elif name == "google_sheets":
+            from utils.load import save_to_google_sheets
+            sinks[name] = lambda frame: save_to_google_sheets(frame if snapshot is None else snapshot.copy(),
+                                                              SPREADSHEET_ID, SHEET_RANGE)
+        elif name == "postgresql" and deleted is not None:
+            from utils.load import load_changes_to_postgresql
+            sinks[name] = lambda frame: load_changes_to_postgresql(frame, deleted.copy(), table_name)
+        elif name == "postgresql":
+            from utils.load import load_to_postgresql
+            sinks[name] = lambda frame: load_to_postgresql(frame, table_name)
+        elif name == "analytics":
+            from utils.analytics import save_to_analytics
+            sinks[name] = lambda frame: save_to_analytics(frame if snapshot is None else snapshot.copy(),
+                                                          ANALYTICS_FILE, as_of=as_of)
+        elif name == "parquet":
+            from utils.parquet import PARQUET_DIR, save_to_parquet
+            sinks[name] = lambda frame: save_to_parquet(frame, parquet_dir or PARQUET_DIR)
+    return sinks
+
 
+def run_streaming(args):
+    from utils.extract import iter_scrape
+    from utils.analytics import stream_to_analytics
+    from utils.load import stream_to_csv, stream_to_postgresql
+    from utils.transform import iter_clean_data, iter_frames
 
-def main():
-    print("[INFO] Starting ETL pipeline...")
+    print("[INFO] Starting streaming ETL pipeline...")
+    unsupported = [name for name in args.sinks if name not in STREAMING_SINKS]
+    if unsupported:
+        print(f"[WARN] Sink(s) not supported in --stream mode are skipped: {', '.join(unsupported)}.")
 
-    # Extract
-    raw_data = scrape(BASE_URL, max_pages=MAX_PAGES, delay=1)
+    products = iter_scrape(BASE_URL, max_pages=args.max_pages or MAX_PAGES, delay=args.delay, workers=PIPELINE_DEPTH,
+                           client=get_client())
+    frames = iter_frames(iter_clean_data(products), chunk_size=args.chunk_size)
+    failed = set()
+    if "csv" in args.sinks:
+        frames = stream_to_csv(frames, filename=CSV_FILE)
+    if "postgresql" in args.sinks:
+        frames = stream_to_postgresql(frames, TABLE_NAME, failed=failed)
+    if "analytics" in args.sinks:
+        frames = stream_to_analytics(frames, ANALYTICS_FILE, as_of=datetime.now())
 
-    if not raw_data:
+    try:
+        rows = sum(len(df) for df in frames)
+    except Exception as e:
+        # The CSV and analytics sinks raise when they fail, which stops the stream
+        print(f"[ERROR] Streaming ETL pipeline failed: {e}")
+        return 1
+
+    if failed:
+        print(f"[ERROR] Streaming ETL pipeline finished with failed sink(s): {', '.join(sorted(failed))}.")
+        return 1
+    if not rows:
         print("[WARN] No data scraped. Exiting.")
-        return
+        return 0
+
+    print(f"[INFO] Streaming ETL pipeline completed successfully ({rows} rows).")
+    return 0
+
+
+def run_replay(args):
+    import shutil
+
+    import pandas as pd
+
+    from utils.archive import PageArchive, replay_days
+    from utils.load import run_sinks
+    from utils.transform import convert_dtypes
+
+    print("[INFO] Replaying archived pages through the ETL pipeline (no network)...")
+    unsupported = [name for name in args.sinks if name not in REPLAY_SINKS]
+    if unsupported:
+        print(f"[WARN] Sink(s) not supported in --replay mode are skipped: {', '.join(unsupported)}.")
+    names = [name for name in args.sinks if name in REPLAY_SINKS]
+
+    # The analytics store replaces each day's snapshot, so it loads the replay in place. Every other sink
+    # gets a fresh copy: the CSV and Parquet sinks only append, and upserting old days into the live
+    # PostgreSQL table would resurrect deleted products the product index no longer tracks.
+    csv_file = os.path.join(REPLAY_DIR, CSV_FILE)
+    parquet_dir = os.path.join(REPLAY_DIR, "fashion_products_parquet")
+    failed = set()
+    if "csv" in names:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        if os.path.exists(csv_file):
+            os.remove(csv_file)
+    if "parquet" in names:
+        shutil.rmtree(parquet_dir, ignore_errors=True)
+    if "postgresql" in names:
+        try:
+            from utils.postgres import drop_table
+            drop_table(REPLAY_TABLE_NAME)
+        except Exception as e:
+            print(f"[ERROR] Failed to reset PostgreSQL table '{REPLAY_TABLE_NAME}': {e}")
+            failed.add("postgresql")
+            names.remove("postgresql")
+
+    rows = 0
+    with PageArchive(ARCHIVE_DIR) as archive:
+        for day, products in replay_days(archive, since=args.since, until=args.until):
+            df = convert_dtypes(pd.DataFrame(products))
+            rows += len(df)
+            sinks = build_sinks(names, as_of=datetime.fromisoformat(day), csv_file=csv_file, parquet_dir=parquet_dir,
+                                table_name=REPLAY_TABLE_NAME)
+            if sinks:
+                failed.update(result.name for result in run_sinks(df, sinks) if not result.ok)
+
+    if failed:
+        print(f"[ERROR] Replay finished with failed sink(s): {', '.join(sorted(failed))}.")
+        return 1
+    if not rows:
+        print("[WARN] No archived pages to replay. Exiting.")
+        return 0
+
+    print(f"[INFO] Replay completed successfully ({rows} rows).")
+    return 0
+
+
+def commit_index(df, as_of, history=False):
+    """
+    Records a loaded scrape in the product index, unless a newer run was committed in the meantime.
 
-    # Transform
-    data = clean_data(raw_data)
-    cleaned_data = pd.DataFrame(data)
-    df = convert_dtypes(cleaned_data)
+    Args:
+        df (pd.DataFrame): The run's cleaned catalogue.
+        as_of (datetime): When the run started.
+        history (bool): Whether the index keeps every version of each product.
+    """
+    from utils.product_index import ProductIndex
+
+    with ProductIndex(INDEX_FILE, history=history) as index:
+        latest = index.last_seen()
+        if latest is not None and latest > as_of:
+            print(f"[WARN] The product index already holds a newer run ({latest.isoformat()}); left unchanged.")
+            return
+        index.commit(df, as_of=as_of)
+
+
+def run_batch(args, resume=None):
+    import pandas as pd
+
+    from utils.checkpoint import CHECKPOINT_DIR, RunCheckpoint
+    from utils.incremental import PageStore, scrape_incremental
+    from utils.load import run_sinks
+    from utils.product_index import ProductIndex, changed_rows
+    from utils.transform import convert_dtypes
+
+    checkpoint = None
+    if resume:
+        checkpoint = RunCheckpoint.resume(CHECKPOINT_DIR, None if resume == "latest" else resume)
+        if checkpoint is None:
+            print(f"[WARN] No run to resume ({resume}); starting a new run.")
+    if checkpoint is None:
+        checkpoint = RunCheckpoint.start(CHECKPOINT_DIR)
+
+    print(f"[INFO] Starting ETL pipeline (run {checkpoint.run_id})...")
+
+    if checkpoint.is_complete("transform"):
+        df = checkpoint.load_frame("transform")
+        print("[INFO] Reusing the cleaned data checkpointed by this run.")
+    else:
+        # Extract + Transform (only pages whose content changed are parsed and cleaned)
+        max_pages = args.max_pages or (MAX_PAGES if args.no_discover else None)
+        result = scrape_incremental(BASE_URL, max_pages=max_pages, delay=args.delay,
+                                    store=PageStore(PAGE_STORE_DIR), workers=PIPELINE_DEPTH, client=get_client(),
+                                    checkpoint=checkpoint, discover=not args.no_discover)
+
+        if not result.pages_changed and not result.pages_unchanged:
+            print("[WARN] No data scraped. Exiting.")
+            checkpoint.finish()
+            return 0
+        checkpoint.complete("extract")
+
+        cleaned_data = pd.DataFrame(result.rows)
+        df = convert_dtypes(cleaned_data)
+        checkpoint.save_frame("transform", df)
+        checkpoint.complete("transform")
 
     if df.empty:
         print("[WARN] Cleaned data is empty. Exiting.")
-        return
+        checkpoint.finish()
+        return 0
+
+    if not args.sinks:
+        print(f"[INFO] Dry run: {len(df)} cleaned rows, no sinks loaded.")
+        checkpoint.finish()
+        return 0
+
+    # Change capture: sinks only receive what differs from the index, unless --full-load is given;
+    # removed products are deleted either way. The index is committed only after every sink loaded
+    # the rows, so the next run classifies a failed load as changed again; the rows are checkpointed
+    # so --resume retries exactly this load.
+    as_of = datetime.fromisoformat(checkpoint.state["created"])
+    if checkpoint.is_complete("index"):
+        changed, deleted = checkpoint.load_frame("changed"), checkpoint.load_frame("deleted")
+    else:
+        with ProductIndex(INDEX_FILE, history=args.index_history) as index:
+            changes = index.diff(df)
+        changed, deleted = df if args.full_load else changed_rows(changes), changes.deleted
+        checkpoint.save_frame("changed", changed)
+        checkpoint.save_frame("deleted", deleted)
+        checkpoint.complete("index")
+
+    # Load (sinks run concurrently, each on its own copy of the same snapshot)
+    sinks = build_sinks(args.sinks, snapshot=df, deleted=deleted, as_of=as_of)
+
+    if changed.empty and (deleted is None or deleted.empty):
+        sinks = {name: sink for name, sink in sinks.items() if name in SNAPSHOT_SINKS}
+        if not sinks:
+            print("[INFO] No products changed since the previous run; nothing to load.")
+            commit_index(df, as_of, args.index_history)
+            checkpoint.complete("load")
+            checkpoint.finish()
+            return 0
+        print(f"[INFO] No products changed since the previous run; only loading {', '.join(sinks)}.")
 
-    # Load
-    save_to_csv(df, filename="fashion_products.csv")
-    save_to_google_sheets(df, SPREADSHEET_ID, SHEET_RANGE)
-    load_to_postgresql(df, "fashion_products")
+    # Sinks that already loaded this run's data are not run again, so a retry never appends twice
+    loaded = checkpoint.completed_sinks()
+    if loaded:
+        print(f"[INFO] Skipping sink(s) already loaded by this run: {', '.join(loaded)}.")
+    results = run_sinks(changed, {name: sink for name, sink in sinks.items() if name not in loaded})
 
+    for result in results:
+        if result.ok:
+            checkpoint.complete_sink(result.name)
+
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        print(f"[ERROR] ETL pipeline finished with failed sink(s): {', '.join(failed)}. "
+              f"Retry them with --resume {checkpoint.run_id}.")
+        return 1
+
+    commit_index(df, as_of, args.index_history)
+    checkpoint.complete("load")
+    checkpoint.finish()
     print("[INFO] ETL pipeline completed successfully.")
+    return 0
+
+
+def run_once(args, resume=None):
+    try:
+        if args.replay:
+            return run_replay(args)
+        if args.stream:
+            return run_streaming(args)
+        return run_batch(args, resume)
+    finally:
+        if args.metrics_file:
+            METRICS.write(args.metrics_file)
+        dump_profiles()
+
+
+def run_daemon(args, lock):
+    print(f"[INFO] Running the ETL pipeline every {args.interval:.0f}s. Send SIGINT or SIGTERM to stop.")
+    stop_event = threading.Event()
+    stop_on_signals(stop_event)
+
+    # Only the first run resumes; later runs start fresh, and the index still holds any delta a failed run did not load
+    resume = [args.resume]
+
+    def job():
+        return run_once(args, resume.pop() if resume else None)
+
+    run_forever(job, args.interval, lock=lock, stop_event=stop_event)
+    print("[INFO] Daemon stopped.")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile_dir:
+        enable_profiling(args.profile_dir)
+
+    lock = RunLock(LOCK_FILE)
+    if args.daemon:
+        return run_daemon(args, lock)
+
+    if not lock.acquire():
+        print(f"[ERROR] Another pipeline run holds {lock.path} (pid {lock.holder()}). Exiting.")
+        return 1
+    try:
+        return run_once(args, args.resume)
+    finally:
+        lock.release()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from io import StringIO
+
+import pandas as pd
+
+from utils.analytics import AnalyticsStore, save_to_analytics, stream_to_analytics
+from utils.transform import convert_dtypes
+
+
+def products(*rows):
+    return convert_dtypes(pd.DataFrame([{
+        "Title": f"Product {i}",
+        "Price (IDR)": price,
+        "Rating": rating,
+        "Colors": 3,
+        "Size": size,
+        "Gender": gender,
+        "Timestamp": timestamp,
+    } for i, (timestamp, gender, size, price, rating) in enumerate(rows)]))
+
+
+BATCH_1 = products(
+    ("2025-01-01T09:00:00", "Men", "M", 100.0, 4.0),
+    ("2025-01-01T09:00:00", "Men", "M", 300.0, 2.0),
+    ("2025-01-01T09:00:00", "Women", "S", 200.0, 5.0),
+)
+BATCH_2 = products(
+    ("2025-01-01T18:00:00", "Men", "M", 50.0, 3.0),
+    ("2025-01-02T09:00:00", "Men", "M", 400.0, 4.5),
+)
+
+
+class TestAnalyticsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = AnalyticsStore(os.path.join(self.tmp.name, "analytics.sqlite"))
+        self.addCleanup(self.store.close)
+
+    def test_rollups_are_maintained_incrementally(self):
+        self.store.append(BATCH_1)
+        self.store.append(BATCH_2)
+
+        result = self.store.query(by=("day", "gender", "size"))
+
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(result[["day", "gender", "size", "rows"]].values.tolist(), [
+            ["2025-01-01", "Men", "M", 3],
+            ["2025-01-01", "Women", "S", 1],
+            ["2025-01-02", "Men", "M", 1],
+        ])
+        first = result.iloc[0]
+        self.assertEqual((first["avg_price"], first["min_price"], first["max_price"]), (150.0, 50.0, 300.0))
+        self.assertEqual((first["avg_rating"], first["min_rating"], first["max_rating"]), (3.0, 2.0, 4.0))
+
+    def test_rollups_match_a_rebuild_from_the_facts(self):
+        self.store.append(BATCH_1)
+        self.store.append(BATCH_2)
+        incremental = self.store.query(by=("day", "gender", "size"))
+
+        self.store.rebuild_rollups()
+
+        pd.testing.assert_frame_equal(self.store.query(by=("day", "gender", "size")), incremental)
+
+    def test_query_filters_and_totals(self):
+        self.store.append(BATCH_1)
+        self.store.append(BATCH_2)
+
+        by_gender = self.store.query(by=("gender",), start=date(2025, 1, 1), end="2025-01-02")
+        self.assertEqual(by_gender["gender"].tolist(), ["Men", "Women"])
+        self.assertEqual(by_gender["rows"].tolist(), [3, 1])
+
+        total = self.store.query(by=(), gender="Men", size="M")
+        self.assertEqual(total["rows"].tolist(), [4])
+        self.assertEqual(total["avg_price"].tolist(), [212.5])
+
+    def test_replace_day_keeps_one_snapshot_per_day(self):
+        for _ in range(3):
+            self.store.replace_day(BATCH_1, date(2025, 1, 5))
+        self.store.replace_day(BATCH_1.head(1), "2025-01-06")
+
+        result = self.store.query()
+
+        self.assertEqual(result["day"].tolist(), ["2025-01-05", "2025-01-06"])
+        self.assertEqual(result["rows"].tolist(), [3, 1])
+        self.assertEqual(len(self.store), 4)
+
+    def test_empty_store_and_unknown_dimension(self):
+        self.assertEqual(self.store.query(by=())["rows"].tolist(), [0])
+        self.assertTrue(self.store.query().empty)
+        with self.assertRaises(ValueError):
+            self.store.query(by=("colour",))
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.append(BATCH_1.drop(columns=["Gender"]))
+
+    def test_rows_without_timestamp_count_on_the_load_date(self):
+        batch = BATCH_1.copy()
+        batch["Timestamp"] = pd.NaT
+        self.store.append(batch)
+
+        self.assertEqual(self.store.query()["day"].tolist(), [date.today().isoformat()])
+
+
+class TestAnalyticsSink(unittest.TestCase):
+
+    def test_save_and_stream(self):
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(StringIO()):
+            path = os.path.join(tmp, "analytics.sqlite")
+            save_to_analytics(BATCH_1, path)
+            passed = list(stream_to_analytics(iter([BATCH_2]), path))
+
+            with AnalyticsStore(path) as store:
+                self.assertEqual(len(store), 5)
+        self.assertIs(passed[0], BATCH_2)
+
+    def test_snapshots_are_dated_by_the_run(self):
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(StringIO()):
+            path = os.path.join(tmp, "analytics.sqlite")
+            as_of = datetime(2025, 3, 1, 9)
+            save_to_analytics(BATCH_1, path, as_of=as_of)
+            save_to_analytics(BATCH_1, path, as_of=as_of.replace(hour=10))
+            list(stream_to_analytics(iter([BATCH_2, BATCH_2]), path, as_of=datetime(2025, 3, 2)))
+
+            with AnalyticsStore(path) as store:
+                result = store.query()
+        self.assertEqual(result["day"].tolist(), ["2025-03-01", "2025-03-02"])
+        self.assertEqual(result["rows"].tolist(), [3, 4])
+
+    def test_empty_stream_keeps_the_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(StringIO()):
+            path = os.path.join(tmp, "analytics.sqlite")
+            as_of = datetime(2025, 3, 1, 9)
+            save_to_analytics(BATCH_1, path, as_of=as_of)
+            self.assertEqual(list(stream_to_analytics(iter([]), path, as_of=as_of.replace(hour=10))), [])
+
+            with AnalyticsStore(path) as store:
+                self.assertEqual(len(store), len(BATCH_1))
+                self.assertEqual(store.query()["rows"].tolist(), [len(BATCH_1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
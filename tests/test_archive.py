@@ -0,0 +1,168 @@
+import gzip
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import main
+from benchmarks.fixtures import catalogue_page
+from utils.archive import PageArchive, iter_archive, replay_archive, replay_days
+from utils.fetch import FetchClient
+
+START = datetime(2025, 1, 1)
+
+
+class TestPageArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = PageArchive(self.tmp.name)
+        self.addCleanup(self.archive.close)
+
+    def test_append_and_read_back(self):
+        self.archive.append("http://example.com/", b"<html>one</html>", fetched_at=START)
+        self.archive.append("http://example.com/page2", b"<html>two</html>", fetched_at=START)
+
+        entries = self.archive.entries()
+        self.assertEqual([entry.url for entry in entries], ["http://example.com/", "http://example.com/page2"])
+        self.assertEqual(self.archive.read(entries[1]), b"<html>two</html>")
+        # A segment is a valid gzip stream of every page in it
+        with gzip.open(self.archive.segment_path(1)) as f:
+            self.assertEqual(f.read(), b"<html>one</html><html>two</html>")
+
+    def test_unchanged_body_is_stored_once(self):
+        self.assertTrue(self.archive.append("http://example.com/", b"same", fetched_at=START))
+        self.assertFalse(self.archive.append("http://example.com/", b"same", fetched_at=START + timedelta(hours=1)))
+        self.assertTrue(self.archive.append("http://example.com/", b"new", fetched_at=START + timedelta(hours=2)))
+
+        self.assertEqual(len(self.archive), 3)
+        first, second, _ = self.archive.entries()
+        self.assertEqual((first.segment, first.offset), (second.segment, second.offset))
+
+    def test_lookup_as_of_a_time(self):
+        for hour, body in enumerate((b"v1", b"v2", b"v3")):
+            self.archive.append("http://example.com/", body, fetched_at=START + timedelta(hours=hour))
+
+        self.assertEqual(self.archive.lookup("http://example.com/"), b"v3")
+        self.assertEqual(self.archive.lookup("http://example.com/", at=START + timedelta(minutes=90)), b"v2")
+        self.assertIsNone(self.archive.lookup("http://example.com/", at=START - timedelta(days=1)))
+        self.assertIsNone(self.archive.lookup("http://example.com/page9"))
+
+    def test_segments_roll_over_and_stream_in_fetch_order(self):
+        archive = PageArchive(os.path.join(self.tmp.name, "small"), segment_bytes=200)
+        self.addCleanup(archive.close)
+        bodies = [os.urandom(100) for _ in range(12)]
+        for i, body in enumerate(bodies):
+            archive.append(f"http://example.com/page{i}", body, fetched_at=START + timedelta(minutes=i))
+
+        self.assertGreater(max(entry.segment for entry in archive.entries()), 3)
+        streamed = list(iter_archive(archive, workers=3))
+        self.assertEqual([content for _, content in streamed], bodies)
+
+        window = list(iter_archive(archive, since=START + timedelta(minutes=2), until=START + timedelta(minutes=5)))
+        self.assertEqual([content for _, content in window], bodies[2:5])
+
+    def test_keyset_batches_cover_every_entry(self):
+        for i in range(25):
+            self.archive.append(f"http://example.com/page{i % 3}", str(i).encode(), fetched_at=START)
+
+        self.assertEqual(len(list(self.archive.iter_entries(batch_size=4))), 25)
+
+    def test_reopening_appends_to_the_existing_archive(self):
+        self.archive.append("http://example.com/", b"one", fetched_at=START)
+        with PageArchive(self.tmp.name) as reopened:
+            reopened.append("http://example.com/page2", b"two", fetched_at=START)
+            self.assertEqual([reopened.read(entry) for entry in reopened.entries()], [b"one", b"two"])
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = PageArchive(os.path.join(self.tmp.name, "archive"))
+        self.addCleanup(self.archive.close)
+        for day in range(3):
+            for page in (1, 2):
+                self.archive.append(f"http://example.com/page{page}", catalogue_page(page, cards_per_page=2),
+                                    fetched_at=START + timedelta(days=day))
+
+    def test_replay_cleans_every_fetch_with_its_fetch_time(self):
+        with redirect_stdout(StringIO()):
+            rows = list(replay_archive(self.archive, since=START + timedelta(days=1), workers=2))
+
+        self.assertEqual(len(rows), 2 * 2 * 2)
+        self.assertEqual([row["Title"] for row in rows[:4]], ["T-shirt 0", "T-shirt 1", "T-shirt 2", "T-shirt 3"])
+        self.assertEqual({row["Timestamp"] for row in rows},
+                         {(START + timedelta(days=day)).isoformat() for day in (1, 2)})
+        self.assertEqual(rows[0]["Price (IDR)"], 160000)
+
+    def replay(self, *argv):
+        replay_dir = os.path.join(self.tmp.name, "replay")
+        with patch.object(main, "ARCHIVE_DIR", self.archive.directory), patch.object(main, "REPLAY_DIR", replay_dir), \
+                patch.object(main, "get_client", side_effect=AssertionError("replay must not fetch")), \
+                redirect_stdout(StringIO()) as stdout:
+            code = main.run_once(main.parse_args(["--replay", *argv]))
+        return code, stdout.getvalue(), os.path.join(replay_dir, main.CSV_FILE)
+
+    def test_main_replay_loads_sinks_without_a_client(self):
+        code, output, csv_file = self.replay("--sinks", "csv,google_sheets",
+                                             "--until", (START + timedelta(days=1)).isoformat())
+
+        self.assertEqual(code, 0)
+        self.assertIn("not supported in --replay mode are skipped: google_sheets", output)
+        with open(csv_file, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 1 + 4)
+
+    def test_replay_days_uses_the_last_fetch_of_each_url_per_day(self):
+        # Refetches later on the same day, one of them changed
+        self.archive.append("http://example.com/page1", catalogue_page(1, cards_per_page=2),
+                            fetched_at=START + timedelta(hours=6))
+        self.archive.append("http://example.com/page2", catalogue_page(5, cards_per_page=2),
+                            fetched_at=START + timedelta(hours=7))
+
+        with redirect_stdout(StringIO()):
+            days = list(replay_days(self.archive, until=START + timedelta(days=2), workers=2))
+
+        self.assertEqual([day for day, _ in days], ["2025-01-01", "2025-01-02"])
+        self.assertEqual(sorted(row["Title"] for row in days[0][1]),
+                         ["T-shirt 0", "T-shirt 1", "T-shirt 8", "T-shirt 9"])
+        self.assertEqual(len(days[1][1]), 4)
+
+    def test_replaying_twice_does_not_duplicate_the_output(self):
+        for _ in range(2):
+            code, _, csv_file = self.replay("--sinks", "csv")
+            self.assertEqual(code, 0)
+
+        with open(csv_file, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 1 + 3 * 4)
+
+    def test_replay_loads_postgresql_into_a_fresh_replay_table(self):
+        with patch("utils.postgres.drop_table") as drop_table, \
+                patch("utils.load.load_to_postgresql", return_value=True) as load:
+            code, _, _ = self.replay("--sinks", "postgresql")
+
+        self.assertEqual(code, 0)
+        drop_table.assert_called_once_with(main.REPLAY_TABLE_NAME)
+        self.assertEqual(load.call_count, 3)
+        self.assertEqual({call.args[1] for call in load.call_args_list}, {main.REPLAY_TABLE_NAME})
+
+
+class TestFetchClientArchive(unittest.TestCase):
+
+    def test_fetched_bodies_are_archived(self):
+        archive = MagicMock()
+        client = FetchClient(archive=archive)
+        response = MagicMock(status_code=200, content=b"<html>page</html>")
+        with patch.object(client, "get", return_value=response):
+            client.fetch("http://example.com/")
+
+        archive.append.assert_called_once_with("http://example.com/", b"<html>page</html>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from utils.atomic import atomic_path, atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "state.json")
+
+    def test_text_and_bytes_replace_the_file(self):
+        atomic_write(self.path, "old")
+        atomic_write(self.path, b"new", durable=True)
+
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"new")
+        self.assertEqual(os.listdir(self.tmp.name), ["state.json"])
+
+    def test_failed_write_keeps_the_old_file(self):
+        atomic_write(self.path, "old")
+
+        with self.assertRaises(RuntimeError):
+            with atomic_path(self.path) as tmp_path:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write("half")
+                raise RuntimeError("interrupted")
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.tmp.name), ["state.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+from tests.test_incremental import catalogue
+from utils.checkpoint import RunCheckpoint, list_runs, prune_runs
+from utils.incremental import PageStore, scrape_incremental
+
+
+class TestRunCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "runs")
+
+    def test_pages_survive_a_restart(self):
+        checkpoint = RunCheckpoint.start(self.root, run_id="run-1")
+        checkpoint.save_page(1, "http://example.com/", [{"Title": "A"}])
+        checkpoint.save_page(2, "http://example.com/page2", [{"Title": "B"}])
+
+        resumed = RunCheckpoint.resume(self.root, "run-1")
+
+        self.assertEqual(resumed.next_page(), 3)
+        self.assertEqual(list(resumed.load_pages()), [
+            (1, "http://example.com/", [{"Title": "A"}]),
+            (2, "http://example.com/page2", [{"Title": "B"}]),
+        ])
+
+    def test_next_page_stops_at_the_first_gap(self):
+        checkpoint = RunCheckpoint.start(self.root)
+        checkpoint.save_page(1, "u1", [])
+        checkpoint.save_page(3, "u3", [])
+
+        self.assertEqual(checkpoint.next_page(), 2)
+
+    def test_frame_keeps_dtypes(self):
+        checkpoint = RunCheckpoint.start(self.root)
+        df = pd.DataFrame({"Price (IDR)": [1.5], "Timestamp": pd.to_datetime(["2025-01-01T10:00:00"])})
+
+        checkpoint.save_frame("transform", df)
+
+        pd.testing.assert_frame_equal(checkpoint.load_frame("transform"), df)
+        self.assertIsNone(checkpoint.load_frame("missing"))
+
+    def test_resume_picks_latest_unfinished_run(self):
+        RunCheckpoint.start(self.root, run_id="a")
+        RunCheckpoint.start(self.root, run_id="b").finish()
+        RunCheckpoint.start(self.root, run_id="c")
+        RunCheckpoint.resume(self.root, "c").finish()
+
+        self.assertEqual(RunCheckpoint.resume(self.root).run_id, "a")
+
+    def test_resume_without_runs(self):
+        self.assertIsNone(RunCheckpoint.resume(self.root))
+        self.assertIsNone(RunCheckpoint.resume(self.root, "missing"))
+
+    def test_stages_and_sinks(self):
+        checkpoint = RunCheckpoint.start(self.root, run_id="run-1")
+        checkpoint.complete("extract")
+        checkpoint.complete_sink("csv")
+
+        resumed = RunCheckpoint.resume(self.root, "run-1")
+
+        self.assertTrue(resumed.is_complete("extract"))
+        self.assertFalse(resumed.is_complete("transform"))
+        self.assertEqual(resumed.completed_sinks(), ["csv"])
+
+    def test_duplicate_run_id_is_rejected(self):
+        RunCheckpoint.start(self.root, run_id="run-1")
+
+        with self.assertRaises(FileExistsError):
+            RunCheckpoint.start(self.root, run_id="run-1")
+
+    def test_prune_keeps_unfinished_runs(self):
+        for run_id in ("a", "b", "c"):
+            checkpoint = RunCheckpoint.start(self.root, run_id=run_id)
+            if run_id != "a":
+                checkpoint.finish()
+
+        self.assertEqual(prune_runs(self.root, keep=1), ["b"])
+        self.assertEqual([state["run_id"] for state in list_runs(self.root)], ["a", "c"])
+
+    def test_prune_caps_unfinished_runs(self):
+        for run_id in ("a", "b", "c", "d"):
+            checkpoint = RunCheckpoint.start(self.root, run_id=run_id)
+            checkpoint.save_frame("transform", pd.DataFrame({"Title": ["A"]}))
+            if run_id == "b":
+                checkpoint.finish()
+
+        self.assertEqual(prune_runs(self.root, keep=1, keep_unfinished=1), ["a", "c"])
+        self.assertEqual([state["run_id"] for state in list_runs(self.root)], ["b", "d"])
+        self.assertEqual(sorted(os.listdir(self.root)), ["b", "d"])
+        self.assertEqual(RunCheckpoint.resume(self.root).run_id, "d")
+
+    def test_failed_frame_write_keeps_the_previous_frame(self):
+        checkpoint = RunCheckpoint.start(self.root, run_id="run-1")
+        checkpoint.save_frame("transform", pd.DataFrame({"Title": ["A"]}))
+
+        with patch.object(pd.DataFrame, "to_pickle", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                checkpoint.save_frame("transform", pd.DataFrame({"Title": ["B"]}))
+
+        self.assertEqual(checkpoint.load_frame("transform")["Title"].tolist(), ["A"])
+        self.assertFalse([name for name in os.listdir(checkpoint.directory) if name.startswith(".tmp-")])
+
+
+class TestResumedScrape(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_scrape(self, pages, checkpoint):
+        fetch = catalogue(pages)
+        with patch("utils.extract.fetching_content", side_effect=fetch) as mock_fetch, \
+                redirect_stdout(StringIO()):
+            result = scrape_incremental("http://example.com/", max_pages=10, delay=0,
+                                        store=PageStore(os.path.join(self.tmp.name, "pages")),
+                                        checkpoint=checkpoint)
+        return result, [call.args[0] for call in mock_fetch.call_args_list]
+
+    def test_interrupted_scrape_resumes_after_the_last_saved_page(self):
+        checkpoint = RunCheckpoint.start(os.path.join(self.tmp.name, "runs"), run_id="run-1")
+        self.run_scrape({1: "Shirt A", 2: "Shirt B"}, checkpoint)
+
+        resumed = RunCheckpoint.resume(os.path.join(self.tmp.name, "runs"), "run-1")
+        result, fetched = self.run_scrape({1: "Shirt A", 2: "Shirt B", 3: "Shirt C"}, resumed)
+
+        self.assertEqual(fetched, ["http://example.com/page3", "http://example.com/page4"])
+        self.assertEqual([row["Title"] for row in result.rows], ["Shirt A", "Shirt B", "Shirt C"])
+        self.assertEqual((result.pages_changed, result.pages_unchanged), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
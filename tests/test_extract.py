@@ -1,10 +1,13 @@
+import random
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
 from bs4 import BeautifulSoup
 from requests.exceptions import ConnectionError
 
-from utils.extract import fetching_content, extract_fashion_data, scrape
+from utils.extract import fetching_content, extract_fashion_data, scrape, TokenBucket, parse_page, lxml_html, iter_pages
+from utils.fetch import FetchClient
 
 # Sample HTML for testing
 SAMPLE_HTML = """
@@ -40,18 +43,19 @@ class TestScraper(unittest.TestCase):
         self.assertEqual(result["Gender"], "Gender: Women")
         self.assertIn("Timestamp", result)
 
-    @patch("utils.extract.requests.get")
-    def test_fetching_content_success(self, mock_get):
+    def test_fetching_content_success(self):
+        client = FetchClient()
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.content = b"<html></html>"
-        mock_get.return_value = mock_response
 
-        url = "http://example.com"
-        result = fetching_content(url)
+        with patch.object(client.session, "get", return_value=mock_response) as mock_get:
+            url = "http://example.com"
+            result = fetching_content(url, client=client)
 
         self.assertEqual(result, b"<html></html>")
-        mock_get.assert_called_once_with(url, headers=mock_get.call_args[1]["headers"])
+        mock_get.assert_called_once_with(url, timeout=client.timeout)
+        self.assertEqual(client.histogram.count, 1)
 
     @patch("utils.extract.fetching_content")
     def test_fetching_content_failure(self, mock_fetching):
@@ -80,5 +84,117 @@ class TestScraper(unittest.TestCase):
         self.assertEqual(results, [])
 
 
+    @patch("utils.extract.fetching_content")
+    def test_scrape_concurrent_keeps_page_order(self, mock_fetching):
+        def fake_fetch(url, client=None):
+            time.sleep(random.uniform(0, 0.02))
+            page = 1 if url.endswith("/") else int(url.rsplit("page", 1)[1])
+            if page > 6:
+                return None
+            html = SAMPLE_HTML.replace("T-shirt 2", f"Page {page}")
+            return f"<html><body>{html}</body></html>".encode("utf-8")
+
+        mock_fetching.side_effect = fake_fetch
+        results = scrape(base_url="http://example.com/", max_pages=20, delay=0, workers=4)
+
+        self.assertEqual([item["Title"] for item in results], [f"Page {page}" for page in range(1, 7)])
+
+    @patch("utils.extract.fetching_content")
+    def test_scrape_concurrent_stops_on_no_content(self, mock_fetching):
+        mock_fetching.return_value = None
+        results = scrape(base_url="http://example.com/", max_pages=10, delay=0, workers=4)
+
+        self.assertEqual(results, [])
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_acquire_paces_requests(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    @patch('utils.extract.fetching_content', return_value=b"<html></html>")
+    def test_workers_do_not_burst_past_the_delay(self, mock_fetch):
+        start = time.monotonic()
+        pages = list(iter_pages("http://example.com/", max_pages=5, delay=0.02, workers=4))
+
+        self.assertEqual(len(pages), 5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.075)
+
+    def test_acquire_without_rate_does_not_block(self):
+        bucket = TokenBucket(rate=None)
+        start = time.monotonic()
+        for _ in range(1000):
+            bucket.acquire()
+
+        self.assertLess(time.monotonic() - start, 0.05)
+
+
+# Cards that exercise the edge cases the cleaning stage filters out later
+INVALID_HTML = """
+<div class="collection-card">
+    <div class="product-details">
+        <h3 class="product-title">Unknown Product</h3>
+        <div class="price-container"><p class="price">Price Unavailable</p></div>
+            <p style="font-size: 14px; color: #777;">Rating: ⭐ Invalid Rating / 5</p>
+            <p style="font-size: 14px; color: #777;">5 Colors</p>
+            <p style="font-size: 14px; color: #777;">Size: XL</p>
+            <p style="font-size: 14px; color: #777;">Gender: Unisex</p>
+        </div>
+</div>
+<div class="collection-card featured">
+    <div class="product-details">
+        <h3 class="product-title"> Hoodie <b>7</b> <!-- promo --></h3>
+        <div class="price-container"><span class="price"> $ 49.99 </span></div>
+            <p>Rating: ⭐ 4.8 / 5</p>
+            <p>8 Colors</p>
+    </div>
+</div>
+<div class="collection-card">
+    <div class="product-details"><p>Size: S</p></div>
+</div>
+"""
+
+
+def without_timestamp(products):
+    return [{key: value for key, value in product.items() if key != "Timestamp"} for product in products]
+
+
+@unittest.skipIf(lxml_html is None, "lxml is not installed")
+class TestParserBackends(unittest.TestCase):
+
+    def assert_parity(self, html):
+        content = f"<html><body>{html}</body></html>".encode("utf-8")
+        expected = without_timestamp(parse_page(content, backend="html.parser"))
+        actual = without_timestamp(parse_page(content, backend="lxml"))
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_sample_card_parity(self):
+        products = self.assert_parity(SAMPLE_HTML)
+
+        self.assertEqual(products[0]["Rating"], "Rating: ⭐ 3.9 / 5")
+
+    def test_invalid_and_partial_cards_parity(self):
+        products = self.assert_parity(INVALID_HTML)
+
+        self.assertEqual([product["Title"] for product in products], ["Unknown Product", "Hoodie7"])
+
+    def test_many_cards_parity(self):
+        self.assert_parity(SAMPLE_HTML * 25 + INVALID_HTML)
+
+    def test_empty_page(self):
+        self.assertEqual(parse_page(b"", backend="lxml"), [])
+        self.assertEqual(parse_page(b"<html><body></body></html>", backend="lxml"), [])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parse_page(SAMPLE_HTML.encode("utf-8"), backend="regex")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.exceptions import HTTPError
+
+from utils.fetch import FetchClient, LatencyHistogram
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails the first `failures` requests with 503 + Retry-After, then succeeds."""
+
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        if self.path == "/missing":
+            self._send(404, b"")
+        elif type(self).requests_seen <= type(self).failures:
+            self._send(503, b"busy", {"Retry-After": "0"})
+        else:
+            self._send(200, b"<html>ok</html>")
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFetchClient(unittest.TestCase):
+
+    def setUp(self):
+        FlakyHandler.failures = 0
+        FlakyHandler.requests_seen = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch_retries_transient_errors(self):
+        FlakyHandler.failures = 2
+        with FetchClient(retries=3, backoff_factor=0) as client:
+            content = client.fetch(f"{self.base_url}/")
+
+        self.assertEqual(content, b"<html>ok</html>")
+        self.assertEqual(FlakyHandler.requests_seen, 3)
+
+    def test_fetch_gives_up_after_retries(self):
+        FlakyHandler.failures = 10
+        with FetchClient(retries=1, backoff_factor=0) as client:
+            with self.assertRaises(HTTPError):
+                client.fetch(f"{self.base_url}/")
+
+        self.assertEqual(FlakyHandler.requests_seen, 2)
+
+    def test_fetch_does_not_retry_client_errors(self):
+        with FetchClient(retries=3, backoff_factor=0) as client:
+            with self.assertRaises(HTTPError):
+                client.fetch(f"{self.base_url}/missing")
+
+        self.assertEqual(FlakyHandler.requests_seen, 1)
+
+    def test_fetch_records_latency(self):
+        with FetchClient() as client:
+            client.fetch(f"{self.base_url}/")
+            client.fetch(f"{self.base_url}/")
+
+        self.assertEqual(client.histogram.count, 2)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for seconds in [0.01] * 90 + [0.7] * 10:
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(50), 0.05)
+        self.assertEqual(histogram.percentile(95), 0.7)
+        self.assertIn("n=100", histogram.summary())
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+
+        self.assertEqual(histogram.percentile(99), 0.0)
+        self.assertIn("n=0", histogram.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+from utils.fields import DETAILS, FIELDS, FieldSchema, FieldSpec, SCHEMA, css_parts, spec_version
+
+MATERIAL = FieldSpec(name="Material", column="Material", selector=DETAILS, prefix="Material:",
+                     pattern=r"Material:\s*(.*?)", type=str.lower, invalid=("Unknown",), required=False,
+                     contains=True)
+
+RAW = {
+    "Title": "T-shirt 1",
+    "Price": "$10.00",
+    "Rating": "Rating: ⭐4.5 / 5",
+    "Colors": "3 Colors",
+    "Size": "Size: M",
+    "Gender": "Gender: Men",
+}
+
+
+class TestFieldSchema(unittest.TestCase):
+
+    def test_clean_parses_every_field(self):
+        self.assertEqual(SCHEMA.clean(RAW), {
+            "Title": "T-shirt 1",
+            "Price (IDR)": 160000,
+            "Rating": 4.5,
+            "Colors": 3,
+            "Size": "M",
+            "Gender": "Men",
+        })
+
+    def test_sentinels_and_missing_required_fields_are_invalid(self):
+        for field, text in (("Title", "Unknown Product"), ("Price", "Price Unavailable"),
+                            ("Rating", "Rating: ⭐ Invalid Rating / 5"), ("Size", None)):
+            with self.subTest(field=field):
+                item = {**RAW, field: text}
+                self.assertFalse(SCHEMA.is_valid(item))
+                self.assertIsNone(SCHEMA.clean(item))
+
+    def test_title_and_price_sentinels_match_the_whole_text(self):
+        self.assertTrue(SCHEMA.is_valid({**RAW, "Title": "Unknown Product X"}))
+        self.assertTrue(SCHEMA.is_valid({**RAW, "Price": "Price Unavailable Soon"}))
+        self.assertEqual(SCHEMA.clean({**RAW, "Title": "Unknown Product X"})["Title"], "Unknown Product X")
+        self.assertFalse(SCHEMA.is_valid({**RAW, "Rating": "Rating: Invalid"}))
+
+    def test_unparsable_field_raises(self):
+        with self.assertRaises(ValueError):
+            SCHEMA.clean({**RAW, "Colors": "2.5 Colors"})
+        # A cached failure raises again
+        with self.assertRaises(ValueError):
+            SCHEMA.clean({**RAW, "Colors": "2.5 Colors"})
+
+    def test_sentinel_wins_over_an_earlier_unparsable_field(self):
+        self.assertIsNone(SCHEMA.clean({**RAW, "Price": "$1,000.00", "Rating": "Rating: Invalid"}))
+
+    def test_classify_assigns_labelled_texts(self):
+        self.assertEqual(SCHEMA.classify(["Rating: ⭐4.5 / 5", "3 Colors", "Size: M", "Gender: Men", "Other"]), {
+            "Rating": "Rating: ⭐4.5 / 5",
+            "Colors": "3 Colors",
+            "Size": "Size: M",
+            "Gender": "Gender: Men",
+        })
+
+    def test_new_field_needs_only_a_spec(self):
+        schema = FieldSchema(FIELDS + (MATERIAL,))
+        raw = {**RAW, **schema.classify(["Size: M", "Material: Cotton"])}
+
+        self.assertEqual(raw["Material"], "Material: Cotton")
+        self.assertEqual(schema.clean(raw)["Material"], "cotton")
+        self.assertIsNone(schema.clean({**RAW, "Material": None})["Material"])
+        self.assertIsNone(schema.clean({**RAW, "Material": "Material: Unknown"}))
+        self.assertEqual(schema.columns[-1], "Material")
+        self.assertNotIn("Material", schema.required)
+
+    def test_version_follows_the_specs_and_the_exchange_rate(self):
+        self.assertEqual(SCHEMA.version, spec_version(FIELDS))
+        self.assertEqual(FieldSchema(FIELDS + (MATERIAL,)).version, spec_version(FIELDS + (MATERIAL,)))
+        self.assertNotEqual(spec_version(FIELDS + (MATERIAL,)), SCHEMA.version)
+        with patch("utils.fields.EXCHANGE_RATE_USD_TO_IDR", 15000):
+            self.assertNotEqual(spec_version(FIELDS), SCHEMA.version)
+
+    def test_css_parts(self):
+        self.assertEqual(css_parts(".price"), ("price", None))
+        self.assertEqual(css_parts(DETAILS), ("product-details", "p"))
+        with self.assertRaises(ValueError):
+            css_parts("div.price")
+
+
+if __name__ == "__main__":
+    unittest.main()
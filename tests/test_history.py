@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+from utils.history import HistoryAppender, append_csv_atomic, iter_history, iter_history_records
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.filename = os.path.join(self.tmp.name, "history.csv")
+        self.df = pd.DataFrame({
+            "Title": ["T-shirt 2", "Hoodie, \"Zip\""],
+            "Price (IDR)": [1634400.0, 800000.0],
+            "Rating": [3.9, 4.5],
+            "Colors": [3, 5],
+            "Size": ["M", "L"],
+            "Gender": ["Women", "Unisex"],
+            "Timestamp": pd.to_datetime(["2025-01-01T10:00:00.123456", "2025-01-02T10:00:00.000001"]),
+        })
+
+    def test_append_creates_then_appends(self):
+        append_csv_atomic(self.df, self.filename)
+        append_csv_atomic(self.df, self.filename)
+
+        history = pd.concat(iter_history(self.filename), ignore_index=True)
+        pd.testing.assert_frame_equal(history, pd.concat([self.df, self.df], ignore_index=True))
+
+    def test_append_rejects_mismatched_columns(self):
+        append_csv_atomic(self.df, self.filename)
+
+        with self.assertRaises(ValueError):
+            append_csv_atomic(self.df.drop(columns=["Rating"]), self.filename)
+
+    def test_append_adds_the_columns_of_new_fields(self):
+        append_csv_atomic(self.df, self.filename)
+        extended = self.df.copy()
+        extended.insert(6, "Material", ["cotton", None])
+
+        with redirect_stdout(StringIO()):
+            append_csv_atomic(extended, self.filename)
+        with self.assertRaises(ValueError):
+            append_csv_atomic(self.df, self.filename)
+
+        history = pd.read_csv(self.filename)
+        self.assertEqual(list(history.columns), list(extended.columns))
+        self.assertEqual(history["Material"].isna().tolist(), [True, True, False, True])
+        self.assertEqual(history["Material"][2], "cotton")
+        self.assertEqual(history["Title"].tolist(), self.df["Title"].tolist() * 2)
+        self.assertEqual(os.listdir(self.tmp.name), ["history.csv"])
+
+    def test_failed_append_leaves_file_untouched(self):
+        append_csv_atomic(self.df, self.filename)
+        with open(self.filename, "rb") as f:
+            before = f.read()
+
+        with patch("utils.history.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                append_csv_atomic(self.df, self.filename)
+
+        with open(self.filename, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.tmp.name), ["history.csv"])
+
+    def test_interrupted_append_is_invisible_and_rolled_back(self):
+        append_csv_atomic(self.df, self.filename)
+        # A process that died mid-append leaves its rows and the journal behind
+        history = HistoryAppender(self.filename).__enter__()
+        history.write(self.df)
+        history._file.close()
+
+        self.assertEqual(len(pd.concat(iter_history(self.filename))), 2)
+
+        append_csv_atomic(self.df.head(1), self.filename)
+
+        self.assertEqual(pd.concat(iter_history(self.filename))["Title"].tolist(), ["T-shirt 2", "Hoodie, \"Zip\"",
+                                                                                   "T-shirt 2"])
+        self.assertEqual(os.listdir(self.tmp.name), ["history.csv"])
+
+    def test_appender_writes_several_frames_as_one_append(self):
+        with HistoryAppender(self.filename) as history:
+            history.write(self.df)
+            history.write(self.df)
+
+        self.assertEqual(history.rows, 4)
+        self.assertEqual(len(pd.concat(iter_history(self.filename))), 4)
+
+        with self.assertRaises(RuntimeError):
+            with HistoryAppender(self.filename) as history:
+                history.write(self.df)
+                raise RuntimeError("load failed")
+        self.assertEqual(len(pd.concat(iter_history(self.filename))), 4)
+
+    def test_iter_history_reads_in_typed_chunks(self):
+        for _ in range(3):
+            append_csv_atomic(self.df, self.filename)
+
+        chunks = list(iter_history(self.filename, chunk_rows=4))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+        self.assertEqual(chunks[0]["Colors"].dtype, "int64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(chunks[1]["Timestamp"]))
+
+    def test_iter_history_selected_columns(self):
+        append_csv_atomic(self.df, self.filename)
+
+        chunk = next(iter_history(self.filename, columns=["Title", "Timestamp"]))
+
+        self.assertEqual(list(chunk.columns), ["Title", "Timestamp"])
+
+    def test_missing_history_yields_nothing(self):
+        self.assertEqual(list(iter_history(self.filename)), [])
+
+    def test_iter_history_records(self):
+        append_csv_atomic(self.df, self.filename)
+
+        records = list(iter_history_records(self.filename))
+
+        self.assertEqual(records[0]["Title"], "T-shirt 2")
+        self.assertEqual(records[0]["Colors"], 3)
+        self.assertEqual(records[0]["Timestamp"], "2025-01-01T10:00:00.123456")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from utils.fetch import FetchClient
+from utils.http_cache import ResponseCache
+
+
+def make_response(status, content=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_store_and_conditional_headers(self):
+        cache = ResponseCache(self.tmp.name)
+        cache.store("http://a/", b"body", etag='"abc"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+        self.assertEqual(cache.conditional_headers("http://a/"), {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        })
+        self.assertEqual(cache.conditional_headers("http://b/"), {})
+
+    def test_entries_survive_reopening(self):
+        ResponseCache(self.tmp.name).store("http://a/", b"body", etag='"abc"')
+        cache = ResponseCache(self.tmp.name)
+
+        self.assertEqual(cache.load("http://a/"), b"body")
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_responses_without_validators_are_not_cached(self):
+        cache = ResponseCache(self.tmp.name)
+        cache.store("http://a/", b"body")
+
+        self.assertIsNone(cache.load("http://a/"))
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.tmp.name, max_bytes=10)
+        cache.store("http://a/", b"aaaa", etag="a")
+        cache.store("http://b/", b"bbbb", etag="b")
+        cache.load("http://a/")
+        cache.store("http://c/", b"cccc", etag="c")
+
+        self.assertIsNotNone(cache.load("http://a/"))
+        self.assertIsNone(cache.load("http://b/"))
+        self.assertIsNotNone(cache.load("http://c/"))
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+
+class TestFetchClientCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_not_modified_reuses_cached_body(self):
+        client = FetchClient(cache=ResponseCache(self.tmp.name))
+        responses = [
+            make_response(200, b"<html>v1</html>", {"ETag": '"v1"'}),
+            make_response(304),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            first = client.fetch("http://a/")
+            second = client.fetch("http://a/")
+
+        self.assertEqual(first, b"<html>v1</html>")
+        self.assertEqual(second, b"<html>v1</html>")
+        self.assertEqual(mock_get.call_args_list[1].kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertEqual(client.cache.stats()["hits"], 1)
+
+    def test_modified_page_replaces_cached_body(self):
+        client = FetchClient(cache=ResponseCache(self.tmp.name))
+        responses = [
+            make_response(200, b"v1", {"ETag": '"v1"'}),
+            make_response(200, b"v2", {"ETag": '"v2"'}),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses):
+            client.fetch("http://a/")
+            self.assertEqual(client.fetch("http://a/"), b"v2")
+
+        self.assertEqual(client.cache.conditional_headers("http://a/"), {"If-None-Match": '"v2"'})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from tests.test_extract import SAMPLE_HTML
+from utils import incremental
+from utils.fetch import FetchClient
+from utils.fields import FIELDS, SCHEMA, spec_version
+from utils.http_cache import ResponseCache
+from utils.incremental import PageStore, scrape_incremental
+
+
+def catalogue(pages):
+    """Builds a fake fetch function serving the given {page: title} catalogue."""
+    def fetch(url, client=None):
+        page = 1 if url.endswith("/") else int(url.rsplit("page", 1)[1])
+        if page not in pages:
+            return None
+        html = SAMPLE_HTML.replace("T-shirt 2", pages[page])
+        return f"<html><body>{html}</body></html>".encode("utf-8")
+    return fetch
+
+
+class TestIncrementalScrape(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_scrape(self, pages, version=SCHEMA.version):
+        with patch("utils.extract.fetching_content", side_effect=catalogue(pages)), \
+                patch("utils.incremental.parse_page", wraps=incremental.parse_page) as mock_parse:
+            result = scrape_incremental("http://example.com/", max_pages=10, delay=0,
+                                        store=PageStore(self.tmp.name, version=version))
+        return result, mock_parse.call_count
+
+    def test_first_run_parses_every_page(self):
+        result, parsed = self.run_scrape({1: "Shirt A", 2: "Shirt B"})
+
+        self.assertEqual(parsed, 2)
+        self.assertEqual([row["Title"] for row in result.rows], ["Shirt A", "Shirt B"])
+        self.assertEqual(result.rows, result.changed)
+
+    def test_unchanged_pages_are_not_parsed_again(self):
+        self.run_scrape({1: "Shirt A", 2: "Shirt B", 3: "Shirt C"})
+        result, parsed = self.run_scrape({1: "Shirt A", 2: "Shirt B2", 3: "Shirt C"})
+
+        self.assertEqual(parsed, 1)
+        self.assertEqual((result.pages_changed, result.pages_unchanged), (1, 2))
+        self.assertEqual([row["Title"] for row in result.rows], ["Shirt A", "Shirt B2", "Shirt C"])
+        self.assertEqual([row["Title"] for row in result.changed], ["Shirt B2"])
+        self.assertEqual(result.rows[0]["Price (IDR)"], 1634400)
+
+    def test_reused_rows_are_dated_by_the_current_fetch(self):
+        first, _ = self.run_scrape({1: "Shirt A"})
+        with patch("utils.incremental.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime(2030, 1, 1, 12)
+            second, parsed = self.run_scrape({1: "Shirt A"})
+
+        self.assertEqual(parsed, 0)
+        self.assertNotEqual(first.rows[0]["Timestamp"], second.rows[0]["Timestamp"])
+        self.assertEqual(second.rows[0]["Timestamp"], "2030-01-01T12:00:00")
+        self.assertEqual(list(second.rows[0]), list(first.rows[0]))
+
+    def test_rows_cleaned_by_other_field_specs_are_cleaned_again(self):
+        self.run_scrape({1: "Shirt A", 2: "Shirt B"})
+        _, parsed = self.run_scrape({1: "Shirt A", 2: "Shirt B"}, version=spec_version(FIELDS[:-1]))
+        self.assertEqual(parsed, 2)
+
+        _, parsed = self.run_scrape({1: "Shirt A", 2: "Shirt B"}, version=spec_version(FIELDS[:-1]))
+        self.assertEqual(parsed, 0)
+
+    def test_fetch_stats_describe_only_the_latest_run(self):
+        client = FetchClient(cache=ResponseCache(os.path.join(self.tmp.name, "http")))
+        client.histogram.observe(0.5)
+        client.cache.hits = 7
+
+        with patch("utils.extract.fetching_content", side_effect=catalogue({1: "Shirt A"})), \
+                redirect_stdout(StringIO()) as stdout:
+            scrape_incremental("http://example.com/", max_pages=10, delay=0,
+                               store=PageStore(os.path.join(self.tmp.name, "pages")), client=client)
+
+        self.assertEqual(client.histogram.count, 0)
+        self.assertEqual(client.cache.hits, 0)
+        self.assertIn("[INFO] Page fetch latency:", stdout.getvalue())
+        self.assertIn("[INFO] Page cache: {'hits': 0", stdout.getvalue())
+
+    def test_pages_that_disappear_are_pruned(self):
+        self.run_scrape({1: "Shirt A", 2: "Shirt B"})
+        self.run_scrape({1: "Shirt A"})
+
+        self.assertEqual(list(PageStore(self.tmp.name).manifest), ["http://example.com/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pandas as pd
 
-from utils.load import save_to_csv, save_to_google_sheets, load_to_postgresql
+from utils.history import append_csv_atomic
+from utils.load import save_to_csv, save_to_google_sheets, load_to_postgresql, load_changes_to_postgresql, \
+    stream_to_csv, stream_to_postgresql, run_sinks
 
 
 class TestLoadFunctions(unittest.TestCase):
@@ -14,42 +19,145 @@ class TestLoadFunctions(unittest.TestCase):
             'Age': [30, 25],
             'Timestamp': ['2024-01-01', '2024-01-02']
         })
+        self.products = pd.DataFrame({
+            "Title": ["T-shirt 2", "Hoodie, \"Zip\""],
+            "Price (IDR)": [1634400.0, 800000.0],
+            "Rating": [3.9, 4.5],
+            "Colors": [3, 5],
+            "Size": ["M", "L"],
+            "Gender": ["Women", "Unisex"],
+            "Timestamp": pd.to_datetime(["2025-01-01T10:00:00", "2025-01-01T10:00:01"]),
+        })
 
     @patch("pandas.DataFrame.to_csv")
     def test_save_to_csv(self, mock_to_csv):
         save_to_csv(self.df, "test.csv")
         mock_to_csv.assert_called_once_with("test.csv", index=False)
 
-    @patch("utils.load.Credentials.from_service_account_file")
-    @patch("utils.load.build")
-    def test_save_to_google_sheets(self, mock_build, mock_credentials):
-        mock_service = MagicMock()
-        mock_sheet = mock_service.spreadsheets.return_value
-        mock_values = mock_sheet.values.return_value
-        mock_values.update.return_value.execute.return_value = None
-
-        mock_credentials.return_value.with_scopes.return_value = MagicMock()
-        mock_build.return_value = mock_service
-
+    @patch("utils.load.write_frame", return_value=9)
+    def test_save_to_google_sheets(self, mock_write_frame):
         spreadsheet_id = "dummy_spreadsheet_id"
         range_name = "Sheet1!A1"
 
         save_to_google_sheets(self.df, spreadsheet_id, range_name)
 
-        mock_build.assert_called_once_with('sheets', 'v4',
-                                           credentials=mock_credentials.return_value.with_scopes.return_value)
-        mock_values.update.assert_called_once()
+        mock_write_frame.assert_called_once_with(self.df, spreadsheet_id, range_name)
 
-    @patch("utils.load.create_engine")
-    @patch("pandas.DataFrame.to_sql")
-    def test_load_to_postgresql(self, mock_to_sql, mock_create_engine):
-        mock_engine = MagicMock()
-        mock_create_engine.return_value = mock_engine
+    @patch("utils.load.timed_upsert")
+    def test_load_to_postgresql(self, mock_upsert):
+        load_to_postgresql(self.products, "fashion_products")
 
+        mock_upsert.assert_called_once_with(self.products, "fashion_products")
+
+    @patch("utils.load.timed_upsert", side_effect=ValueError("missing natural key"))
+    def test_load_to_postgresql_reports_errors(self, mock_upsert):
         load_to_postgresql(self.df, "people")
 
-        mock_create_engine.assert_called_once()
-        mock_to_sql.assert_called_once_with("people", mock_engine, if_exists='replace', index=False)
+        mock_upsert.assert_called_once()
+
+    @patch("utils.load.apply_changes")
+    def test_load_changes_to_postgresql(self, mock_apply):
+        deleted = self.products.iloc[:1]
+
+        self.assertTrue(load_changes_to_postgresql(self.products, deleted, "fashion_products"))
+        mock_apply.assert_called_once_with(self.products, deleted, "fashion_products")
+
+    @patch("utils.load.apply_changes", side_effect=RuntimeError("connection refused"))
+    def test_load_changes_to_postgresql_reports_errors(self, mock_apply):
+        self.assertFalse(load_changes_to_postgresql(self.products, self.products, "fashion_products"))
+
+    def test_stream_to_csv_writes_header_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.csv")
+            passed = list(stream_to_csv(iter([self.df, self.df]), filename))
+
+            self.assertEqual(len(passed), 2)
+            self.assertTrue(pd.read_csv(filename).equals(pd.concat([self.df, self.df], ignore_index=True)))
+
+    def test_stream_to_csv_appends_to_the_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.csv")
+            append_csv_atomic(self.df, filename)
+
+            list(stream_to_csv(iter([self.df, self.df]), filename))
+
+            self.assertTrue(pd.read_csv(filename).equals(pd.concat([self.df] * 3, ignore_index=True)))
+
+    def test_abandoned_stream_leaves_the_history_as_it_was(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.csv")
+            append_csv_atomic(self.df, filename)
+
+            stream = stream_to_csv(iter([self.df, self.df]), filename)
+            next(stream)
+            stream.close()
+
+            self.assertTrue(pd.read_csv(filename).equals(self.df))
+
+    def test_stream_to_csv_leaves_file_untouched_when_empty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.csv")
+            list(stream_to_csv(iter([]), filename))
+
+            self.assertFalse(os.path.exists(filename))
+
+    @patch("utils.load.timed_upsert")
+    def test_stream_to_postgresql_upserts_every_chunk(self, mock_upsert):
+        passed = list(stream_to_postgresql(iter([self.products, self.products]), "fashion_products"))
+
+        self.assertEqual(len(passed), 2)
+        self.assertEqual(mock_upsert.call_count, 2)
+
+    @patch("utils.load.timed_upsert", side_effect=RuntimeError("connection refused"))
+    def test_stream_to_postgresql_passes_chunks_through_after_failure(self, mock_upsert):
+        passed = list(stream_to_postgresql(iter([self.products, self.products]), "fashion_products"))
+
+        self.assertEqual(len(passed), 2)
+        mock_upsert.assert_called_once()
+
+
+class TestRunSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({"Title": ["A", "B"], "Timestamp": pd.to_datetime(["2025-01-01", "2025-01-02"])})
+
+    def test_sinks_run_concurrently(self):
+        def slow_sink(df):
+            time.sleep(0.2)
+
+        start = time.perf_counter()
+        results = run_sinks(self.df, {"a": slow_sink, "b": slow_sink, "c": slow_sink})
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual([result.name for result in results], ["a", "b", "c"])
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_sinks_cannot_see_each_others_mutations(self):
+        seen = {}
+
+        def mutating_sink(df):
+            df["Timestamp"] = df["Timestamp"].astype(str)
+            df.loc[0, "Title"] = "changed"
+
+        def reading_sink(df):
+            time.sleep(0.05)
+            seen["dtype"] = df["Timestamp"].dtype
+            seen["title"] = df.loc[0, "Title"]
+
+        run_sinks(self.df, {"mutating": mutating_sink, "reading": reading_sink})
+
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(seen["dtype"]))
+        self.assertEqual(seen["title"], "A")
+        self.assertEqual(self.df.loc[0, "Title"], "A")
+
+    def test_failures_are_reported(self):
+        def raising_sink(df):
+            raise RuntimeError("boom")
+
+        results = run_sinks(self.df, {"ok": lambda df: True, "raises": raising_sink, "false": lambda df: False})
+
+        self.assertEqual([result.ok for result in results], [True, False, False])
+        self.assertEqual(results[1].error, "boom")
 
 
 if __name__ == "__main__":
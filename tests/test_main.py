@@ -0,0 +1,138 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import main
+from utils.incremental import IncrementalResult
+
+
+class TestArguments(unittest.TestCase):
+
+    def test_defaults(self):
+        args = main.parse_args([])
+
+        # No page limit: batch runs discover the page count
+        self.assertIsNone(args.max_pages)
+        self.assertFalse(args.no_discover)
+        self.assertEqual(args.delay, main.DELAY)
+        self.assertEqual(args.sinks, main.DEFAULT_SINKS)
+
+    def test_sink_selection(self):
+        args = main.parse_args(["--sinks", "postgresql, csv,csv", "--max-pages", "3", "--delay", "0.5"])
+
+        self.assertEqual(args.sinks, ("postgresql", "csv"))
+        self.assertEqual((args.max_pages, args.delay), (3, 0.5))
+
+    def test_unknown_sink_is_rejected(self):
+        with self.assertRaises(SystemExit), redirect_stderr(StringIO()) as stderr:
+            main.parse_args(["--sinks", "csv,mongodb"])
+
+        self.assertIn("unknown sink(s): mongodb", stderr.getvalue())
+
+    def test_dry_run_selects_no_sinks(self):
+        self.assertEqual(main.parse_args(["--dry-run"]).sinks, ())
+
+    def test_build_sinks_only_builds_selected(self):
+        self.assertEqual(list(main.build_sinks(("postgresql", "csv"))), ["postgresql", "csv"])
+
+    def test_startup_does_not_import_sink_dependencies(self):
+        code = ("import sys, main; "
+                "print(sorted(m for m in ('pandas', 'sqlalchemy', 'googleapiclient', 'pyarrow') if m in sys.modules))")
+
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+def scraped(*titles):
+    rows = [{"Title": title, "Price (IDR)": 160000, "Rating": 4.5, "Colors": 3, "Size": "M", "Gender": "Men",
+             "Timestamp": "2025-01-01T10:00:00"} for title in titles]
+    return IncrementalResult(rows, rows, 1, 0)
+
+
+class TestBatchRun(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.loaded = []
+        self.fail = False
+        self.sinks = {"postgresql": self.sink}
+        for patcher in (
+                mock.patch("utils.checkpoint.CHECKPOINT_DIR", os.path.join(tmp.name, "runs")),
+                mock.patch.object(main, "INDEX_FILE", os.path.join(tmp.name, "products.sqlite")),
+                mock.patch.object(main, "build_sinks", lambda names, **kwargs: dict(self.sinks)),
+                mock.patch.object(main, "get_client", lambda: None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sink(self, df):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.loaded.append(sorted(df["Title"]))
+
+    def run_batch(self, result, *argv):
+        with mock.patch("utils.incremental.scrape_incremental", return_value=result), redirect_stdout(StringIO()):
+            return main.run_batch(main.parse_args(["--sinks", "postgresql", *argv]))
+
+    def test_failed_load_is_retried_by_the_next_plain_run(self):
+        self.fail = True
+        self.assertEqual(self.run_batch(scraped("A", "B")), 1)
+
+        self.fail = False
+        self.assertEqual(self.run_batch(scraped("A", "B", "C")), 0)
+        self.assertEqual(self.run_batch(scraped("A", "B", "C")), 0)
+
+        # The failed run's products reach the sink with the next run, and are not reloaded after that
+        self.assertEqual(self.loaded, [["A", "B", "C"]])
+
+    def test_full_load_updates_the_index(self):
+        self.assertEqual(self.run_batch(scraped("A", "B"), "--full-load"), 0)
+        self.assertEqual(self.run_batch(scraped("A", "B"), "--full-load"), 0)
+        self.assertEqual(self.run_batch(scraped("A", "B", "C")), 0)
+
+        self.assertEqual(self.loaded, [["A", "B"], ["A", "B"], ["C"]])
+
+    def test_unchanged_run_still_loads_the_snapshot_sinks(self):
+        snapshots = []
+        self.sinks["analytics"] = lambda df: snapshots.append(len(df))
+
+        self.assertEqual(self.run_batch(scraped("A", "B")), 0)
+        self.assertEqual(self.run_batch(scraped("A", "B")), 0)
+
+        self.assertEqual(len(self.loaded), 1)
+        self.assertEqual(len(snapshots), 2)
+
+
+
+class TestStreamingRun(unittest.TestCase):
+
+    def run_streaming(self, *argv):
+        raw = [{"Title": "A", "Price": "$10.00", "Rating": "Rating: ⭐4.5 / 5", "Colors": "3 Colors",
+                "Size": "Size: M", "Gender": "Gender: Men", "Timestamp": "2025-01-01T10:00:00"}]
+        with mock.patch("utils.extract.iter_scrape", return_value=iter(raw)), \
+                mock.patch.object(main, "get_client", lambda: None), redirect_stdout(StringIO()) as stdout:
+            return main.run_streaming(main.parse_args(["--stream", *argv])), stdout.getvalue()
+
+    def test_failed_postgresql_load_fails_the_run(self):
+        with mock.patch("utils.load.timed_upsert", side_effect=RuntimeError("connection refused")):
+            code, output = self.run_streaming("--sinks", "postgresql")
+
+        self.assertEqual(code, 1)
+        self.assertIn("failed sink(s): postgresql", output)
+
+    def test_successful_stream(self):
+        with mock.patch("utils.load.timed_upsert"):
+            code, output = self.run_streaming("--sinks", "postgresql")
+
+        self.assertEqual(code, 0)
+        self.assertIn("completed successfully (1 rows)", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import MagicMock
+
+from utils import metrics
+from utils.extract import fetching_content
+from utils.metrics import Metrics, timed, timer
+from utils.transform import clean_data
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.METRICS.reset()
+        self.addCleanup(metrics.METRICS.reset)
+
+    def test_counters_gauges_and_summaries(self):
+        registry = Metrics()
+        registry.increment("rows_total", 3, stage="clean")
+        registry.increment("rows_total", 2, stage="clean")
+        registry.set_gauge("pages_per_second", 4.5)
+        registry.observe("stage_seconds", 0.5, stage="load")
+        registry.observe("stage_seconds", 1.5, stage="load")
+
+        self.assertEqual(registry.value("rows_total", stage="clean"), 5)
+        self.assertEqual(registry.value("pages_per_second"), 4.5)
+        self.assertEqual(registry.value("stage_seconds", stage="load"), (2, 2.0, 1.5))
+        self.assertIsNone(registry.value("rows_total", stage="load"))
+
+    def test_prometheus_text(self):
+        registry = Metrics()
+        registry.increment("etl_rows_total", 5, stage='say "hi"')
+        registry.observe("etl_stage_seconds", 0.25, stage="scrape")
+
+        text = registry.to_prometheus()
+
+        self.assertIn("# TYPE etl_rows_total counter", text)
+        self.assertIn('etl_rows_total{stage="say \\"hi\\""} 5', text)
+        self.assertIn('etl_stage_seconds_count{stage="scrape"} 1', text)
+        self.assertIn('etl_stage_seconds_sum{stage="scrape"} 0.250000', text)
+
+    def test_write_json_and_prometheus(self):
+        registry = Metrics()
+        registry.increment("etl_pages_fetched_total")
+
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(StringIO()):
+            registry.write(os.path.join(tmp, "metrics.json"))
+            registry.write(os.path.join(tmp, "metrics.prom"))
+
+            with open(os.path.join(tmp, "metrics.json")) as f:
+                snapshot = json.load(f)
+            with open(os.path.join(tmp, "metrics.prom")) as f:
+                text = f.read()
+
+            self.assertEqual(sorted(os.listdir(tmp)), ["metrics.json", "metrics.prom"])
+
+        self.assertEqual(snapshot["counters"], [{"name": "etl_pages_fetched_total", "labels": {}, "value": 1}])
+        self.assertIn("etl_pages_fetched_total 1", text)
+
+    def test_timer_logs_fields(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            with timer("clean_data") as span:
+                span["rows_in"] = 3
+
+        self.assertRegex(output.getvalue(), r"\[INFO\] stage=clean_data seconds=\d+\.\d{4} rows_in=3")
+        self.assertEqual(metrics.METRICS.value(metrics.STAGE_SECONDS, stage="clean_data")[0], 1)
+
+    def test_timed_records_failures_too(self):
+        @timed("load_csv", log=False)
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            fail()
+
+        self.assertEqual(metrics.METRICS.value(metrics.STAGE_SECONDS, stage="load_csv")[0], 1)
+
+    def test_profiles_are_dumped_per_stage(self):
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(StringIO()):
+            metrics.enable_profiling(tmp)
+            self.addCleanup(metrics.enable_profiling, None)
+            self.addCleanup(metrics._profiles.clear)
+
+            with timer("outer", profile=True):
+                with timer("inner", profile=True):
+                    sum(range(1000))
+
+            paths = metrics.dump_profiles()
+
+            # Nested stages are covered by the enclosing profile
+            self.assertEqual([os.path.basename(path) for path in paths], ["outer.prof"])
+            self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+
+    def test_fetching_content_counts_bytes(self):
+        client = MagicMock()
+        client.fetch.return_value = b"<html></html>"
+
+        fetching_content("http://example.com/", client=client)
+
+        self.assertEqual(metrics.METRICS.value(metrics.PAGES_FETCHED), 1)
+        self.assertEqual(metrics.METRICS.value(metrics.BYTES_FETCHED), 13)
+
+    def test_clean_data_counts_dropped_rows(self):
+        valid = {"Title": "T-shirt 2", "Price": "$102.15", "Rating": "Rating: ⭐ 3.9 / 5", "Colors": "3 Colors",
+                 "Size": "Size: M", "Gender": "Gender: Women"}
+        invalid = dict(valid, Title="Unknown Product")
+
+        with redirect_stdout(StringIO()):
+            clean_data([valid, valid, invalid])
+
+        self.assertEqual(metrics.METRICS.value(metrics.ROWS_IN, stage="clean_data"), 3)
+        self.assertEqual(metrics.METRICS.value(metrics.ROWS_OUT, stage="clean_data"), 1)
+        self.assertEqual(metrics.METRICS.value(metrics.ROWS_DROPPED, reason="invalid"), 1)
+        self.assertEqual(metrics.METRICS.value(metrics.ROWS_DROPPED, reason="duplicate"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
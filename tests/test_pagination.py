@@ -0,0 +1,144 @@
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks.fixtures import SyntheticClient, catalogue_page
+from utils.checkpoint import RunCheckpoint
+from utils.incremental import PageStore, scrape_incremental
+from utils.pagination import discover_page_count, iter_pages_unordered, pagination_hint
+
+BASE_URL = "http://example.com/"
+SIZES = (0, 1, 2, 3, 7, 8, 50, 130)
+
+
+class TestPaginationHint(unittest.TestCase):
+
+    def test_highest_linked_page(self):
+        self.assertEqual(pagination_hint(catalogue_page(1, cards_per_page=1, links=range(1, 6))), 5)
+
+    def test_page_without_links(self):
+        self.assertEqual(pagination_hint(catalogue_page(1, cards_per_page=1)), 1)
+        self.assertEqual(pagination_hint(None), 1)
+
+
+class TestDiscoverPageCount(unittest.TestCase):
+
+    def discover(self, client, max_pages=None):
+        with redirect_stdout(StringIO()):
+            return discover_page_count(BASE_URL, client=client, max_pages=max_pages)
+
+    def test_probing_without_pagination(self):
+        for pages in SIZES:
+            with self.subTest(pages=pages):
+                client = SyntheticClient(pages, cards_per_page=1)
+                count, prefetched = self.discover(client)
+
+                self.assertEqual(count, pages)
+                self.assertTrue(set(prefetched) <= set(range(1, pages + 1)))
+                # Exponential probe plus binary search: O(log n) requests, never a linear walk
+                self.assertLessEqual(len(client.requested), 2 * max(pages, 1).bit_length() + 1)
+
+    def test_pagination_links_to_the_last_page(self):
+        for pages in SIZES[1:]:
+            with self.subTest(pages=pages):
+                client = SyntheticClient(pages, cards_per_page=1, pagination_window=1000)
+                count, _ = self.discover(client)
+
+                self.assertEqual(count, pages)
+                # Page 1, the linked last page and the page after it
+                self.assertLessEqual(len(client.requested), 3)
+
+    def test_pagination_window_shorter_than_the_catalogue(self):
+        for pages in SIZES[1:]:
+            with self.subTest(pages=pages):
+                client = SyntheticClient(pages, cards_per_page=1, pagination_window=5)
+                self.assertEqual(self.discover(client)[0], pages)
+
+    def test_stale_pagination_links_beyond_the_catalogue(self):
+        client = SyntheticClient(7, cards_per_page=1)
+        stale = catalogue_page(1, cards_per_page=1, links=range(1, 21))
+        client.fetch = lambda url, fetch=client.fetch: stale if url == BASE_URL else fetch(url)
+
+        self.assertEqual(self.discover(client)[0], 7)
+
+    def test_max_pages_caps_the_count(self):
+        client = SyntheticClient(130, cards_per_page=1)
+        count, _ = self.discover(client, max_pages=10)
+
+        self.assertEqual(count, 10)
+        self.assertNotIn(f"{BASE_URL}page11", client.requested)
+
+    def test_page_without_cards_ends_the_catalogue(self):
+        client = SyntheticClient(5, cards_per_page=1)
+        client.fetch = lambda url, fetch=client.fetch: b"<html></html>" if url.endswith("page4") else fetch(url)
+
+        self.assertEqual(self.discover(client)[0], 3)
+
+
+class TestIterPagesUnordered(unittest.TestCase):
+
+    def test_fetches_every_page_of_the_work_list(self):
+        client = SyntheticClient(20, cards_per_page=1)
+        with redirect_stdout(StringIO()):
+            fetched = list(iter_pages_unordered(BASE_URL, range(1, 21), workers=4, client=client,
+                                                prefetched={1: b"prefetched collection-card"}))
+
+        self.assertEqual(sorted(page for page, _, _ in fetched), list(range(1, 21)))
+        self.assertEqual(fetched[0], (1, BASE_URL, b"prefetched collection-card"))
+        self.assertNotIn(BASE_URL, client.requested)
+        self.assertEqual(len(client.requested), 19)
+
+    def test_missing_page_is_skipped(self):
+        client = SyntheticClient(3, cards_per_page=1)
+        with redirect_stdout(StringIO()) as stdout:
+            fetched = list(iter_pages_unordered(BASE_URL, [1, 2, 5, 3], workers=2, client=client))
+
+        self.assertEqual(sorted(page for page, _, _ in fetched), [1, 2, 3])
+        self.assertIn("[WARN] No content on page 5", stdout.getvalue())
+
+    def test_workers_do_not_burst_past_the_delay(self):
+        client = SyntheticClient(5, cards_per_page=1)
+        start = time.monotonic()
+        with redirect_stdout(StringIO()):
+            list(iter_pages_unordered(BASE_URL, range(1, 6), delay=0.02, workers=4, client=client))
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.075)
+
+
+class TestDiscoveredScrape(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def scrape(self, client, checkpoint=None):
+        with redirect_stdout(StringIO()), tempfile.TemporaryDirectory() as store:
+            return scrape_incremental(BASE_URL, max_pages=None, delay=0, store=PageStore(store),
+                                      workers=3, client=client, checkpoint=checkpoint, discover=True)
+
+    def test_rows_of_every_page_in_page_order(self):
+        for pages in (0, 1, 9, 40):
+            with self.subTest(pages=pages):
+                result = self.scrape(SyntheticClient(pages, cards_per_page=2, pagination_window=3))
+
+                self.assertEqual([row["Title"] for row in result.rows], [f"T-shirt {i}" for i in range(2 * pages)])
+                self.assertEqual(result.pages_changed, pages)
+
+    def test_resume_fetches_only_the_missing_pages(self):
+        checkpoint = RunCheckpoint.start(f"{self.tmp.name}/runs")
+        checkpoint.save_page(2, f"{BASE_URL}page2", [{"Title": "Checkpointed", "Price (IDR)": 1, "Rating": 4.0}])
+        client = SyntheticClient(4, cards_per_page=1)
+
+        result = self.scrape(client, checkpoint)
+
+        # Page 2 may be probed during discovery, but its checkpointed rows are kept
+        self.assertLessEqual(client.requested.count(f"{BASE_URL}page2"), 1)
+        self.assertEqual((result.pages_changed, result.pages_unchanged), (3, 1))
+        self.assertEqual([row["Title"] for row in result.rows], ["T-shirt 0", "Checkpointed", "T-shirt 2", "T-shirt 3"])
+        self.assertEqual(checkpoint.completed_pages(), [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
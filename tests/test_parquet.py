@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from tests.test_fields import MATERIAL
+from utils.fields import FIELDS, FieldSchema
+from utils.parquet import pa, read_parquet, save_to_parquet
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestParquetSink(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.df = pd.DataFrame({
+            "Title": ["T-shirt 2", "Hoodie 3", "Pants 4"],
+            "Price (IDR)": [1634400.0, 800000.0, 480000.0],
+            "Rating": [3.9, 4.5, 4.0],
+            "Colors": [3, 5, 2],
+            "Size": ["M", "L", "S"],
+            "Gender": ["Women", "Unisex", "Men"],
+            "Timestamp": pd.to_datetime(["2025-01-01T10:00:00", "2025-01-02T09:00:00", "2025-01-02T11:00:00"]),
+        })
+
+    def test_partitions_by_scrape_date(self):
+        written = save_to_parquet(self.df, self.tmp.name, run_id="run1")
+
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["scrape_date=2025-01-01", "scrape_date=2025-01-02"])
+        self.assertEqual(len(written), 2)
+
+    def test_round_trip_keeps_dtypes(self):
+        save_to_parquet(self.df, self.tmp.name, run_id="run1")
+        result = read_parquet(self.tmp.name).sort_values("Title").reset_index(drop=True)
+        expected = self.df.sort_values("Title").reset_index(drop=True)
+
+        self.assertEqual(result["Colors"].dtype, "int64")
+        self.assertEqual(result["Price (IDR)"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result["Timestamp"]))
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+    def test_appending_adds_files_without_rewriting(self):
+        first = save_to_parquet(self.df, self.tmp.name, run_id="run1")
+        mtimes = [os.path.getmtime(path) for path in first]
+        save_to_parquet(self.df, self.tmp.name, run_id="run2")
+
+        self.assertEqual([os.path.getmtime(path) for path in first], mtimes)
+        self.assertEqual(len(read_parquet(self.tmp.name)), 6)
+        self.assertEqual(len(read_parquet(self.tmp.name, filters=[("scrape_date", "=", "2025-01-02")])), 4)
+
+    def test_new_fields_get_a_column(self):
+        save_to_parquet(self.df, self.tmp.name, run_id="run1")
+        extended = self.df.assign(Material=["cotton", "wool", None])
+
+        with patch("utils.parquet.SCHEMA", FieldSchema(FIELDS + (MATERIAL,))):
+            save_to_parquet(extended, self.tmp.name, run_id="run2")
+            result = read_parquet(self.tmp.name)
+
+        self.assertEqual(sorted(result["Material"].dropna()), ["cotton", "wool"])
+        self.assertEqual(result["Material"].isna().sum(), 4)
+
+    def test_duplicate_run_id_is_rejected(self):
+        save_to_parquet(self.df, self.tmp.name, run_id="run1")
+
+        with self.assertRaises(FileExistsError):
+            save_to_parquet(self.df, self.tmp.name, run_id="run1")
+
+
+if __name__ == "__main__":
+    unittest.main()
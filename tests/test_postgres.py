@@ -0,0 +1,181 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+
+from tests.test_fields import MATERIAL
+from utils import postgres
+from utils.fields import FIELDS, FieldSchema
+from utils.postgres import CsvStream, apply_changes, copy_delete, copy_upsert, drop_table, ensure_schema, \
+    get_engine, timed_upsert
+
+
+class TestPostgresSink(unittest.TestCase):
+
+    def setUp(self):
+        self.products = pd.DataFrame({
+            "Title": ["T-shirt 2", "Hoodie, \"Zip\""],
+            "Price (IDR)": [1634400.0, 800000.0],
+            "Rating": [3.9, 4.5],
+            "Colors": [3, 5],
+            "Size": ["M", None],
+            "Gender": ["Women", "Unisex"],
+            "Timestamp": pd.to_datetime(["2025-01-01T10:00:00", "2025-01-01T10:00:01"]),
+        })
+
+    @patch("utils.postgres.ensure_schema")
+    def test_copy_upsert(self, mock_ensure_schema):
+        connection = MagicMock()
+        cursor = connection.connection.cursor.return_value
+
+        rows = copy_upsert(connection, self.products, "fashion_products")
+
+        self.assertEqual(rows, 2)
+        mock_ensure_schema.assert_called_once_with(connection, "fashion_products")
+        statements = [c.args[0] for c in connection.exec_driver_sql.call_args_list]
+        self.assertIn('CREATE TEMP TABLE "fashion_products_staging"', statements[0])
+        self.assertIn('ON CONFLICT ("Title", "Price (IDR)", "Rating") DO UPDATE SET "Colors" = EXCLUDED."Colors"',
+                      statements[-1])
+
+        copy_sql, stream = cursor.copy_expert.call_args.args
+        self.assertTrue(copy_sql.startswith('COPY "fashion_products_staging"'))
+        self.assertEqual(stream.read(), self.products.to_csv(index=False, header=False, na_rep=r"\N").encode())
+        cursor.close.assert_called_once()
+
+    def test_copy_upsert_requires_natural_key(self):
+        connection = MagicMock()
+
+        with self.assertRaises(ValueError):
+            copy_upsert(connection, self.products.drop(columns=["Rating"]), "fashion_products")
+        connection.exec_driver_sql.assert_not_called()
+
+    def test_csv_stream_reads_in_chunks(self):
+        stream = CsvStream(self.products, chunk_rows=1)
+        expected = self.products.to_csv(index=False, header=False, na_rep=r"\N").encode()
+
+        self.assertEqual(b"".join(iter(lambda: stream.read(7), b"")), expected)
+
+    @patch("utils.postgres.ensure_schema")
+    def test_copy_delete(self, mock_ensure_schema):
+        connection = MagicMock()
+        cursor = connection.connection.cursor.return_value
+
+        rows = copy_delete(connection, self.products, "fashion_products")
+
+        self.assertEqual(rows, 2)
+        statements = [c.args[0] for c in connection.exec_driver_sql.call_args_list]
+        self.assertIn('CREATE TEMP TABLE "fashion_products_deleted"', statements[0])
+        self.assertEqual(statements[-1], 'DELETE FROM "fashion_products" t USING "fashion_products_deleted" s '
+                                         'WHERE t."Title" = s."Title" AND t."Price (IDR)" = s."Price (IDR)" '
+                                         'AND t."Rating" = s."Rating"')
+
+        _, stream = cursor.copy_expert.call_args.args
+        keys = self.products[["Title", "Price (IDR)", "Rating"]]
+        self.assertEqual(stream.read(), keys.to_csv(index=False, header=False, na_rep=r"\N").encode())
+
+    def test_copy_delete_skips_empty_keys(self):
+        connection = MagicMock()
+
+        self.assertEqual(copy_delete(connection, self.products.iloc[:0], "fashion_products"), 0)
+        connection.exec_driver_sql.assert_not_called()
+
+    @patch("utils.postgres.copy_delete", return_value=1)
+    @patch("utils.postgres.copy_upsert", return_value=2)
+    def test_apply_changes_runs_in_one_transaction(self, mock_copy_upsert, mock_copy_delete):
+        engine = MagicMock()
+        connection = engine.begin.return_value.__enter__.return_value
+
+        deleted = self.products.iloc[:1]
+
+        apply_changes(self.products, deleted, "fashion_products", engine=engine)
+
+        engine.begin.assert_called_once()
+        mock_copy_upsert.assert_called_once_with(connection, self.products, "fashion_products")
+        self.assertEqual(mock_copy_delete.call_args.args[0], connection)
+        self.assertIs(mock_copy_delete.call_args.args[1], deleted)
+
+    @patch("utils.postgres.copy_upsert", return_value=2)
+    def test_timed_upsert_runs_in_a_transaction(self, mock_copy_upsert):
+        engine = MagicMock()
+
+        elapsed = timed_upsert(self.products, "fashion_products", engine=engine)
+
+        self.assertGreaterEqual(elapsed, 0)
+        engine.begin.assert_called_once()
+        mock_copy_upsert.assert_called_once_with(engine.begin.return_value.__enter__.return_value,
+                                                 self.products, "fashion_products")
+
+
+class TestSchemaManagement(unittest.TestCase):
+
+    def setUp(self):
+        postgres._ensured_tables.clear()
+        self.engine = create_engine("sqlite://")
+
+    def test_ensure_schema_creates_table_key_and_indexes(self):
+        ensure_schema(self.engine, "fashion_products")
+
+        inspector = inspect(self.engine)
+        self.assertEqual(inspector.get_pk_constraint("fashion_products")["constrained_columns"],
+                         ["Title", "Price (IDR)", "Rating"])
+        self.assertEqual(sorted(index["name"] for index in inspector.get_indexes("fashion_products")),
+                         ["ix_fashion_products_gender", "ix_fashion_products_timestamp", "ix_fashion_products_title"])
+
+    def test_ensure_schema_is_idempotent(self):
+        ensure_schema(self.engine, "fashion_products")
+        postgres._ensured_tables.clear()
+        ensure_schema(self.engine, "fashion_products")
+
+        self.assertEqual(len(inspect(self.engine).get_indexes("fashion_products")), 3)
+
+    def test_schema_is_committed_apart_from_a_failed_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'products.sqlite')}")
+            self.addCleanup(engine.dispose)
+            with self.assertRaises(RuntimeError):
+                with engine.begin() as connection:
+                    ensure_schema(connection, "fashion_products")
+                    connection.exec_driver_sql('INSERT INTO fashion_products ("Title", "Price (IDR)", "Rating") '
+                                               "VALUES ('A', 1.0, 4.5)")
+                    raise RuntimeError("load failed")
+
+            inspector = inspect(engine)
+            self.assertTrue(inspector.has_table("fashion_products"))
+            with engine.connect() as connection:
+                self.assertEqual(connection.exec_driver_sql("SELECT COUNT(*) FROM fashion_products").scalar(), 0)
+
+    def test_ensure_schema_follows_the_field_specs(self):
+        ensure_schema(self.engine, "fashion_products")
+        postgres._ensured_tables.clear()
+
+        with patch("utils.postgres.SCHEMA", FieldSchema(FIELDS + (MATERIAL,))):
+            ensure_schema(self.engine, "fashion_products")
+
+        columns = {column["name"]: column for column in inspect(self.engine).get_columns("fashion_products")}
+        self.assertEqual(list(columns)[-1], "Material")
+        self.assertTrue(columns["Material"]["nullable"])
+        self.assertFalse(columns["Price (IDR)"]["nullable"])
+
+    def test_drop_table_lets_the_next_load_recreate_it(self):
+        ensure_schema(self.engine, "fashion_products_replay")
+        drop_table("fashion_products_replay", engine=self.engine)
+        self.assertFalse(inspect(self.engine).has_table("fashion_products_replay"))
+        drop_table("fashion_products_replay", engine=self.engine)
+
+        ensure_schema(self.engine, "fashion_products_replay")
+        self.assertTrue(inspect(self.engine).has_table("fashion_products_replay"))
+
+    @patch("utils.postgres.create_engine")
+    def test_get_engine_is_cached(self, mock_create_engine):
+        get_engine.cache_clear()
+        self.addCleanup(get_engine.cache_clear)
+
+        self.assertIs(get_engine("postgresql://example"), get_engine("postgresql://example"))
+        mock_create_engine.assert_called_once_with("postgresql://example", **postgres.POOL_SETTINGS)
+
+
+if __name__ == "__main__":
+    unittest.main()
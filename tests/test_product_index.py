@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+
+import pandas as pd
+
+from utils.product_index import ProductIndex, changed_rows, product_hash
+
+
+def products(*rows):
+    return pd.DataFrame([{
+        "Title": title,
+        "Price (IDR)": price,
+        "Rating": 4.5,
+        "Colors": colors,
+        "Size": "M",
+        "Gender": "Women",
+        "Timestamp": pd.Timestamp(timestamp),
+    } for title, price, colors, timestamp in rows])
+
+
+class TestProductIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "index", "products.sqlite")
+
+    def apply(self, df, history=False, as_of=None):
+        with ProductIndex(self.path, history=history) as index, redirect_stdout(StringIO()):
+            return index.apply(df, as_of=as_of)
+
+    def test_first_run_inserts_everything(self):
+        changes = self.apply(products(("A", 1000.0, 3, "2025-01-01"), ("B", 2000.0, 2, "2025-01-01")))
+
+        self.assertEqual(changes.inserted["Title"].tolist(), ["A", "B"])
+        self.assertTrue(changes.updated.empty and changes.deleted.empty)
+        self.assertEqual(changes.unchanged, 0)
+
+    def test_classifies_against_the_previous_run(self):
+        self.apply(products(("A", 1000.0, 3, "2025-01-01"), ("B", 2000.0, 2, "2025-01-01"),
+                            ("C", 3000.0, 1, "2025-01-01")))
+
+        changes = self.apply(products(("A", 1000.0, 3, "2025-01-02"), ("B", 2000.0, 5, "2025-01-02"),
+                                      ("D", 4000.0, 1, "2025-01-02")))
+
+        self.assertEqual(changes.inserted["Title"].tolist(), ["D"])
+        self.assertEqual(changes.updated["Title"].tolist(), ["B"])
+        self.assertEqual(changes.deleted["Title"].tolist(), ["C"])
+        self.assertEqual(changes.unchanged, 1)
+        self.assertEqual(changed_rows(changes)["Title"].tolist(), ["B", "D"])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(changes.deleted["Timestamp"]))
+
+    def test_timestamp_alone_is_not_a_change(self):
+        self.apply(products(("A", 1000.0, 3, "2025-01-01")))
+
+        changes = self.apply(products(("A", 1000.0, 3, "2025-06-01")))
+
+        self.assertEqual(changes.unchanged, 1)
+        self.assertTrue(changed_rows(changes).empty)
+
+    def test_index_persists_between_processes(self):
+        self.apply(products(("A", 1000.0, 3, "2025-01-01")))
+
+        with ProductIndex(self.path) as index:
+            self.assertEqual(len(index), 1)
+
+    def test_history_tracks_validity(self):
+        first, second = datetime(2025, 1, 1), datetime(2025, 1, 2)
+        self.apply(products(("A", 1000.0, 3, "2025-01-01")), history=True, as_of=first)
+        self.apply(products(("A", 1000.0, 5, "2025-01-02")), history=True, as_of=second)
+
+        with ProductIndex(self.path, history=True) as index:
+            versions = index.history_of(("A", 1000.0, 4.5))
+
+        self.assertEqual([(row["Colors"], valid_from, valid_to) for row, valid_from, valid_to in versions], [
+            (3, first.isoformat(), second.isoformat()),
+            (5, second.isoformat(), None),
+        ])
+
+    def test_diff_leaves_the_index_unchanged_until_commit(self):
+        df = products(("A", 1000.0, 3, "2025-01-01"))
+        with ProductIndex(self.path) as index, redirect_stdout(StringIO()):
+            self.assertEqual(len(index.diff(df).inserted), 1)
+            self.assertEqual(len(index.diff(df).inserted), 1)
+            self.assertIsNone(index.last_seen())
+
+            index.commit(df, as_of=datetime(2025, 1, 1))
+
+            self.assertEqual(index.diff(df).unchanged, 1)
+            self.assertEqual(index.last_seen(), datetime(2025, 1, 1))
+
+    def test_missing_key_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.apply(products(("A", 1000.0, 3, "2025-01-01")).drop(columns=["Rating"]))
+
+    def test_product_hash_ignores_integral_float_dtype(self):
+        self.assertEqual(product_hash(["A", 1634400.0, 3.9]), product_hash(["A", 1634400, 3.9]))
+        self.assertNotEqual(product_hash(["A", 1]), product_hash(["A1", ""]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.records import CleanProduct, ProductBatch, RawProduct, clean_record, iter_batches
+from utils.transform import convert_dtypes
+
+CLEAN_ITEMS = [
+    {"Title": "T-shirt 2", "Price (IDR)": 1634400.0, "Rating": 3.9, "Colors": 3, "Size": "M",
+     "Gender": "Women", "Timestamp": "2025-05-07T20:28:34.796040"},
+    {"Title": "Hoodie 3", "Price (IDR)": 7950080.0, "Rating": 4.8, "Colors": 3, "Size": "L",
+     "Gender": "Unisex", "Timestamp": "2025-05-07T20:28:35.000001"},
+    {"Title": "Pants 4", "Price (IDR)": 7476960.0, "Rating": 3.3, "Colors": 3, "Size": "M",
+     "Gender": "Women", "Timestamp": None},
+]
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_raw_record_round_trip(self):
+        raw = {"Title": "T-shirt 2", "Price": "$102.15", "Rating": "Rating: ⭐ 3.9 / 5", "Colors": "3 Colors",
+               "Size": "Size: M", "Gender": "Gender: Women", "Timestamp": "2025-05-07T20:28:34.796040"}
+
+        record = RawProduct.from_dict(raw)
+
+        self.assertEqual(record.to_dict(), raw)
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_clean_record(self):
+        raw = RawProduct("T-shirt 2", "$102.15", "Rating: ⭐ 3.9 / 5", "3 Colors", "Size: M", "Gender: Women",
+                         "2025-05-07T20:28:34.796040")
+
+        self.assertEqual(clean_record(raw).to_dict(), CLEAN_ITEMS[0])
+        self.assertIsNone(clean_record(raw._replace(title="Unknown Product")))
+
+    def test_batch_matches_convert_dtypes(self):
+        batch = ProductBatch.from_records(CLEAN_ITEMS)
+
+        expected = convert_dtypes(pd.DataFrame(CLEAN_ITEMS))
+        pd.testing.assert_frame_equal(batch.to_frame(categorical=False), expected)
+
+    def test_batch_uses_categorical_codes(self):
+        batch = ProductBatch.from_records(CleanProduct.from_dict(item) for item in CLEAN_ITEMS)
+
+        df = batch.to_frame()
+
+        self.assertEqual(df["Size"].dtype, "category")
+        self.assertEqual(list(df["Size"].cat.categories), ["M", "L"])
+        self.assertEqual(list(df["Gender"]), ["Women", "Unisex", "Women"])
+
+    def test_to_frame_shares_buffers(self):
+        batch = ProductBatch.from_records(CLEAN_ITEMS)
+
+        df = batch.to_frame()
+
+        self.assertTrue(np.shares_memory(df["Price (IDR)"].to_numpy(), np.frombuffer(batch.prices)))
+        self.assertTrue(np.shares_memory(df["Colors"].to_numpy(), np.frombuffer(batch.colors, dtype=np.int64)))
+
+    def test_batch_records_round_trip(self):
+        batch = ProductBatch.from_records(CLEAN_ITEMS)
+
+        self.assertEqual([record.to_dict() for record in batch.records()], CLEAN_ITEMS)
+
+    def test_rejected_row_leaves_batch_consistent(self):
+        batch = ProductBatch.from_records(CLEAN_ITEMS[:1])
+
+        with self.assertRaises(TypeError):
+            batch.append(dict(CLEAN_ITEMS[1], Colors=None))
+
+        self.assertEqual(len(batch.prices), 1)
+        self.assertEqual(len(batch.to_frame()), 1)
+
+    def test_iter_batches(self):
+        batches = list(iter_batches(CLEAN_ITEMS, batch_rows=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
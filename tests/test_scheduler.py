@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from utils.scheduler import RunLock, run_forever
+
+
+class TestRunLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "locks", "pipeline.lock")
+
+    def test_lock_is_exclusive(self):
+        first, second = RunLock(self.path), RunLock(self.path)
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertEqual(second.holder(), str(os.getpid()))
+
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+    def test_context_manager_releases(self):
+        with RunLock(self.path) as acquired:
+            self.assertTrue(acquired)
+
+        lock = RunLock(self.path)
+        self.assertTrue(lock.acquire())
+        lock.release()
+
+
+class TestRunForever(unittest.TestCase):
+
+    def run_quietly(self, *args, **kwargs):
+        with redirect_stdout(StringIO()) as output:
+            result = run_forever(*args, **kwargs)
+        return result, output.getvalue()
+
+    def test_runs_until_max_runs(self):
+        calls = []
+
+        succeeded, _ = self.run_quietly(lambda: calls.append(1) or 0, interval=0, max_runs=3)
+
+        self.assertEqual((len(calls), succeeded), (3, 3))
+
+    def test_failures_do_not_stop_the_loop(self):
+        results = iter([RuntimeError("boom"), 1, 0])
+
+        def job():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        succeeded, output = self.run_quietly(job, interval=0, max_runs=3)
+
+        self.assertEqual(succeeded, 1)
+        self.assertIn("[ERROR] Scheduled run failed: boom", output)
+
+    def test_locked_slots_are_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pipeline.lock")
+            holder = RunLock(path)
+            holder.acquire()
+            calls = []
+
+            _, output = self.run_quietly(lambda: calls.append(1) or 0, interval=0, lock=RunLock(path), max_runs=2)
+            holder.release()
+
+        self.assertEqual(calls, [])
+        self.assertIn("skipping this run", output)
+
+    def test_stop_event_interrupts_the_wait(self):
+        stop_event = threading.Event()
+
+        def job():
+            stop_event.set()
+            return 0
+
+        succeeded, _ = self.run_quietly(job, interval=3600, stop_event=stop_event)
+
+        self.assertEqual(succeeded, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
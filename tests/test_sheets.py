@@ -0,0 +1,135 @@
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pandas as pd
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+
+from utils.sheets import column_letter, diff_rows, frame_to_values, parse_anchor, plan_batches, write_frame
+
+
+class FakeSheetsHandler(BaseHTTPRequestHandler):
+    """A minimal stand-in for the Sheets values.batchUpdate endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    throttle = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if type(self).throttle:
+            type(self).throttle -= 1
+            self._send(429, {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}})
+            return
+        type(self).requests.append((self.path, body))
+        self._send(200, {"totalUpdatedCells": sum(len(row) for entry in body["data"] for row in entry["values"])})
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSheetsHelpers(unittest.TestCase):
+
+    def test_frame_to_values_does_not_mutate(self):
+        df = pd.DataFrame({"Title": ["A"], "Rating": [None], "Timestamp": pd.to_datetime(["2025-01-01"])})
+
+        values = frame_to_values(df)
+
+        self.assertEqual(values, [["Title", "Rating", "Timestamp"], ["A", "", "2025-01-01"]])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["Timestamp"]))
+
+    def test_a1_helpers(self):
+        self.assertEqual([column_letter(i) for i in (0, 25, 26, 701, 702)], ["A", "Z", "AA", "ZZ", "AAA"])
+        self.assertEqual(parse_anchor("Sheet1!A1"), ("Sheet1", 0, 0))
+        self.assertEqual(parse_anchor("Data!C5:F9"), ("Data", 4, 2))
+
+    def test_diff_rows(self):
+        old = [["h1", "h2"], [1, 2], [3, 4], [5, 6]]
+        new = [["h1", "h2"], [1, 2], [3, 9]]
+
+        self.assertEqual(diff_rows(old, new), [(2, [[3, 9], ["", ""]])])
+        self.assertEqual(diff_rows([], new), [(0, new)])
+        self.assertEqual(diff_rows(new, new), [])
+
+    def test_plan_batches_respects_cell_limit(self):
+        blocks = [(0, [["a", "b"], ["c", "d"], ["e", "f"]]), (5, [["g", "h"]])]
+
+        batches = plan_batches(blocks, "Sheet1!B2", max_cells=4)
+
+        self.assertEqual(batches, [
+            [{"range": "Sheet1!B2:C3", "values": [["a", "b"], ["c", "d"]]}],
+            [{"range": "Sheet1!B4:C4", "values": [["e", "f"]]}, {"range": "Sheet1!B7:C7", "values": [["g", "h"]]}],
+        ])
+
+
+class TestWriteFrame(unittest.TestCase):
+
+    def setUp(self):
+        FakeSheetsHandler.requests = []
+        FakeSheetsHandler.throttle = 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSheetsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.service = build("sheets", "v4", credentials=AnonymousCredentials(), cache_discovery=False,
+                             client_options={"api_endpoint": f"http://127.0.0.1:{server.server_address[1]}"})
+        self.snapshots = tempfile.TemporaryDirectory()
+        self.addCleanup(self.snapshots.cleanup)
+
+        self.df = pd.DataFrame({"Title": [f"Item {i}" for i in range(5)], "Rating": [4.0, 4.5, 3.0, 2.5, 5.0]})
+
+    def write(self, df, **kwargs):
+        return write_frame(df, "sheet-id", "Sheet1!A1", service=self.service, snapshot_dir=self.snapshots.name,
+                           **kwargs)
+
+    def test_first_upload_writes_everything_in_batches(self):
+        cells = self.write(self.df, max_cells=4)
+
+        self.assertEqual(cells, 12)
+        self.assertEqual(len(FakeSheetsHandler.requests), 3)
+        path, body = FakeSheetsHandler.requests[0]
+        self.assertEqual(path, "/v4/spreadsheets/sheet-id/values:batchUpdate?alt=json")
+        self.assertEqual(body["data"][0], {"range": "Sheet1!A1:B2", "values": [["Title", "Rating"], ["Item 0", 4.0]]})
+
+    def test_second_upload_only_writes_changed_rows(self):
+        self.write(self.df)
+        changed = self.df.copy()
+        changed.loc[3, "Rating"] = 1.0
+
+        cells = self.write(changed)
+
+        self.assertEqual(cells, 2)
+        self.assertEqual(FakeSheetsHandler.requests[-1][1]["data"], [
+            {"range": "Sheet1!A5:B5", "values": [["Item 3", 1.0]]},
+        ])
+
+    def test_unchanged_frame_sends_nothing(self):
+        self.write(self.df)
+        self.assertEqual(self.write(self.df), 0)
+        self.assertEqual(len(FakeSheetsHandler.requests), 1)
+
+    @patch("utils.sheets.time.sleep")
+    def test_quota_errors_are_retried(self, mock_sleep):
+        FakeSheetsHandler.throttle = 2
+
+        self.write(self.df)
+
+        self.assertEqual(len(FakeSheetsHandler.requests), 1)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,20 @@ import unittest
 import pandas as pd
 
 from utils.transform import clean_price, clean_rating, clean_colors, clean_field, is_valid_item, remove_duplicates, \
-    clean_data, EXCHANGE_RATE_USD_TO_IDR
+    clean_data, EXCHANGE_RATE_USD_TO_IDR, BoundedSeenSet, iter_clean_data, iter_frames, clean_frame, convert_dtypes, \
+    clean_data_parallel
+
+
+def make_raw(title, price="$10.00", rating="Rating: ⭐4.0 / 5"):
+    return {
+        "Title": title,
+        "Price": price,
+        "Rating": rating,
+        "Colors": "3 Colors",
+        "Size": "Size: M",
+        "Gender": "Gender: Male",
+        "Timestamp": "2025-01-01T10:00:00"
+    }
 
 
 class TestDataCleaning(unittest.TestCase):
@@ -119,5 +132,93 @@ class TestDataCleaning(unittest.TestCase):
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(converted_df["Timestamp"]))
 
 
+
+class TestStreamingTransform(unittest.TestCase):
+
+    def test_iter_clean_data_matches_clean_data(self):
+        raw_data = [make_raw("A"), make_raw("B"), make_raw("A"), make_raw("Unknown Product"),
+                    make_raw("C", price="Price Unavailable"), make_raw("B", rating="Rating: ⭐4.5 / 5")]
+
+        self.assertEqual(list(iter_clean_data(iter(raw_data))), clean_data(raw_data))
+
+    def test_iter_clean_data_is_lazy(self):
+        def raw_stream():
+            yield make_raw("A")
+            raise AssertionError("consumed past the first item")
+
+        self.assertEqual(next(iter_clean_data(raw_stream()))["Title"], "A")
+
+    def test_bounded_seen_set(self):
+        seen = BoundedSeenSet(capacity=2)
+
+        self.assertTrue(seen.add("a"))
+        self.assertTrue(seen.add("b"))
+        self.assertFalse(seen.add("a"))
+        self.assertTrue(seen.add("c"))
+        self.assertEqual(len(seen), 2)
+        self.assertTrue(seen.add("b"))
+
+    def test_iter_frames_chunks_and_converts(self):
+        items = clean_data([make_raw(f"Item {i}") for i in range(5)])
+        frames = list(iter_frames(items, chunk_size=2))
+
+        self.assertEqual([len(df) for df in frames], [2, 2, 1])
+        self.assertEqual(frames[0]["Price (IDR)"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(frames[-1]["Timestamp"]))
+
+
+
+class TestCleanFrame(unittest.TestCase):
+
+    def test_matches_clean_data_and_convert_dtypes(self):
+        raw_data = [
+            make_raw("A"),
+            make_raw("A"),
+            make_raw("B", price="$ 19.99 "),
+            make_raw("C", price="$1,000.00"),
+            make_raw("Unknown Product"),
+            make_raw("Unknown Product X"),
+            make_raw("D", price="Price Unavailable"),
+            make_raw("E", rating="Rating: ⭐ Invalid Rating / 5"),
+            make_raw("F", rating=None),
+            {**make_raw("G"), "Colors": "2.5 Colors"},
+            {**make_raw("H"), "Timestamp": None},
+            make_raw("B", price="$19.99", rating="Rating: ⭐ 3.5 / 5"),
+        ]
+
+        expected = convert_dtypes(pd.DataFrame(clean_data(raw_data)))
+        actual = clean_frame(pd.DataFrame(raw_data))
+
+        pd.testing.assert_frame_equal(actual, expected)
+        self.assertEqual(actual["Title"].tolist(), ["A", "B", "Unknown Product X", "H", "B"])
+
+    def test_missing_columns_are_treated_as_missing_fields(self):
+        df = pd.DataFrame([make_raw("A")]).drop(columns=["Gender"])
+
+        self.assertTrue(clean_frame(df).empty)
+
+
+
+class TestCleanDataParallel(unittest.TestCase):
+
+    def setUp(self):
+        # Duplicates straddle chunk boundaries to exercise the global first-seen dedup
+        self.raw_data = [make_raw(f"Item {i % 7}", price=f"${i % 3}.00") for i in range(40)]
+        self.raw_data.insert(5, make_raw("Unknown Product"))
+
+    def test_matches_clean_data(self):
+        result = clean_data_parallel(self.raw_data, workers=2, chunk_size=3)
+
+        self.assertEqual(result, clean_data(self.raw_data))
+
+    def test_spawn_start_method(self):
+        result = clean_data_parallel(iter(self.raw_data), workers=2, chunk_size=8, start_method="spawn")
+
+        self.assertEqual(result, clean_data(self.raw_data))
+
+    def test_single_worker_runs_in_process(self):
+        self.assertEqual(clean_data_parallel(self.raw_data, workers=1), clean_data(self.raw_data))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,267 @@
+import os
+import sqlite3
+from datetime import date
+from itertools import chain
+
+import pandas as pd
+
+from utils.metrics import timed
+
+ANALYTICS_FILE = "fashion_products_analytics.sqlite"
+DIMENSIONS = {"day": "day", "gender": "gender", "size": "size"}
+# The columns the store keeps; its tables and rollups are a fixed projection, so other columns,
+# such as those of fields added to utils.fields.FIELDS, are ignored
+FACT_COLUMNS = ("Title", "Price (IDR)", "Rating", "Colors", "Size", "Gender", "Timestamp")
+
+# Every measure's count, sum, min and max per day x Gender x Size; averages are derived as sum / count
+ROLLUP_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS daily_rollup ("
+    "day TEXT NOT NULL, gender TEXT NOT NULL, size TEXT NOT NULL, "
+    "row_count INTEGER NOT NULL, "
+    "price_count INTEGER NOT NULL, price_sum REAL, price_min REAL, price_max REAL, "
+    "rating_count INTEGER NOT NULL, rating_sum REAL, rating_min REAL, rating_max REAL, "
+    "PRIMARY KEY (day, gender, size))"
+)
+ROLLUP_BATCH = (
+    "INSERT INTO daily_rollup "
+    "SELECT day, gender, size, COUNT(*), COUNT(price), SUM(price), MIN(price), MAX(price), "
+    "COUNT(rating), SUM(rating), MIN(rating), MAX(rating) FROM {source} WHERE true GROUP BY day, gender, size "
+    "ON CONFLICT (day, gender, size) DO UPDATE SET "
+    "row_count = row_count + excluded.row_count, "
+    "price_count = price_count + excluded.price_count, "
+    "price_sum = COALESCE(price_sum, 0) + COALESCE(excluded.price_sum, 0), "
+    "price_min = MIN(COALESCE(price_min, excluded.price_min), COALESCE(excluded.price_min, price_min)), "
+    "price_max = MAX(COALESCE(price_max, excluded.price_max), COALESCE(excluded.price_max, price_max)), "
+    "rating_count = rating_count + excluded.rating_count, "
+    "rating_sum = COALESCE(rating_sum, 0) + COALESCE(excluded.rating_sum, 0), "
+    "rating_min = MIN(COALESCE(rating_min, excluded.rating_min), COALESCE(excluded.rating_min, rating_min)), "
+    "rating_max = MAX(COALESCE(rating_max, excluded.rating_max), COALESCE(excluded.rating_max, rating_max))"
+)
+
+
+class AnalyticsStore:
+    """
+    An embedded analytical store of cleaned products with incrementally maintained rollups.
+
+    Every loaded batch is appended to a `products` fact table and, in the same
+    transaction, folded into `daily_rollup`: one row per day x Gender x Size
+    holding the count, sum, min and max of the price and rating. `query`
+    answers aggregate questions from the rollup alone, so its cost depends on
+    the number of days and categories asked for, not on the number of products
+    ever loaded.
+
+    The store is a single SQLite file.
+    """
+
+    def __init__(self, path=ANALYTICS_FILE):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "title TEXT, price REAL, rating REAL, colors INTEGER, size TEXT NOT NULL, gender TEXT NOT NULL, "
+                "timestamp TEXT, day TEXT NOT NULL)"
+            )
+            self.connection.execute(ROLLUP_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, df, day=None):
+        """
+        Appends a batch of cleaned products and folds it into the rollups.
+
+        A product's day is `day` when given, else the date of its `Timestamp`,
+        or the load date when it has none.
+
+        Args:
+            df (pd.DataFrame): Cleaned products with the `FACT_COLUMNS`.
+            day (date or str, optional): The day every product is recorded under.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        with self.connection:
+            return self._insert(df, day)
+
+    def replace_day(self, df, day):
+        """
+        Replaces the products recorded for one day, and that day's rollups, with a snapshot of the catalogue.
+
+        Loading the catalogue once per run this way keeps one snapshot per day,
+        the latest, so a day's counts and averages describe the catalogue
+        whether it was scraped once that day or every hour.
+
+        Args:
+            df (pd.DataFrame): Cleaned products with the `FACT_COLUMNS`.
+            day (date or str): The day of the snapshot.
+
+        Returns:
+            int: The number of rows in the snapshot.
+        """
+        with self.connection:
+            self._clear_day(day)
+            return self._insert(df, day)
+
+    def _clear_day(self, day):
+        day = day.isoformat() if isinstance(day, date) else day
+        self.connection.execute("DELETE FROM products WHERE day = ?", (day,))
+        self.connection.execute("DELETE FROM daily_rollup WHERE day = ?", (day,))
+
+    def _insert(self, df, day=None):
+        missing = [column for column in FACT_COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing column(s): {missing}")
+        if df.empty:
+            return 0
+
+        timestamps = pd.to_datetime(df["Timestamp"], errors="coerce")
+        if day is not None:
+            days = day.isoformat() if isinstance(day, date) else day
+        else:
+            days = timestamps.dt.strftime("%Y-%m-%d").fillna(date.today().isoformat())
+        batch = pd.DataFrame({
+            "title": df["Title"].astype(object),
+            "price": pd.to_numeric(df["Price (IDR)"], errors="coerce"),
+            "rating": pd.to_numeric(df["Rating"], errors="coerce"),
+            "colors": pd.to_numeric(df["Colors"], errors="coerce"),
+            "size": df["Size"].astype(object).fillna(""),
+            "gender": df["Gender"].astype(object).fillna(""),
+            "timestamp": timestamps.map(lambda value: None if pd.isna(value) else value.isoformat()),
+            "day": days,
+        })
+        rows = [tuple(None if pd.isna(value) else value for value in row)
+                for row in batch.itertuples(index=False, name=None)]
+
+        self.connection.execute("DROP TABLE IF EXISTS temp.batch")
+        self.connection.execute(
+            "CREATE TEMP TABLE batch (title TEXT, price REAL, rating REAL, colors INTEGER, size TEXT, "
+            "gender TEXT, timestamp TEXT, day TEXT)"
+        )
+        self.connection.executemany("INSERT INTO batch VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.connection.execute("INSERT INTO products SELECT * FROM batch")
+        self.connection.execute(ROLLUP_BATCH.format(source="batch"))
+        self.connection.execute("DROP TABLE temp.batch")
+        return len(rows)
+
+    def query(self, by=("day",), start=None, end=None, gender=None, size=None):
+        """
+        Aggregates the price and rating from the rollups.
+
+        Args:
+            by (tuple): The dimensions to group by: any of "day", "gender" and "size". Empty gives one total row.
+            start (date or str, optional): The first day included.
+            end (date or str, optional): The first day excluded.
+            gender (str, optional): Only this gender.
+            size (str, optional): Only this size.
+
+        Returns:
+            pd.DataFrame: One row per group with `rows`, `avg_price`, `min_price`, `max_price`,
+                `avg_rating`, `min_rating` and `max_rating`, ordered by the grouping columns.
+        """
+        unknown = [dimension for dimension in by if dimension not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension(s) {unknown}; expected any of {tuple(DIMENSIONS)}.")
+
+        conditions, params = [], []
+        for column, operator, value in (("day", ">=", start), ("day", "<", end),
+                                        ("gender", "=", gender), ("size", "=", size)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value.isoformat() if isinstance(value, date) else value)
+
+        columns = [DIMENSIONS[dimension] for dimension in by]
+        select = "".join(f"{column}, " for column in columns)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        group = f" GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ""
+        rows = self.connection.execute(
+            f"SELECT {select}COALESCE(SUM(row_count), 0), SUM(price_sum) / NULLIF(SUM(price_count), 0), MIN(price_min), "
+            f"MAX(price_max), SUM(rating_sum) / NULLIF(SUM(rating_count), 0), MIN(rating_min), MAX(rating_max) "
+            f"FROM daily_rollup{where}{group}",
+            params,
+        ).fetchall()
+
+        return pd.DataFrame(rows, columns=[*by, "rows", "avg_price", "min_price", "max_price",
+                                           "avg_rating", "min_rating", "max_rating"])
+
+    def rebuild_rollups(self):
+        """
+        Recomputes the rollups from the fact table, e.g. after facts were edited by hand.
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM daily_rollup")
+            self.connection.execute(ROLLUP_BATCH.format(source="products"))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+@timed("load_analytics", profile=True)
+def save_to_analytics(df, path=ANALYTICS_FILE, as_of=None):
+    """
+    Loads a DataFrame into the analytics store and updates its rollups.
+
+    Args:
+        df (pd.DataFrame): The cleaned products to load.
+        path (str): The SQLite file of the store.
+        as_of (datetime, optional): When the catalogue was scraped. When given, `df` is the whole
+            catalogue and replaces the snapshot of that day; otherwise its rows are appended under
+            the day of their `Timestamp`.
+
+    Returns:
+        None
+    """
+    with AnalyticsStore(path) as store:
+        if as_of is None:
+            rows = store.append(df)
+            print(f"[INFO] Appended {rows} rows to the analytics store {path}.")
+        else:
+            rows = store.replace_day(df, as_of.date())
+            print(f"[INFO] Stored a {rows}-row snapshot for {as_of.date().isoformat()} in the analytics store {path}.")
+
+
+def stream_to_analytics(frames, path=ANALYTICS_FILE, as_of=None):
+    """
+    Loads a stream of DataFrame chunks into the analytics store, passing every chunk through.
+
+    Args:
+        frames (iterable): DataFrame chunks, e.g. from `utils.transform.iter_frames`.
+        path (str): The SQLite file of the store.
+        as_of (datetime, optional): When the catalogue was scraped. When given, the chunks are the
+            whole catalogue and replace the snapshot of that day in one transaction; otherwise
+            their rows are appended under the day of their `Timestamp`. An empty stream leaves the
+            day's snapshot as it was.
+
+    Yields:
+        pd.DataFrame: Each chunk, after it was loaded.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        # Nothing was scraped, which is no reason to drop the snapshot of the day
+        return
+
+    rows = 0
+    day = None if as_of is None else as_of.date()
+    with AnalyticsStore(path) as store, store.connection:
+        if day is not None:
+            store._clear_day(day)
+        for df in chain([first], frames):
+            rows += store._insert(df, day)
+            yield df
+
+    if day is None:
+        print(f"[INFO] Appended {rows} rows to the analytics store {path}.")
+    else:
+        print(f"[INFO] Stored a {rows}-row snapshot for {day.isoformat()} in the analytics store {path}.")
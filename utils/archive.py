@@ -0,0 +1,323 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.extract import parse_page
+from utils.transform import clean_data, remove_duplicates
+
+ARCHIVE_DIR = os.path.join(".cache", "archive")
+INDEX_FILE = "index.sqlite"
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+ArchiveEntry = namedtuple("ArchiveEntry", ["url", "fetched_at", "segment", "offset", "length"])
+ArchiveEntry.__doc__ = """
+One archived fetch: the page `url` fetched at `fetched_at` (ISO 8601), whose
+gzip member is `length` bytes at `offset` in segment number `segment`.
+"""
+
+
+class PageArchive:
+    """
+    An append-only, compressed archive of every raw page fetched.
+
+    Page bodies are appended as independent gzip members to numbered segment
+    files (`segment-000001.gz`, ...), so a segment is itself a valid gzip file
+    and any page can be read back alone by seeking to its offset. A new segment
+    is started once the current one exceeds `segment_bytes`.
+
+    A SQLite index records every fetch by URL and fetch time. A fetch whose
+    body is identical to the URL's previous one only adds an index row that
+    points at the bytes already stored.
+
+    The archive is safe to append to from several threads.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(directory, INDEX_FILE), check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "id INTEGER PRIMARY KEY, url TEXT NOT NULL, fetched_at TEXT NOT NULL, digest TEXT NOT NULL, "
+                "segment INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_pages_url ON pages (url, fetched_at)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_pages_fetched_at ON pages (fetched_at)")
+
+        segments = [int(name[8:14]) for name in os.listdir(directory)
+                    if name.startswith("segment-") and name.endswith(".gz")]
+        self._segment = max(segments, default=1)
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:06d}.gz")
+
+    def append(self, url, content, fetched_at=None):
+        """
+        Archives one fetched page.
+
+        Args:
+            url (str): The page URL.
+            content (bytes): The raw response body.
+            fetched_at (datetime, optional): When the page was fetched. Defaults to now.
+
+        Returns:
+            bool: True if the body was stored, False if it matched the URL's previous fetch.
+        """
+        fetched_at = (fetched_at or datetime.now()).isoformat()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            previous = self.connection.execute(
+                "SELECT digest, segment, offset, length FROM pages WHERE url = ? ORDER BY fetched_at DESC, id DESC "
+                "LIMIT 1",
+                (url,),
+            ).fetchone()
+
+            stored = previous is None or previous[0] != digest
+            if stored:
+                member = gzip.compress(content, mtime=0)
+                path = self.segment_path(self._segment)
+                if os.path.exists(path) and os.path.getsize(path) >= self.segment_bytes:
+                    self._segment += 1
+                    path = self.segment_path(self._segment)
+                # The bytes are written before the index row, so a crash can only leave unindexed bytes behind
+                with open(path, "ab") as f:
+                    offset = f.tell()
+                    f.write(member)
+                location = (self._segment, offset, len(member))
+            else:
+                location = previous[1:]
+
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO pages (url, fetched_at, digest, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, fetched_at, digest, *location),
+                )
+        return stored
+
+    def iter_entries(self, since=None, until=None, url=None, batch_size=10_000, latest_per_day=False):
+        """
+        Iterates over archived fetches in fetch order, reading the index in batches.
+
+        Args:
+            since (datetime, optional): Only fetches at or after this time.
+            until (datetime, optional): Only fetches before this time.
+            url (str, optional): Only fetches of this URL.
+            batch_size (int): The number of index rows read at a time.
+            latest_per_day (bool): Only the last matching fetch of each URL on each day.
+
+        Yields:
+            ArchiveEntry: Every matching fetch, oldest first.
+        """
+        window, params = [], []
+        if since is not None:
+            window.append("fetched_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            window.append("fetched_at < ?")
+            params.append(until.isoformat())
+        if url is not None:
+            window.append("url = ?")
+            params.append(url)
+
+        conditions = ["(fetched_at, id) > (?, ?)", *window]
+        if latest_per_day:
+            # ISO 8601 timestamps start with the date, so the first 10 characters are the day
+            later = " AND ".join(["q.url = pages.url", "substr(q.fetched_at, 1, 10) = substr(pages.fetched_at, 1, 10)",
+                                  "(q.fetched_at, q.id) > (pages.fetched_at, pages.id)",
+                                  *(f"q.{condition}" for condition in window)])
+            conditions.append(f"NOT EXISTS (SELECT 1 FROM pages q WHERE {later})")
+            params = params + params
+
+        query = (f"SELECT fetched_at, id, url, segment, offset, length FROM pages WHERE {' AND '.join(conditions)} "
+                 f"ORDER BY fetched_at, id LIMIT {int(batch_size)}")
+        last = ("", 0)
+        while True:
+            # Keyset pagination: each batch is a fresh query, so appends may continue meanwhile
+            with self._lock:
+                rows = self.connection.execute(query, (*last, *params)).fetchall()
+            for fetched_at, _, url_, segment, offset, length in rows:
+                yield ArchiveEntry(url_, fetched_at, segment, offset, length)
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][:2]
+
+    def entries(self, since=None, until=None, url=None, latest_per_day=False):
+        """
+        Returns:
+            list: Every matching `ArchiveEntry`, oldest first; see `iter_entries`.
+        """
+        return list(self.iter_entries(since=since, until=until, url=url, latest_per_day=latest_per_day))
+
+    def read_raw(self, entry):
+        """
+        Returns:
+            bytes: The compressed gzip member of an entry.
+        """
+        with open(self.segment_path(entry.segment), "rb") as f:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+
+    def read(self, entry):
+        """
+        Returns:
+            bytes: The raw page body of an entry.
+        """
+        return gzip.decompress(self.read_raw(entry))
+
+    def lookup(self, url, at=None):
+        """
+        Returns the archived body of a URL as it was at a given time.
+
+        Args:
+            url (str): The page URL.
+            at (datetime, optional): The point in time. Defaults to the latest fetch.
+
+        Returns:
+            bytes or None: The body of the latest fetch at or before `at`, or None if there is none.
+        """
+        entries = self.entries(url=url)
+        if at is not None:
+            entries = [entry for entry in entries if entry.fetched_at <= at.isoformat()]
+        return self.read(entries[-1]) if entries else None
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _decompress(entry, compressed):
+    return gzip.decompress(compressed)
+
+
+def iter_archive(archive, since=None, until=None, workers=None, decode=_decompress, latest_per_day=False):
+    """
+    Streams archived pages back in fetch order.
+
+    Compressed members are read sequentially, keeping one segment file open at
+    a time, and decoded on a thread pool (zlib releases the GIL, so several
+    pages decompress in parallel). At most `workers * 2` pages are in flight.
+
+    Args:
+        archive (PageArchive): The archive to read.
+        since (datetime, optional): Only fetches at or after this time.
+        until (datetime, optional): Only fetches before this time.
+        workers (int, optional): The number of decoding threads. Defaults to the number of CPUs.
+        decode (callable): Called on a worker thread with `(entry, compressed)`; its result is
+            yielded. Defaults to decompressing the page body.
+        latest_per_day (bool): Only the last fetch of each URL on each day.
+
+    Yields:
+        tuple: `(entry, decoded)` for every archived fetch, oldest first.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    segment, f = None, None
+    try:
+        for entry in archive.iter_entries(since=since, until=until, latest_per_day=latest_per_day):
+            if entry.segment != segment:
+                if f is not None:
+                    f.close()
+                segment, f = entry.segment, open(archive.segment_path(entry.segment), "rb")
+            f.seek(entry.offset)
+            pending.append((entry, executor.submit(decode, entry, f.read(entry.length))))
+
+            if len(pending) >= workers * 2:
+                done, future = pending.popleft()
+                yield done, future.result()
+
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+    finally:
+        if f is not None:
+            f.close()
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _replay_page(entry, compressed):
+    products = parse_page(gzip.decompress(compressed))
+    for product in products:
+        # The products are as old as the fetch, not the replay
+        product["Timestamp"] = entry.fetched_at
+    return clean_data(products)
+
+
+def replay_archive(archive, since=None, until=None, workers=None):
+    """
+    Re-extracts and cleans archived pages without touching the network.
+
+    Every archived fetch goes through `parse_page` and `clean_data` as it did
+    when it was scraped, with the fetch time as the products' `Timestamp`.
+    Pages are decompressed and parsed on `iter_archive`'s thread pool.
+    Duplicates are removed within each fetched page, so the rows match what
+    each original run loaded.
+
+    Args:
+        archive (PageArchive): The archive to replay.
+        since (datetime, optional): Only fetches at or after this time.
+        until (datetime, optional): Only fetches before this time.
+        workers (int, optional): The number of threads decompressing and parsing pages.
+
+    Yields:
+        dict: A cleaned product, in fetch order.
+    """
+    pages = 0
+    for _, rows in iter_archive(archive, since=since, until=until, workers=workers, decode=_replay_page):
+        pages += 1
+        yield from rows
+    print(f"[INFO] Replayed {pages} archived page(s).")
+
+
+def replay_days(archive, since=None, until=None, workers=None):
+    """
+    Re-extracts and cleans the archive as one catalogue snapshot per day.
+
+    For every day, only the last archived fetch of each URL is replayed, and the
+    day's rows are deduplicated across pages as a batch run does. Replaying the
+    same range twice therefore gives the same snapshots, however often the site
+    was fetched.
+
+    Args:
+        archive (PageArchive): The archive to replay.
+        since (datetime, optional): Only fetches at or after this time.
+        until (datetime, optional): Only fetches before this time.
+        workers (int, optional): The number of threads decompressing and parsing pages.
+
+    Yields:
+        tuple: `(day, rows)` with the ISO date and the day's cleaned products, oldest day first.
+    """
+    pages = 0
+    day, rows = None, []
+    for entry, page_rows in iter_archive(archive, since=since, until=until, workers=workers, decode=_replay_page,
+                                         latest_per_day=True):
+        pages += 1
+        if entry.fetched_at[:10] != day:
+            if rows:
+                yield day, remove_duplicates(rows)
+            day, rows = entry.fetched_at[:10], []
+        rows.extend(page_rows)
+    if rows:
+        yield day, remove_duplicates(rows)
+    print(f"[INFO] Replayed {pages} archived page(s).")
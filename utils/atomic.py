@@ -0,0 +1,51 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yields a temporary path that replaces `path` once the block succeeds.
+
+    The temporary file lives in the same directory as `path`, so the final
+    `os.replace` is atomic and readers only ever see the old or the new file.
+    If the block fails, the temporary file is removed and `path` is untouched.
+
+    Args:
+        path (str): The file to write.
+
+    Yields:
+        str: The path to write the new content to.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path, data, durable=False):
+    """
+    Replaces the content of a file atomically.
+
+    Args:
+        path (str): The file to write.
+        data (str or bytes): The new content; text is written as UTF-8.
+        durable (bool): Whether to fsync the content before it replaces the file, so it survives a crash.
+
+    Returns:
+        None
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,232 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from utils.atomic import atomic_path, atomic_write
+
+CHECKPOINT_DIR = os.path.join(".cache", "runs")
+STATE_FILE = "state.json"
+STAGES = ("extract", "transform", "load")
+KEEP_RUNS = 5
+# Failed runs stay resumable, but only the latest few; each holds pickled frames
+KEEP_UNFINISHED_RUNS = 3
+
+
+class RunCheckpoint:
+    """
+    The persisted progress of one pipeline run.
+
+    Each run lives in its own directory under a run ID. The directory holds:
+    - a `state.json` recording the completed stages, pages and sinks;
+    - one JSON file per scraped page with that page's records;
+    - the cleaned DataFrame once the transform stage is complete.
+
+    A failed run can be reopened with `resume` and continue from the first page
+    or stage that is not yet recorded. Every file is written atomically, so a
+    run killed mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, directory, state):
+        self.directory = directory
+        self.state = state
+
+    @property
+    def run_id(self):
+        return self.state["run_id"]
+
+    @classmethod
+    def start(cls, root=CHECKPOINT_DIR, run_id=None, keep=KEEP_RUNS, keep_unfinished=KEEP_UNFINISHED_RUNS):
+        """
+        Creates the checkpoint of a new run, pruning the oldest runs.
+
+        Args:
+            root (str): The directory holding every run.
+            run_id (str, optional): The ID of the run. Defaults to a timestamp-based ID.
+            keep (int): The number of finished runs kept on disk.
+            keep_unfinished (int): The number of earlier unfinished runs kept on disk.
+
+        Returns:
+            RunCheckpoint: The new, empty checkpoint.
+        """
+        run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        directory = os.path.join(root, run_id)
+        if os.path.exists(directory):
+            raise FileExistsError(f"Run '{run_id}' already exists in {root}")
+
+        prune_runs(root, keep, keep_unfinished)
+        os.makedirs(os.path.join(directory, "pages"))
+        checkpoint = cls(directory, {
+            "run_id": run_id,
+            "created": datetime.now().isoformat(),
+            "stages": [],
+            "pages": {},
+            "sinks": [],
+            "finished": False,
+        })
+        checkpoint._save_state()
+        return checkpoint
+
+    @classmethod
+    def resume(cls, root=CHECKPOINT_DIR, run_id=None):
+        """
+        Reopens the checkpoint of an earlier run.
+
+        Args:
+            root (str): The directory holding every run.
+            run_id (str, optional): The run to reopen. Defaults to the latest unfinished run.
+
+        Returns:
+            RunCheckpoint or None: The checkpoint, or None if there is no run to resume.
+        """
+        if run_id is None:
+            unfinished = [state for state in list_runs(root) if not state["finished"]]
+            if not unfinished:
+                return None
+            run_id = unfinished[-1]["run_id"]
+
+        state = _read_state(os.path.join(root, run_id))
+        if state is None:
+            return None
+        return cls(os.path.join(root, run_id), state)
+
+    def is_complete(self, stage):
+        return stage in self.state["stages"]
+
+    def complete(self, stage):
+        """Records that a stage finished."""
+        if stage not in self.state["stages"]:
+            self.state["stages"].append(stage)
+            self._save_state()
+
+    def save_page(self, page, url, records):
+        """
+        Persists the records scraped from one page.
+
+        Args:
+            page (int): The 1-based page number.
+            url (str): The page URL.
+            records (list): The product dictionaries taken from the page.
+        """
+        filename = os.path.join("pages", f"page-{page:05d}.json")
+        atomic_write(os.path.join(self.directory, filename), json.dumps(records))
+        self.state["pages"][str(page)] = {"url": url, "file": filename, "rows": len(records)}
+        self._save_state()
+
+    def completed_pages(self):
+        """
+        Returns:
+            list: The page numbers already checkpointed, in order.
+        """
+        return sorted(int(page) for page in self.state["pages"])
+
+    def next_page(self):
+        """
+        Returns:
+            int: The first page after the contiguous run of checkpointed pages.
+        """
+        page = 1
+        while str(page) in self.state["pages"]:
+            page += 1
+        return page
+
+    def load_pages(self):
+        """
+        Yields:
+            tuple: `(page, url, records)` for every checkpointed page, in page order.
+        """
+        for page in self.completed_pages():
+            entry = self.state["pages"][str(page)]
+            with open(os.path.join(self.directory, entry["file"]), encoding="utf-8") as f:
+                yield page, entry["url"], json.load(f)
+
+    def save_frame(self, name, df):
+        """
+        Persists a DataFrame with its dtypes.
+
+        Args:
+            name (str): The name of the frame, usually the stage that produced it.
+            df (pd.DataFrame): The frame to save.
+        """
+        with atomic_path(os.path.join(self.directory, f"{name}.pkl")) as tmp_path:
+            df.to_pickle(tmp_path)
+
+    def load_frame(self, name):
+        """
+        Returns:
+            pd.DataFrame or None: The frame saved under `name`, or None if there is none.
+        """
+        path = os.path.join(self.directory, f"{name}.pkl")
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def completed_sinks(self):
+        return list(self.state["sinks"])
+
+    def complete_sink(self, name):
+        """Records that a sink loaded the run's data successfully."""
+        if name not in self.state["sinks"]:
+            self.state["sinks"].append(name)
+            self._save_state()
+
+    def finish(self):
+        """Marks the run as finished so it is no longer picked up by `resume`."""
+        self.state["finished"] = True
+        self._save_state()
+
+    def _save_state(self):
+        atomic_write(os.path.join(self.directory, STATE_FILE), json.dumps(self.state, indent=2))
+
+
+def _read_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_runs(root=CHECKPOINT_DIR):
+    """
+    Lists the runs checkpointed under a directory.
+
+    Args:
+        root (str): The directory holding every run.
+
+    Returns:
+        list: The state of every run, oldest first.
+    """
+    if not os.path.isdir(root):
+        return []
+
+    states = [_read_state(os.path.join(root, name)) for name in os.listdir(root)]
+    return sorted((state for state in states if state), key=lambda state: state["created"])
+
+
+def prune_runs(root=CHECKPOINT_DIR, keep=KEEP_RUNS, keep_unfinished=KEEP_UNFINISHED_RUNS):
+    """
+    Deletes all but the `keep` most recent finished runs and the `keep_unfinished` most recent unfinished ones.
+
+    Every failed run leaves its pages and frames behind for `--resume`; only
+    the latest of them are worth resuming, so older ones are deleted too.
+
+    Args:
+        root (str): The directory holding every run.
+        keep (int): The number of finished runs to keep.
+        keep_unfinished (int): The number of unfinished runs to keep.
+
+    Returns:
+        list: The IDs of the deleted runs, oldest first.
+    """
+    runs = list_runs(root)
+    finished = [state for state in runs if state["finished"]]
+    unfinished = [state for state in runs if not state["finished"]]
+    stale = finished[:max(len(finished) - keep, 0)] + unfinished[:max(len(unfinished) - keep_unfinished, 0)]
+    removed = [state["run_id"] for state in sorted(stale, key=lambda state: state["created"])]
+    for run_id in removed:
+        shutil.rmtree(os.path.join(root, run_id), ignore_errors=True)
+    return removed
@@ -1,40 +1,162 @@
+import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
-    )
-}
+from utils.fetch import FetchClient
+from utils.fields import SCHEMA, css_parts
+from utils.metrics import BYTES_FETCHED, FETCH_FAILURES, PAGES_FETCHED, PAGES_PER_SECOND, increment, set_gauge, \
+    timer
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is an optional, faster parser backend
+    lxml_etree = lxml_html = None
+
+# "html.parser" (BeautifulSoup, always available) or "lxml" (single-pass lxml card parser),
+# overridable at runtime with the HTML_PARSER environment variable
+DEFAULT_HTML_PARSER = "html.parser"
+PARSER_BACKENDS = ("html.parser", "lxml")
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket used to pace requests.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; every
+    call to `acquire` consumes one token and blocks until one is available.
+    A falsy `rate` disables limiting entirely.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then consumes it.
+
+        Returns:
+            None
+        """
+        if not self.rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """
+    Keeps one `TokenBucket` per host so every site is paced independently.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        """
+        Blocks until a request to the host of `url` is allowed.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            None
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        bucket.acquire()
+
+
+def get_default_client():
+    """
+    Returns the process-wide `FetchClient`, creating it on first use.
 
+    Returns:
+        FetchClient: The shared client used when no explicit client is given.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = FetchClient()
+        return _default_client
+
+
+def page_url(base_url, page):
+    """
+    Builds the URL of a catalogue page.
+
+    Args:
+        base_url (str): The base URL of the site (must end with a slash).
+        page (int): The 1-based page number.
 
-def fetching_content(url):
+    Returns:
+        str: The URL of the requested page.
+    """
+    return base_url if page == 1 else f"{base_url}page{page}"
+
+
+def fetching_content(url, client=None):
     """
     Fetches the HTML content of a given URL using a GET request.
 
+    Transient failures are retried by the client before giving up.
+
     Args:
         url (str): The target URL to fetch.
+        client (FetchClient, optional): The client to use. Defaults to the shared client.
 
     Returns:
         bytes or None: The raw HTML content if successful, otherwise None.
     """
     try:
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        return response.content
+        with timer("fetch", log=False):
+            content = (client or get_default_client()).fetch(url)
     except requests.exceptions.RequestException as e:
+        increment(FETCH_FAILURES)
         print(f"[ERROR] Failed to fetch {url}: {e}")
         return None
 
+    if content:
+        increment(PAGES_FETCHED)
+        increment(BYTES_FETCHED, len(content))
+    return content
+
 
 def extract_fashion_data(product):
     """
     Extracts fashion product information from a BeautifulSoup HTML element.
 
+    The fields and the elements they are read from are declared in `utils.fields.FIELDS`.
+
     Args:
         product (bs4.element.Tag): The HTML block representing a product.
 
@@ -44,75 +166,281 @@ def extract_fashion_data(product):
                       Returns None if extraction fails.
     """
     try:
-        # Extract core product details
-        title = product.select_one(".product-title").get_text(strip=True)
-        price = product.select_one(".price").get_text(strip=True)
-
-        # Optional fields with default None
-        rating = colors = size = gender = None
-
-        # Loop through paragraph tags for additional details
-        for tag in product.select(".product-details p"):
-            text = tag.get_text(strip=True)
-            if text.startswith("Rating:"):
-                rating = text
-            elif "Colors" in text:
-                colors = text
-            elif "Size:" in text:
-                size = text
-            elif "Gender:" in text:
-                gender = text
-
-        return {
-            "Title": title,
-            "Price": price,
-            "Rating": rating,
-            "Colors": colors,
-            "Size": size,
-            "Gender": gender,
-            "Timestamp": datetime.now().isoformat()
-        }
+        # Extract the fields read from their own element
+        texts = {}
+        for name, selector in SCHEMA.own:
+            tag = product.select_one(selector)
+            texts[name] = None if tag is None else tag.get_text(strip=True)
+
+        # Text of the elements holding the labelled details
+        details = [tag.get_text(strip=True) for selector in SCHEMA.shared for tag in product.select(selector)]
+
+        return build_product(texts, details)
 
     except Exception as e:
         print(f"[ERROR] Failed to extract product data: {e}")
         return None
 
 
-def scrape(base_url, max_pages, delay):
+def build_product(texts, details):
     """
-    Iteratively scrapes multiple pages of fashion product listings.
+    Builds a product dictionary from the text of its own-element fields and detail paragraphs.
 
     Args:
-        base_url (str): The base URL of the site to scrape (must end with a slash if pagination appends `page{n}`).
-        max_pages (int): The maximum number of pages to scrape.
-        delay (int or float): Time in seconds to wait between page requests.
+        texts (dict): Field names mapped to the stripped text of their element, or None if it is missing.
+        details (list): The stripped text of every detail paragraph, in document order.
 
     Returns:
-        list: A list of dictionaries, each representing a product and its details.
+        dict: A dictionary containing product details and a timestamp.
+
+    Raises:
+        ValueError: If a required field that is read from its own element is missing.
     """
-    all_products = []
+    missing = [name for name, _ in SCHEMA.own if texts.get(name) is None and name in SCHEMA.required]
+    if missing:
+        raise ValueError(f"missing {' and '.join(missing).lower()}")
 
-    for page in range(1, max_pages + 1):
-        # Construct the paginated URL
-        url = base_url if page == 1 else f"{base_url}page{page}"
-        print(f"[INFO] Scraping page: {url}")
+    # Optional fields default to None
+    raw = {**texts, **SCHEMA.classify(details)}
+    product = {name: raw.get(name) for name in SCHEMA.names}
+    product["Timestamp"] = datetime.now().isoformat()
+    return product
+
+
+# The classes the lxml card parser looks for, derived from the field selectors
+_OWN_CLASSES = {css_parts(selector)[0]: name for name, selector in SCHEMA.own}
+_SHARED_CLASSES = [css_parts(selector) for selector in SCHEMA.shared]
+
+
+def _lxml_text(element):
+    # Mirrors BeautifulSoup's get_text(strip=True): every text node stripped, then joined
+    return "".join(text.strip() for text in element.itertext())
+
+
+def extract_fashion_data_lxml(product):
+    """
+    Extracts fashion product information from an lxml element in a single pass.
+
+    Returns exactly the same dictionary as `extract_fashion_data` does for the
+    equivalent BeautifulSoup element.
+
+    Args:
+        product (lxml.html.HtmlElement): The HTML block representing a product.
+
+    Returns:
+        dict or None: A dictionary containing product details, or None if extraction fails.
+    """
+    texts = {}
+    detail_tags = []
+
+    for element in product.iter(lxml_etree.Element):
+        classes = element.get("class")
+        if not classes:
+            continue
+        classes = classes.split()
+        for class_name in classes:
+            name = _OWN_CLASSES.get(class_name)
+            if name is not None and name not in texts:
+                texts[name] = _lxml_text(element)
+                break
+        for class_name, tag in _SHARED_CLASSES:
+            if class_name in classes:
+                detail_tags.extend(element.iter(tag) if tag else (element,))
+
+    # Nested detail blocks would list the same paragraph twice; keep the first occurrence
+    seen = set()
+    details = [_lxml_text(tag) for tag in detail_tags if not (tag in seen or seen.add(tag))]
+
+    try:
+        return build_product(texts, details)
+    except ValueError as e:
+        print(f"[ERROR] Failed to extract product data: {e}")
+        return None
+
+
+def parse_page(content, backend=None):
+    """
+    Parses a catalogue page and extracts every product card on it.
 
-        # Fetch and parse HTML content
-        content = fetching_content(url)
-        if not content:
-            print(f"[INFO] Stopping scrape. No content on page {page}.")
-            break
+    Args:
+        content (bytes): The raw HTML of a catalogue page.
+        backend (str, optional): "html.parser" or "lxml". Defaults to the `HTML_PARSER` environment variable.
 
+    Returns:
+        list: A list of product dictionaries in the order they appear on the page.
+    """
+    backend = backend or os.getenv("HTML_PARSER", DEFAULT_HTML_PARSER)
+    if backend == "lxml":
+        if lxml_html is None:
+            raise ImportError("The 'lxml' parser backend requires the lxml package (pip install lxml).")
+        products = map(extract_fashion_data_lxml, _LXML_CARDS(_lxml_document(content)))
+    elif backend == "html.parser":
         soup = BeautifulSoup(content, "html.parser")
-        product_cards = soup.select(".collection-card")
+        products = map(extract_fashion_data, soup.select(".collection-card"))
+    else:
+        raise ValueError(f"Unknown HTML parser backend {backend!r}; expected one of {PARSER_BACKENDS}.")
+
+    return [product for product in products if product]
+
+
+if lxml_html is not None:
+    _LXML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+    _LXML_CARDS = lxml_etree.XPath(
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' collection-card ')]"
+    )
+
+
+def _lxml_document(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if not content.strip():
+        content = b"<html></html>"
+    return lxml_html.document_fromstring(content, parser=_LXML_PARSER)
+
+
+def iter_pages(base_url, max_pages, delay=0, workers=1, rate=None, client=None, start_page=1):
+    """
+    Fetches catalogue pages and yields them in page order.
 
-        # Extract data from each product card
-        for product in product_cards:
-            product_data = extract_fashion_data(product)
-            if product_data:
-                all_products.append(product_data)
+    With `workers` greater than one, up to `workers` requests are kept in flight
+    on a thread pool. Requests are paced per host by a token bucket instead of a
+    fixed sleep, so they start at least `delay` apart however many workers
+    there are; concurrency only overlaps their latency. Iteration stops at the first page that returns no content, and
+    pages fetched beyond it are discarded.
 
-        # Respectful delay to avoid hammering the server
-        time.sleep(delay)
+    Args:
+        base_url (str): The base URL of the site to scrape.
+        max_pages (int): The maximum number of pages to fetch.
+        delay (int or float): Minimum seconds between requests; used to derive `rate` when it is not given.
+        workers (int): The number of concurrent requests.
+        rate (float or None): Requests per second allowed per host. None derives it from `delay`.
+        client (FetchClient, optional): The client used to fetch pages. Defaults to the shared client.
+        start_page (int): The first page to fetch, e.g. to resume an interrupted scrape.
+
+    Yields:
+        tuple: `(page, url, content)` for every page fetched successfully.
+    """
+    if rate is None:
+        rate = 1 / delay if delay > 0 else None
+    # A bucket of one token: workers overlap slow responses, they never send a burst
+    limiter = HostRateLimiter(rate)
+
+    def fetch(url):
+        limiter.acquire(url)
+        print(f"[INFO] Scraping page: {url}")
+        return fetching_content(url, client=client)
+
+    pages = ((page, page_url(base_url, page)) for page in range(start_page, max_pages + 1))
+
+    if workers <= 1:
+        for page, url in pages:
+            content = fetch(url)
+            if not content:
+                print(f"[INFO] Stopping scrape. No content on page {page}.")
+                return
+            yield page, url, content
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for page, url in pages:
+            pending.append((page, url, executor.submit(fetch, url)))
+            if len(pending) >= workers:
+                break
+
+        while pending:
+            page, url, future = pending.popleft()
+            content = future.result()
+            if not content:
+                print(f"[INFO] Stopping scrape. No content on page {page}.")
+                return
+
+            next_page = next(pages, None)
+            if next_page:
+                pending.append((*next_page, executor.submit(fetch, next_page[1])))
+
+            yield page, url, content
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    return all_products
+
+def reset_fetch_stats(client):
+    """
+    Clears a client's latency histogram and response cache counters, so they describe a single run.
+
+    Args:
+        client (FetchClient): The client about to scrape.
+
+    Returns:
+        None
+    """
+    client.histogram.reset()
+    if client.cache is not None:
+        client.cache.reset_stats()
+
+
+def report_fetch_stats(client):
+    """
+    Prints a client's latency histogram and response cache counters.
+
+    Args:
+        client (FetchClient): The client that scraped.
+
+    Returns:
+        None
+    """
+    print(f"[INFO] Page fetch latency: {client.histogram.summary()}")
+    if client.cache is not None:
+        print(f"[INFO] Page cache: {client.cache.stats()}")
+
+
+def iter_scrape(base_url, max_pages, delay, workers=1, rate=None, client=None):
+    """
+    Scrapes fashion product listings and yields products one page at a time.
+
+    Only the pages in flight are held in memory, so the whole catalogue is never
+    materialized. Arguments are the same as for `scrape`.
+
+    Yields:
+        dict: A product and its details, in page order.
+    """
+    client = client or get_default_client()
+    reset_fetch_stats(client)
+
+    with timer("scrape", profile=True) as span:
+        pages = products = 0
+        start = time.perf_counter()
+        for _, _, content in iter_pages(base_url, max_pages, delay=delay, workers=workers, rate=rate,
+                                        client=client):
+            pages += 1
+            for product in parse_page(content):
+                products += 1
+                yield product
+
+        # Includes the time consumers spend between products when iterated lazily
+        pages_per_second = pages / max(time.perf_counter() - start, 1e-9)
+        set_gauge(PAGES_PER_SECOND, pages_per_second)
+        span.update(pages=pages, rows_out=products, pages_per_second=f"{pages_per_second:.2f}")
+
+    report_fetch_stats(client)
+
+
+def scrape(base_url, max_pages, delay, workers=1, rate=None, client=None):
+    """
+    Iteratively scrapes multiple pages of fashion product listings.
+
+    Args:
+        base_url (str): The base URL of the site to scrape (must end with a slash if pagination appends `page{n}`).
+        max_pages (int): The maximum number of pages to scrape.
+        delay (int or float): Minimum time in seconds between page requests to the same host.
+        workers (int): The number of pages fetched concurrently. 1 keeps the sequential behaviour.
+        rate (float or None): Requests per second allowed per host; overrides `delay` when given.
+        client (FetchClient, optional): The client used to fetch pages. Defaults to the shared client.
+
+    Returns:
+        list: A list of dictionaries, each representing a product and its details, in page order.
+    """
+    return list(iter_scrape(base_url, max_pages, delay, workers=workers, rate=rate, client=client))
@@ -0,0 +1,203 @@
+import bisect
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
+    )
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LatencyHistogram:
+    """
+    A thread-safe, fixed-bucket histogram of request latencies in seconds.
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears every recorded observation.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.counts = [0] * len(self.BUCKETS)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def observe(self, seconds):
+        """
+        Records one latency observation.
+
+        Args:
+            seconds (float): The observed latency.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """
+        Estimates a percentile as the upper bound of the bucket that contains it.
+
+        Args:
+            q (float): The percentile to estimate, between 0 and 100.
+
+        Returns:
+            float: The estimated latency in seconds, or 0.0 when nothing was recorded.
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q / 100 * self.count
+            seen = 0
+            for bound, count in zip(self.BUCKETS, self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(bound, self.max)
+            return self.max
+
+    def summary(self):
+        """
+        Formats the histogram as a single human-readable line.
+
+        Returns:
+            str: Count, mean, p50/p95/max and the per-bucket counts.
+        """
+        mean = self.total / self.count if self.count else 0.0
+        buckets = " ".join(
+            f"<={bound:g}s:{count}" for bound, count in zip(self.BUCKETS, self.counts) if count
+        )
+        return (
+            f"n={self.count} mean={mean:.3f}s p50={self.percentile(50):.3f}s "
+            f"p95={self.percentile(95):.3f}s max={self.max:.3f}s [{buckets}]"
+        )
+
+
+class FetchClient:
+    """
+    A reusable HTTP client built around a pooled, keep-alive `requests.Session`.
+
+    Transient failures (connection errors, read timeouts and 429/5xx responses)
+    are retried with exponential backoff, honouring `Retry-After` when the server
+    sends it. Every request's latency is recorded in `histogram`.
+
+    When a `ResponseCache` is given, requests for cached URLs are sent as
+    conditional GETs and a `304 Not Modified` reuses the cached body. When a
+    `PageArchive` is given, every body returned by `fetch` is appended to it.
+    """
+
+    def __init__(self, pool_size=10, connect_timeout=5.0, read_timeout=30.0, retries=3, backoff_factor=0.5,
+                 headers=None, cache=None, archive=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.archive = archive
+        self.histogram = LatencyHistogram()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS if headers is None else headers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        """
+        Sends a GET request through the pooled session and records its latency.
+
+        Args:
+            url (str): The target URL.
+            **kwargs: Extra arguments forwarded to `requests.Session.get`.
+
+        Returns:
+            requests.Response: The final response after any retries.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            return self.session.get(url, **kwargs)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+    def fetch(self, url):
+        """
+        Fetches the body of a URL, raising on any HTTP error status.
+
+        Args:
+            url (str): The target URL.
+
+        Returns:
+            bytes: The raw response body, possibly served from the cache after a 304.
+        """
+        content = self._fetch(url)
+        if self.archive is not None and content:
+            self.archive.append(url, content)
+        return content
+
+    def _fetch(self, url):
+        if self.cache is None:
+            response = self.get(url)
+            response.raise_for_status()
+            return response.content
+
+        response = self.get(url, headers=self.cache.conditional_headers(url))
+        if response.status_code == 304:
+            body = self.cache.load(url)
+            if body is not None:
+                return body
+            response = self.get(url)
+
+        response.raise_for_status()
+        self.cache.store(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.content
+
+    def close(self):
+        """
+        Closes every pooled connection.
+
+        Returns:
+            None
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import re
+from collections import namedtuple
+
+EXCHANGE_RATE_USD_TO_IDR = 16000
+
+FieldSpec = namedtuple("FieldSpec", ["name", "column", "selector", "prefix", "pattern", "type", "invalid", "required",
+                                     "contains"], defaults=(False,))
+FieldSpec.__doc__ = """
+The declarative description of one product field.
+
+`name` is the key of the raw, scraped value and `column` the key of the
+cleaned one. `selector` is the CSS selector of the element holding the field:
+a single class (".price") or a class and a tag (".product-details p").
+Fields without a `prefix` take the text of the first element matching their
+selector. Fields with a `prefix` share their selector with other fields and
+claim the element whose text contains the prefix.
+
+`pattern` must match the whole text, give or take surrounding whitespace, and
+its first group is passed to `type` to produce the cleaned value. The field makes a product invalid when
+its text is one of the `invalid` sentinel values, or when it is `required`
+and missing. With `contains`, a text holding a sentinel anywhere, such as
+"Rating: ⭐ Invalid Rating / 5", is invalid too.
+"""
+
+
+def usd_to_idr(value):
+    """Converts a USD amount, as text, to whole Indonesian Rupiah."""
+    return round(float(value) * EXCHANGE_RATE_USD_TO_IDR)
+
+
+# The pandas dtype of the cleaned column for each field type; the CSV, Parquet and PostgreSQL
+# schemas are derived from it. Other types, such as str.lower, give text columns.
+DTYPES = {str: "object", float: "float64", int: "int64", usd_to_idr: "float64"}
+
+
+DETAILS = ".product-details p"
+# Distinct raw texts remembered per field; scraped values repeat a small set of sizes, genders, ratings and prices
+CACHE_SIZE = 4096
+NUMBER = r"[+-]?\d+(?:\.\d*)?"
+# A pattern that keeps the whole text; such str fields are cleaned by stripping, without a regex
+WHOLE_TEXT = r"(.*?)"
+
+# Adding a field means adding its spec here: extraction, cleaning and the CSV, Parquet and PostgreSQL
+# sinks follow it, and existing CSV histories and tables gain the column. Two parts do not: the
+# analytics store keeps a fixed projection and ignores new fields, and the typed records in
+# utils.records have one attribute per field, so they have to be extended by hand.
+FIELDS = (
+    FieldSpec(name="Title", column="Title", selector=".product-title", prefix=None,
+              pattern=WHOLE_TEXT, type=str, invalid=("Unknown Product",), required=True),
+    FieldSpec(name="Price", column="Price (IDR)", selector=".price", prefix=None,
+              pattern=rf"\$?\s*({NUMBER})", type=usd_to_idr, invalid=("Price Unavailable",), required=True),
+    FieldSpec(name="Rating", column="Rating", selector=DETAILS, prefix="Rating:",
+              pattern=rf"Rating:\s*⭐?\s*({NUMBER})\s*/\s*5", type=float, invalid=("Invalid",), required=True,
+              contains=True),
+    FieldSpec(name="Colors", column="Colors", selector=DETAILS, prefix="Colors",
+              pattern=r"([+-]?\d+)\s*Colors", type=int, invalid=(), required=True),
+    FieldSpec(name="Size", column="Size", selector=DETAILS, prefix="Size:",
+              pattern=r"Size:\s*(.*?)", type=str, invalid=(), required=True),
+    FieldSpec(name="Gender", column="Gender", selector=DETAILS, prefix="Gender:",
+              pattern=r"Gender:\s*(.*?)", type=str, invalid=(), required=True),
+)
+
+
+def css_parts(selector):
+    """
+    Splits a spec selector into its class and optional descendant tag.
+
+    Args:
+        selector (str): A selector such as ".price" or ".product-details p".
+
+    Returns:
+        tuple: `(class_name, tag)`, where `tag` is None for a bare class selector.
+    """
+    class_name, _, tag = selector.partition(" ")
+    if not class_name.startswith(".") or " " in tag:
+        raise ValueError(f"Unsupported field selector {selector!r}; expected '.class' or '.class tag'.")
+    return class_name[1:], tag or None
+
+
+# The cached outcome of a text that is, or holds, a sentinel value
+_INVALID = object()
+
+
+def field_dtype(field):
+    """
+    Returns the pandas dtype of a field's cleaned column.
+
+    Args:
+        field (FieldSpec): The field.
+
+    Returns:
+        str: The dtype from `DTYPES`; an optional integer field is nullable ("Int64").
+    """
+    dtype = DTYPES.get(field.type, "object")
+    return "Int64" if dtype == "int64" and not field.required else dtype
+
+
+def spec_version(fields=FIELDS):
+    """
+    Fingerprints the field specs and the exchange rate, which together decide how a raw product is cleaned.
+
+    Args:
+        fields (iterable): The field specs.
+
+    Returns:
+        str: A short hex digest that changes whenever a spec or the exchange rate changes.
+    """
+    described = [[*field._replace(type=f"{getattr(field.type, '__module__', None)}.{field.type.__qualname__}")]
+                 for field in fields]
+    payload = json.dumps([described, EXCHANGE_RATE_USD_TO_IDR], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _sentinel_pattern(field):
+    alternatives = "|".join(map(re.escape, field.invalid))
+    return alternatives if field.contains else rf"\A(?:{alternatives})\Z"
+
+
+class _Unparsable(str):
+    """The cached outcome of a text that does not match its field's pattern: the error message."""
+
+
+class FieldSchema:
+    """
+    A set of `FieldSpec`s compiled for extraction and cleaning.
+
+    Every pattern is compiled once, anchored to the whole text, and every
+    field's sentinel values are folded into one regular expression, anchored
+    too unless the field matches sentinels by containment. Labelled
+    detail texts are classified by a single search over an alternation of all
+    prefixes, so each text is scanned once to classify it and once to clean it.
+    The outcome of cleaning a text is cached per field, so a repeated value
+    is a dictionary lookup.
+    """
+
+    def __init__(self, fields=FIELDS):
+        self.fields = tuple(fields)
+        self.names = tuple(field.name for field in self.fields)
+        self.columns = tuple(field.column for field in self.fields)
+        self.required = tuple(field.name for field in self.fields if field.required)
+        self.dtypes = {field.column: field_dtype(field) for field in self.fields}
+        self.version = spec_version(self.fields)
+
+        self.types = {field.name: field.type for field in self.fields}
+        self.patterns = {field.name: re.compile(rf"\A\s*(?:{field.pattern})\s*\Z", re.DOTALL)
+                         for field in self.fields}
+        self.verbatim = frozenset(field.name for field in self.fields
+                                  if field.pattern == WHOLE_TEXT and field.type is str)
+        self.sentinels = {field.name: re.compile(_sentinel_pattern(field)) for field in self.fields if field.invalid}
+        # Flat tuples keep the per-card loops free of attribute and dictionary lookups; verbatim
+        # fields such as titles are mostly distinct, so they are not cached
+        self._caches = {field.name: None if field.name in self.verbatim else {} for field in self.fields}
+        self._cleaners = tuple((field.name, field.column, field.required, self._caches[field.name])
+                               for field in self.fields)
+        self._sentinel_searches = tuple((name, sentinel.search) for name, sentinel in self.sentinels.items())
+
+        # Fields read from their own element, and the shared selectors whose elements are classified by prefix
+        self.own = tuple((field.name, field.selector) for field in self.fields if field.prefix is None)
+        labelled = [field for field in self.fields if field.prefix is not None]
+        self.shared = tuple(dict.fromkeys(field.selector for field in labelled))
+        self._labels = re.compile("|".join(f"(?P<f{i}>{re.escape(field.prefix)})" for i, field in enumerate(labelled)))
+        self._label_names = {f"f{i}": field.name for i, field in enumerate(labelled)}
+
+    def classify(self, texts):
+        """
+        Assigns labelled texts, such as the detail paragraphs of a card, to their fields.
+
+        Args:
+            texts (iterable): The stripped texts of the elements matching the shared selectors.
+
+        Returns:
+            dict: Field names mapped to their raw text; a later text wins over an earlier one.
+        """
+        raw = {}
+        if not self._label_names:
+            return raw
+        for text in texts:
+            match = self._labels.search(text)
+            if match:
+                raw[self._label_names[match.lastgroup]] = text
+        return raw
+
+    def is_valid(self, item):
+        """
+        Checks a raw product against the required fields and sentinel values.
+
+        Args:
+            item (dict): Field names mapped to raw text.
+
+        Returns:
+            bool: True if every required field is present and no field is, or holds, a sentinel value.
+        """
+        for name in self.required:
+            if item.get(name) is None:
+                return False
+        for name, search in self._sentinel_searches:
+            text = item.get(name)
+            if text is not None and search(text):
+                return False
+        return True
+
+    def parse(self, name, text):
+        """
+        Cleans the raw text of one field.
+
+        Args:
+            name (str): The field name.
+            text (str): The raw text.
+
+        Returns:
+            The typed value.
+
+        Raises:
+            ValueError: If the text does not match the field's pattern or cannot be converted.
+        """
+        if name in self.verbatim:
+            return text.strip()
+        match = self.patterns[name].match(text)
+        if match is None:
+            raise ValueError(f"Cannot parse {name} from {text!r}")
+        return self.types[name](match.group(1))
+
+    def _outcome(self, name, text):
+        sentinel = self.sentinels.get(name)
+        if sentinel is not None and sentinel.search(text):
+            return _INVALID
+        if name in self.verbatim:
+            return text.strip()
+        match = self.patterns[name].match(text)
+        if match is None:
+            return _Unparsable(f"Cannot parse {name} from {text!r}")
+        return self.types[name](match.group(1))
+
+    def clean(self, item):
+        """
+        Validates and cleans a raw product in one pass over its fields.
+
+        Args:
+            item (dict): Field names mapped to raw text.
+
+        Returns:
+            dict or None: Cleaned column names mapped to typed values, or None if the product is
+                invalid (see `is_valid`). Optional fields that are missing are None.
+
+        Raises:
+            ValueError: If a field of a valid product cannot be parsed.
+        """
+        cleaned = {}
+        error = None
+        for name, column, required, cache in self._cleaners:
+            text = item.get(name)
+            if text is None:
+                if required:
+                    return None
+                cleaned[column] = None
+                continue
+
+            if cache is None:
+                outcome = self._outcome(name, text)
+            else:
+                outcome = cache.get(text, cache)
+                if outcome is cache:
+                    outcome = self._outcome(name, text)
+                    if len(cache) >= CACHE_SIZE:
+                        cache.clear()
+                    cache[text] = outcome
+
+            if outcome is _INVALID:
+                return None
+            if type(outcome) is _Unparsable:
+                error = error or outcome
+            else:
+                cleaned[column] = outcome
+
+        if error is not None:
+            raise ValueError(str(error))
+        return cleaned
+
+
+SCHEMA = FieldSchema()
@@ -0,0 +1,260 @@
+import csv
+import mmap
+import os
+
+import pandas as pd
+
+from utils.atomic import atomic_path, atomic_write
+from utils.fields import SCHEMA
+from utils.metrics import timed
+
+HISTORY_FILE = "fashion_products.csv"
+HISTORY_COLUMNS = [*SCHEMA.columns, "Timestamp"]
+HISTORY_DTYPES = dict(SCHEMA.dtypes)
+HISTORY_DATE_COLUMNS = ["Timestamp"]
+DEFAULT_CHUNK_ROWS = 100_000
+# Holds the size of the file before an append, until the append is durable
+JOURNAL_SUFFIX = ".journal"
+
+
+def read_header(filename):
+    """
+    Reads the column names of a CSV file without loading its rows.
+
+    Args:
+        filename (str): The CSV file.
+
+    Returns:
+        list or None: The header columns, or None if the file is missing or empty.
+    """
+    try:
+        with open(filename, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+
+def _journal_path(filename):
+    return f"{filename}{JOURNAL_SUFFIX}"
+
+
+def _read_journal(filename):
+    try:
+        with open(_journal_path(filename), encoding="utf-8") as f:
+            return int(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_journal(filename, size):
+    atomic_write(_journal_path(filename), str(size), durable=True)
+
+
+def committed_size(filename):
+    """
+    Returns the size of a CSV file without the rows of an append that is in progress or was interrupted.
+
+    Args:
+        filename (str): The CSV file.
+
+    Returns:
+        int or None: The committed size in bytes, or None if the file is missing.
+    """
+    try:
+        size = os.path.getsize(filename)
+    except FileNotFoundError:
+        return None
+    journaled = _read_journal(filename)
+    return size if journaled is None else min(size, journaled)
+
+
+def _recover(filename):
+    # An append that died left its journal behind; cut the file back to the size recorded there
+    journaled = _read_journal(filename)
+    if journaled is None:
+        return
+    if os.path.exists(filename):
+        with open(filename, "r+b") as f:
+            f.truncate(journaled)
+    os.remove(_journal_path(filename))
+
+
+class HistoryAppender:
+    """
+    Appends DataFrames to a CSV file in place, as one atomic unit.
+
+    Before anything is written, the current size of the file is recorded in a
+    journal next to it. The rows are then appended in place and flushed to
+    disk, and the journal is removed. If the append fails, the file is cut
+    back to the journaled size; if the process dies, the next appender does
+    that. `iter_history` stops at the journaled size while the journal exists,
+    so readers only ever see whole appends. Unlike copying the file to a temp
+    file and renaming it, an append costs I/O in proportion to the new rows,
+    not to the size of the history.
+
+    A missing file is created with a header. Every frame's columns must match
+    the header, except that the first frame may add columns, such as the
+    column of a field added to the spec: the file is then rewritten once
+    under the new header, with the new columns empty in the existing rows.
+    """
+
+    def __init__(self, filename=HISTORY_FILE):
+        self.filename = filename
+        self.rows = 0
+        self._file = None
+
+    def __enter__(self):
+        _recover(self.filename)
+        self.header = read_header(self.filename)
+        self._created = not os.path.exists(self.filename)
+        self._open()
+        return self
+
+    def _open(self):
+        self._file = open(self.filename, "a+b")
+        self._size = self._file.seek(0, os.SEEK_END)
+        try:
+            _write_journal(self.filename, self._size)
+            if self._size:
+                self._file.seek(-1, os.SEEK_END)
+                if self._file.read(1) != b"\n":
+                    self._file.write(b"\n")
+        except BaseException:
+            self._rollback()
+            raise
+
+    def write(self, df):
+        """
+        Appends the rows of a DataFrame.
+
+        Args:
+            df (pd.DataFrame): The rows to append.
+
+        Raises:
+            ValueError: If the columns do not match the header of the file, and cannot be added to it.
+        """
+        columns = [str(column) for column in df.columns]
+        if self.header is not None and self.header != columns:
+            if self.rows or not set(self.header) < set(columns):
+                raise ValueError(f"Columns {list(df.columns)} do not match the header of {self.filename}: "
+                                 f"{self.header}")
+            self._add_columns(columns)
+
+        self._file.write(df.to_csv(index=False, header=self.header is None).encode("utf-8"))
+        self.header = columns
+        self.rows += len(df)
+
+    def _add_columns(self, columns):
+        # Nothing was appended yet, so the file is as committed and the journal can go while
+        # the file is replaced; after a crash it is either the old or the rewritten file
+        self._file.close()
+        os.remove(_journal_path(self.filename))
+        with atomic_path(self.filename) as tmp_path, open(tmp_path, "w", newline="", encoding="utf-8") as out:
+            out.write(pd.DataFrame(columns=columns).to_csv(index=False))
+            with pd.read_csv(self.filename, chunksize=DEFAULT_CHUNK_ROWS, dtype=str, na_filter=False,
+                             encoding="utf-8") as reader:
+                for chunk in reader:
+                    out.write(chunk.reindex(columns=columns, fill_value="").to_csv(index=False, header=False))
+        print(f"[WARN] Rewrote {self.filename} to add column(s) "
+              f"{[column for column in columns if column not in self.header]}.")
+        self.header = columns
+        self._open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException:
+                self._rollback()
+                raise
+            self._file.close()
+            os.remove(_journal_path(self.filename))
+        else:
+            self._rollback()
+
+    def _rollback(self):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        if self._created:
+            os.remove(self.filename)
+        else:
+            with open(self.filename, "r+b") as f:
+                f.truncate(self._size)
+        if os.path.exists(_journal_path(self.filename)):
+            os.remove(_journal_path(self.filename))
+
+
+@timed("load_csv_history", profile=True)
+def append_csv_atomic(df, filename=HISTORY_FILE):
+    """
+    Appends a DataFrame to a CSV file so readers only ever see the old or the new rows.
+
+    See `HistoryAppender`. A missing file is created with a header.
+
+    Args:
+        df (pd.DataFrame): The rows to append; columns must match the existing header.
+        filename (str): The CSV file to append to.
+
+    Returns:
+        int: The number of rows appended.
+    """
+    with HistoryAppender(filename) as history:
+        history.write(df)
+
+    print(f"Data successfully appended to {filename} ({len(df)} rows).")
+    return len(df)
+
+
+def iter_history(filename=HISTORY_FILE, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None):
+    """
+    Reads the historical CSV in fixed-size chunks with explicit dtypes.
+
+    The file is memory-mapped and parsed one chunk at a time, so a multi-GB
+    history never has to fit in memory and no dtype inference is needed. Rows
+    of an append that is still in progress are not read.
+
+    Args:
+        filename (str): The CSV file to read.
+        chunk_rows (int): The number of rows per chunk.
+        columns (list, optional): The columns to read. Defaults to all of them.
+
+    Yields:
+        pd.DataFrame: A chunk with the same dtypes `convert_dtypes` produces.
+    """
+    size = committed_size(filename)
+    if not size:
+        return
+
+    dtypes = {column: dtype for column, dtype in HISTORY_DTYPES.items() if columns is None or column in columns}
+    dates = [column for column in HISTORY_DATE_COLUMNS if columns is None or column in columns]
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as view:
+        with pd.read_csv(view, chunksize=chunk_rows, usecols=columns, dtype=dtypes, encoding="utf-8") as reader:
+            for chunk in reader:
+                for column in dates:
+                    chunk[column] = pd.to_datetime(chunk[column], errors="coerce", format="ISO8601")
+                yield chunk
+
+
+def iter_history_records(filename=HISTORY_FILE, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Reads the historical CSV as a stream of cleaned product dictionaries.
+
+    This is the row-level counterpart of `iter_history`, shaped like the output
+    of `utils.transform.clean_data`, for backfills that work on records.
+
+    Args:
+        filename (str): The CSV file to read.
+        chunk_rows (int): The number of rows parsed at a time.
+
+    Yields:
+        dict: A cleaned product.
+    """
+    for chunk in iter_history(filename, chunk_rows):
+        chunk = chunk.astype({"Timestamp": object}).where(chunk.notna(), None)
+        for record in chunk.to_dict("records"):
+            if record.get("Timestamp") is not None:
+                record["Timestamp"] = record["Timestamp"].isoformat()
+            yield record
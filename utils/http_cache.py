@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from utils.atomic import atomic_write
+
+INDEX_FILE = "index.json"
+
+
+class ResponseCache:
+    """
+    An on-disk cache of response bodies and their HTTP validators.
+
+    Bodies are stored one file per URL next to a JSON index that keeps the
+    `ETag`/`Last-Modified` validators in least-recently-used order. When the
+    total body size exceeds `max_bytes`, the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._index = OrderedDict(self._read_index())
+        self.total_bytes = sum(entry["size"] for entry in self._index.values())
+
+    def conditional_headers(self, url):
+        """
+        Builds the conditional request headers for a cached URL.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            dict: `If-None-Match` / `If-Modified-Since` headers, empty if the URL is not cached.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load(self, url):
+        """
+        Returns the cached body of a URL after a `304 Not Modified` and marks it as recently used.
+
+        Args:
+            url (str): The cached URL.
+
+        Returns:
+            bytes or None: The cached body, or None if the entry is missing or unreadable.
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            try:
+                with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                    body = f.read()
+            except OSError:
+                self._drop(url)
+                self._write_index()
+                return None
+
+            self._index.move_to_end(url)
+            self._write_index()
+            self.hits += 1
+            return body
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Stores a freshly downloaded body with its validators.
+
+        Responses without any validator cannot be revalidated, so they are only
+        counted as a miss and not written to disk.
+
+        Args:
+            url (str): The requested URL.
+            body (bytes): The response body.
+            etag (str, optional): The `ETag` response header.
+            last_modified (str, optional): The `Last-Modified` response header.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.misses += 1
+            if url in self._index:
+                self._drop(url)
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                self._write_index()
+                return
+
+            filename = hashlib.sha256(url.encode("utf-8")).hexdigest()
+            atomic_write(os.path.join(self.directory, filename), body)
+            self._index[url] = {
+                "file": filename,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(body),
+            }
+            self.total_bytes += len(body)
+
+            while self.total_bytes > self.max_bytes:
+                self._drop(next(iter(self._index)))
+            self._write_index()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Hits, misses, number of entries and total cached bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self.total_bytes,
+            }
+
+    def reset_stats(self):
+        """
+        Zeroes the hit and miss counters, e.g. at the start of a run; the cached entries are kept.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _drop(self, url):
+        entry = self._index.pop(url)
+        self.total_bytes -= entry["size"]
+        try:
+            os.remove(os.path.join(self.directory, entry["file"]))
+        except OSError:
+            pass
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write_index(self):
+        atomic_write(os.path.join(self.directory, INDEX_FILE), json.dumps(list(self._index.items())))
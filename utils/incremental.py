@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from utils.atomic import atomic_write
+from utils.extract import get_default_client, iter_pages, parse_page, report_fetch_stats, reset_fetch_stats
+from utils.fields import SCHEMA
+from utils.metrics import PAGES_PER_SECOND, set_gauge, timer
+from utils.pagination import discover_page_count, iter_pages_unordered
+from utils.transform import clean_data, remove_duplicates
+
+MANIFEST_FILE = "manifest.json"
+
+
+class PageStore:
+    """
+    A local store of the cleaned rows extracted from each catalogue page.
+
+    A manifest maps every page URL to the SHA-256 of the content it was
+    extracted from, and the rows themselves are kept in one JSON file per page.
+    A page whose content hash is unchanged can reuse its stored rows instead of
+    being parsed and cleaned again. Rows are stored without their `Timestamp`,
+    which belongs to the scrape that fetched the page, not to its content.
+
+    Every entry also records the version of the field specs that cleaned its
+    rows (`utils.fields.spec_version`), so rows cleaned under other rules are
+    treated as missing and the page is cleaned again.
+    """
+
+    def __init__(self, directory, version=SCHEMA.version):
+        self.directory = directory
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    @staticmethod
+    def digest(content):
+        """
+        Hashes the raw content of a page.
+
+        Args:
+            content (bytes): The raw HTML of the page.
+
+        Returns:
+            str: The hex SHA-256 digest.
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def lookup(self, url, digest):
+        """
+        Returns the stored rows of a page if its content is unchanged.
+
+        Args:
+            url (str): The page URL.
+            digest (str): The content hash of the freshly fetched page.
+
+        Returns:
+            list or None: The stored cleaned rows without their `Timestamp`, or None if the page changed,
+                was cleaned by another version of the field specs or was never stored.
+        """
+        entry = self.manifest.get(url)
+        if entry is None or entry["hash"] != digest or entry.get("version") != self.version:
+            return None
+        try:
+            with open(os.path.join(self.directory, entry["file"]), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, digest, rows):
+        """
+        Stores the cleaned rows of a page under its content hash.
+
+        Args:
+            url (str): The page URL.
+            digest (str): The content hash of the page.
+            rows (list): The cleaned product dictionaries extracted from the page.
+
+        Returns:
+            None
+        """
+        filename = hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json"
+        rows = [{key: value for key, value in row.items() if key != "Timestamp"} for row in rows]
+        atomic_write(os.path.join(self.directory, filename), json.dumps(rows))
+        self.manifest[url] = {"hash": digest, "file": filename, "version": self.version}
+
+    def save(self, seen_urls=None):
+        """
+        Persists the manifest, dropping pages that were not seen in the latest run.
+
+        Args:
+            seen_urls (set, optional): URLs fetched in the latest run. None keeps every entry.
+
+        Returns:
+            None
+        """
+        if seen_urls is not None:
+            for url in set(self.manifest) - set(seen_urls):
+                entry = self.manifest.pop(url)
+                try:
+                    os.remove(os.path.join(self.directory, entry["file"]))
+                except OSError:
+                    pass
+        atomic_write(os.path.join(self.directory, MANIFEST_FILE), json.dumps(self.manifest))
+
+
+class IncrementalResult:
+    """
+    The outcome of an incremental scrape.
+
+    Attributes:
+        rows (list): Every cleaned row of the catalogue, deduplicated, in page order.
+        changed (list): The cleaned rows of pages that were parsed in this run.
+        pages_changed (int): The number of pages that were parsed and cleaned.
+        pages_unchanged (int): The number of pages whose stored rows were reused.
+    """
+
+    def __init__(self, rows, changed, pages_changed, pages_unchanged):
+        self.rows = rows
+        self.changed = changed
+        self.pages_changed = pages_changed
+        self.pages_unchanged = pages_unchanged
+
+
+def scrape_incremental(base_url, max_pages, delay, store, workers=1, rate=None, client=None, checkpoint=None,
+                       discover=False):
+    """
+    Scrapes and cleans the catalogue, only parsing pages whose content changed.
+
+    Pages are still fetched (cheaply, when the client has a response cache), but
+    a page whose content hash matches the manifest reuses its stored cleaned rows
+    instead of going through `parse_page` and `clean_data` again.
+
+    With `discover`, the page count is found up front by `discover_page_count`
+    and the pages are fetched as an unordered work list, so a slow page never
+    holds up the others; rows are still returned in page order.
+
+    Args:
+        base_url (str): The base URL of the site to scrape.
+        max_pages (int or None): The maximum number of pages to scrape. None means no limit with `discover`.
+        delay (int or float): Minimum time in seconds between page requests to the same host.
+        store (PageStore): The store holding the manifest and the rows of each page.
+        workers (int): The number of pages fetched concurrently.
+        rate (float or None): Requests per second allowed per host; overrides `delay` when given.
+        client (FetchClient, optional): The client used to fetch pages.
+        checkpoint (RunCheckpoint, optional): The run checkpoint. Every page's rows are saved to it,
+            and pages it already holds are reused rather than fetched again; they count as unchanged.
+        discover (bool): Discover the page count first instead of walking pages until one is missing.
+
+    Returns:
+        IncrementalResult: The full set of cleaned rows plus the rows of the changed pages.
+    """
+    client = client or get_default_client()
+    reset_fetch_stats(client)
+    rows_by_page, changed_by_page = {}, {}
+    seen_urls = set()
+    pages_changed = pages_unchanged = 0
+    start_page = 1
+
+    if checkpoint is not None:
+        # An unordered scrape can leave gaps, so it reuses every checkpointed page, not just the first run of them
+        start_page = checkpoint.next_page()
+        for page, url, page_rows in checkpoint.load_pages():
+            if discover or page < start_page:
+                seen_urls.add(url)
+                rows_by_page[page] = page_rows
+                pages_unchanged += 1
+        if pages_unchanged:
+            print(f"[INFO] Resuming run {checkpoint.run_id} with {pages_unchanged} checkpointed page(s).")
+
+    with timer("scrape", profile=True) as span:
+        start = time.perf_counter()
+        if discover:
+            page_count, prefetched = discover_page_count(base_url, client=client, max_pages=max_pages, delay=delay,
+                                                         rate=rate)
+            work = [page for page in range(1, page_count + 1) if page not in rows_by_page]
+            pages = iter_pages_unordered(base_url, work, delay=delay, workers=workers, rate=rate, client=client,
+                                         prefetched=prefetched)
+        else:
+            pages = iter_pages(base_url, max_pages, delay=delay, workers=workers, rate=rate, client=client,
+                               start_page=start_page)
+
+        fetched = 0
+        for page, url, content in pages:
+            fetched += 1
+            seen_urls.add(url)
+            digest = store.digest(content)
+            page_rows = store.lookup(url, digest)
+
+            if page_rows is None:
+                page_rows = clean_data(parse_page(content))
+                store.put(url, digest, page_rows)
+                changed_by_page[page] = page_rows
+                pages_changed += 1
+            else:
+                # Reused rows are dated by this fetch, like freshly parsed ones
+                fetched_at = datetime.now().isoformat()
+                page_rows = [{**row, "Timestamp": fetched_at} for row in page_rows]
+                pages_unchanged += 1
+
+            rows_by_page[page] = page_rows
+            if checkpoint is not None:
+                checkpoint.save_page(page, url, page_rows)
+
+        pages_per_second = fetched / max(time.perf_counter() - start, 1e-9)
+        set_gauge(PAGES_PER_SECOND, pages_per_second)
+        span.update(pages_changed=pages_changed, pages_unchanged=pages_unchanged,
+                    pages_per_second=f"{pages_per_second:.2f}")
+
+    store.save(seen_urls if seen_urls else None)
+    report_fetch_stats(client)
+    print(f"[INFO] Incremental scrape: {pages_changed} page(s) changed, {pages_unchanged} unchanged.")
+    rows = [row for page in sorted(rows_by_page) for row in rows_by_page[page]]
+    changed = [row for page in sorted(changed_by_page) for row in changed_by_page[page]]
+    return IncrementalResult(remove_duplicates(rows), remove_duplicates(changed), pages_changed, pages_unchanged)
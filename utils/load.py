@@ -1,25 +1,39 @@
-import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
-import pandas as pd
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from sqlalchemy import create_engine
+
+from utils.history import HistoryAppender
+from utils.metrics import SINK_FAILURES, SINK_SECONDS, increment, observe, timed
 
 load_dotenv()
 
-SERVICE_ACCOUNT_FILE = './client_secret.json'
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+SinkResult = namedtuple("SinkResult", ["name", "ok", "seconds", "error"])
+
+
+# The PostgreSQL and Sheets clients pull in SQLAlchemy and googleapiclient, which take a large
+# share of startup time, so they are only imported once a run actually uses those sinks.
+def timed_upsert(df, table_name, engine=None):
+    """Lazily imported `utils.postgres.timed_upsert`."""
+    from utils.postgres import timed_upsert as upsert
+    return upsert(df, table_name, engine=engine)
+
 
-DB_CONFIG = {
-    'username': os.getenv("DB_USERNAME"),
-    'password': os.getenv("DB_PASSWORD"),
-    'host': os.getenv("DB_HOST"),
-    'port': os.getenv("DB_PORT"),
-    'database': os.getenv("DB_NAME")
-}
+def apply_changes(changed, deleted, table_name, engine=None):
+    """Lazily imported `utils.postgres.apply_changes`."""
+    from utils.postgres import apply_changes as apply
+    return apply(changed, deleted, table_name, engine=engine)
 
 
+def write_frame(df, spreadsheet_id, range_name, **kwargs):
+    """Lazily imported `utils.sheets.write_frame`."""
+    from utils.sheets import write_frame as write
+    return write(df, spreadsheet_id, range_name, **kwargs)
+
+
+@timed("load_csv", profile=True)
 def save_to_csv(df, filename):
     """
     Saves a pandas DataFrame to a CSV file.
@@ -35,61 +49,189 @@ def save_to_csv(df, filename):
     print(f"Data successfully saved to {filename}.")
 
 
+def stream_to_csv(frames, filename):
+    """
+    Appends a stream of DataFrame chunks to the CSV history, passing every chunk through.
+
+    The chunks are appended as one atomic unit with `utils.history.HistoryAppender`,
+    like the batch CSV sink: a missing file is created with a header, and the
+    rows only become part of the history once the stream ends, so a stream that
+    fails or is abandoned leaves the history as it was. Because chunks are
+    yielded back after being written, streaming sinks can be chained and every
+    sink sees each chunk while only one chunk is held in memory.
+
+    Args:
+        frames (iterable): DataFrame chunks, e.g. from `utils.transform.iter_frames`.
+        filename (str): The CSV file to append to.
+
+    Yields:
+        pd.DataFrame: Each chunk, after it has been written.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        # An empty stream leaves the file untouched
+        return
+
+    with HistoryAppender(filename) as history:
+        for df in chain([first], frames):
+            history.write(df)
+            yield df
+
+    print(f"Data successfully appended to {filename} ({history.rows} rows).")
+
+
+@timed("load_google_sheets", profile=True)
 def save_to_google_sheets(df, spreadsheet_id, range_name):
     """
     Uploads a pandas DataFrame to a specific range in a Google Sheets spreadsheet.
 
+    Only the rows that changed since the last upload are written, in
+    size-bounded batches; see `utils.sheets.write_frame`. The DataFrame is not modified.
+
     Args:
         df (pd.DataFrame): The DataFrame to upload.
         spreadsheet_id (str): The ID of the target Google Sheets document.
         range_name (str): The A1 notation of the range to populate (e.g., "Sheet1!A1").
 
     Returns:
-        None
+        bool: True if the upload succeeded, otherwise False.
     """
-    df["Timestamp"] = df["Timestamp"].astype(str)
     try:
-        credential = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE).with_scopes(SCOPES)
-        service = build('sheets', 'v4', credentials=credential)
-        sheet = service.spreadsheets()
-
-        # Convert the DataFrame to a list of lists, including headers
-        values = [df.columns.tolist()] + df.values.tolist()
-        body = {'values': values}
-
-        # Upload data to Google Sheets
-        sheet.values().update(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-
-        print(f"Data successfully saved to Google Sheets in range '{range_name}'.")
+        cells = write_frame(df, spreadsheet_id, range_name)
+        print(f"Data successfully saved to Google Sheets in range '{range_name}' ({cells} cells updated).")
+        return True
 
     except Exception as e:
         print(f"[ERROR] Failed to save to Google Sheets: {e}")
+        return False
 
 
+@timed("load_postgresql", profile=True)
 def load_to_postgresql(df, table_name):
     """
     Loads a pandas DataFrame into a PostgreSQL database table.
 
+    Rows are bulk-copied into a staging table and upserted into the target on
+    (Title, Price (IDR), Rating) in a single transaction, so readers never see
+    the table missing or half-written. The process-wide engine from
+    `utils.postgres` is reused across calls.
+
     Args:
         df (pd.DataFrame): The DataFrame to store.
         table_name (str): The name of the target table in the database.
 
     Returns:
-        None
+        bool: True if the load succeeded, otherwise False.
     """
     try:
-        engine = create_engine(
-            f"postgresql+psycopg2://{DB_CONFIG['username']}:{DB_CONFIG['password']}"
-            f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-        )
-
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
+        timed_upsert(df, table_name)
         print(f"Data successfully saved to PostgreSQL table '{table_name}'.")
+        return True
 
     except Exception as e:
         print(f"[ERROR] Failed to save to PostgreSQL: {e}")
+        return False
+
+
+@timed("load_postgresql", profile=True)
+def load_changes_to_postgresql(changed, deleted, table_name):
+    """
+    Applies a change set to a PostgreSQL table: new and changed rows are upserted, removed rows deleted.
+
+    Both happen in one transaction, so the table moves from one run's catalogue to the next atomically.
+
+    Args:
+        changed (pd.DataFrame): The new and changed rows.
+        deleted (pd.DataFrame): The rows that disappeared since the previous run.
+        table_name (str): The name of the target table in the database.
+
+    Returns:
+        bool: True if the load succeeded, otherwise False.
+    """
+    try:
+        apply_changes(changed, deleted, table_name)
+        print(f"Changes successfully applied to PostgreSQL table '{table_name}'.")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Failed to apply changes to PostgreSQL: {e}")
+        return False
+
+
+def stream_to_postgresql(frames, table_name, failed=None):
+    """
+    Loads a stream of DataFrame chunks into a PostgreSQL table, passing every chunk through.
+
+    Every chunk is upserted in its own transaction with `utils.postgres.copy_upsert`. If loading
+    fails, the error is reported, "postgresql" is added to `failed` and the
+    remaining chunks are still passed through to the next sink.
+
+    Args:
+        frames (iterable): DataFrame chunks, e.g. from `utils.transform.iter_frames`.
+        table_name (str): The name of the target table in the database.
+        failed (set, optional): Collects the names of the sinks that failed.
+
+    Yields:
+        pd.DataFrame: Each chunk, after it has been loaded.
+    """
+    rows = 0
+    failing = False
+
+    for df in frames:
+        if not failing:
+            try:
+                timed_upsert(df, table_name)
+                rows += len(df)
+            except Exception as e:
+                print(f"[ERROR] Failed to save to PostgreSQL: {e}")
+                increment(SINK_FAILURES, sink="postgresql")
+                if failed is not None:
+                    failed.add("postgresql")
+                failing = True
+        yield df
+
+    if not failing:
+        print(f"Data successfully saved to PostgreSQL table '{table_name}' ({rows} rows).")
+
+
+def _run_sink(name, sink, df):
+    start = time.perf_counter()
+    try:
+        ok = sink(df) is not False
+        error = None if ok else "sink reported a failure"
+    except Exception as e:
+        ok, error = False, str(e)
+    return SinkResult(name, ok, time.perf_counter() - start, error)
+
+
+def run_sinks(df, sinks, max_workers=None):
+    """
+    Runs several load sinks concurrently on one snapshot of a DataFrame.
+
+    The frame is snapshotted once and every sink receives its own deep copy of
+    that snapshot, so a sink that modifies its input cannot affect what the
+    others load. A sink fails if it raises or returns False.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to load.
+        sinks (dict): Sink names mapped to callables taking the DataFrame.
+        max_workers (int, optional): The number of sinks run at once. Defaults to all of them.
+
+    Returns:
+        list: A `SinkResult(name, ok, seconds, error)` per sink, in registration order.
+    """
+    snapshot = df.copy(deep=True)
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(sinks), 1)) as executor:
+        futures = [
+            executor.submit(_run_sink, name, sink, snapshot.copy(deep=True)) for name, sink in sinks.items()
+        ]
+        results = [future.result() for future in futures]
+
+    for result in results:
+        observe(SINK_SECONDS, result.seconds, sink=result.name)
+        if not result.ok:
+            increment(SINK_FAILURES, sink=result.name)
+        status = "ok" if result.ok else f"FAILED ({result.error})"
+        print(f"[INFO] Sink '{result.name}': {status} in {result.seconds:.2f}s")
+    return results
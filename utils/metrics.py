@@ -0,0 +1,270 @@
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.atomic import atomic_write
+
+STAGE_SECONDS = "etl_stage_seconds"
+SINK_SECONDS = "etl_sink_seconds"
+SINK_FAILURES = "etl_sink_failures_total"
+PAGES_FETCHED = "etl_pages_fetched_total"
+BYTES_FETCHED = "etl_bytes_fetched_total"
+FETCH_FAILURES = "etl_fetch_failures_total"
+PAGES_PER_SECOND = "etl_scrape_pages_per_second"
+ROWS_IN = "etl_rows_in_total"
+ROWS_OUT = "etl_rows_out_total"
+ROWS_DROPPED = "etl_rows_dropped_total"
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """
+    A thread-safe registry of counters, gauges and timing summaries.
+
+    Every metric is identified by a name and a set of labels, following the
+    Prometheus data model, and can be exported as Prometheus text or JSON.
+    Values are per process: work done in `ProcessPoolExecutor` workers is not counted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.summaries = {}
+
+    def increment(self, name, value=1, **labels):
+        """Adds `value` to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Sets a gauge to `value`."""
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        """Records one duration in a summary of count, sum and max."""
+        key = _key(name, labels)
+        with self._lock:
+            count, total, peak = self.summaries.get(key, (0, 0.0, 0.0))
+            self.summaries[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    def value(self, name, **labels):
+        """
+        Returns:
+            The current value of a counter or gauge, or the summary `(count, sum, max)` of a timer; None if unset.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            for values in (self.counters, self.gauges, self.summaries):
+                if key in values:
+                    return values[key]
+        return None
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Every metric as JSON-serialisable `{"name", "labels", ...}` entries, grouped by kind.
+        """
+        with self._lock:
+            return {
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                "summaries": [{"name": name, "labels": dict(labels), "count": count, "sum": total, "max": peak}
+                              for (name, labels), (count, total, peak) in sorted(self.summaries.items())],
+            }
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in values}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines.extend(f"{name}{_format_labels(labels)} {value}"
+                                 for (metric, labels), value in sorted(values.items()) if metric == name)
+
+            for name in sorted({name for name, _ in self.summaries}):
+                lines.append(f"# TYPE {name} summary")
+                for (metric, labels), (count, total, peak) in sorted(self.summaries.items()):
+                    if metric == name:
+                        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+                        lines.append(f"{name}_max{_format_labels(labels)} {peak:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Writes the metrics to a file, as JSON if `path` ends in `.json` and as Prometheus text otherwise.
+
+        The file is replaced atomically so a scraper never reads a partial file.
+
+        Args:
+            path (str): The file to write.
+        """
+        if path.endswith(".json"):
+            body = json.dumps(self.snapshot(), indent=2)
+        else:
+            body = self.to_prometheus()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        atomic_write(path, body)
+        print(f"[INFO] Metrics written to {path}.")
+
+
+METRICS = Metrics()
+increment = METRICS.increment
+set_gauge = METRICS.set_gauge
+observe = METRICS.observe
+
+_profiles = {}
+_profiling = threading.local()
+_profile_dir = None
+
+
+def enable_profiling(directory):
+    """
+    Turns on cProfile for the stages timed with `profile=True`.
+
+    Calls of the same stage accumulate into one profile, written by `dump_profiles`.
+    The `ETL_PROFILE_DIR` environment variable has the same effect.
+
+    Args:
+        directory (str or None): Where profiles are written. None turns profiling off.
+    """
+    global _profile_dir
+    _profile_dir = directory
+
+
+def _profile_directory():
+    return _profile_dir or os.getenv("ETL_PROFILE_DIR")
+
+
+def dump_profiles():
+    """
+    Writes every stage profile collected so far to `<directory>/<stage>.prof`.
+
+    Returns:
+        list: The paths written.
+    """
+    directory = _profile_directory()
+    if not directory or not _profiles:
+        return []
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for stage, profile in sorted(_profiles.items()):
+        path = os.path.join(directory, f"{stage}.prof")
+        profile.dump_stats(path)
+        paths.append(path)
+    print(f"[INFO] Stage profiles written to {directory} ({len(paths)} file(s)).")
+    return paths
+
+
+@contextmanager
+def _profiled(stage):
+    # cProfile allows one active profiler per thread, so nested stages run unprofiled
+    if not _profile_directory() or getattr(_profiling, "active", False):
+        yield
+        return
+
+    profile = _profiles.setdefault(stage, cProfile.Profile())
+    _profiling.active = True
+    try:
+        profile.enable()
+    except ValueError:
+        # The stage is already being profiled in another thread
+        _profiling.active = False
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profile.disable()
+        _profiling.active = False
+
+
+@contextmanager
+def timer(stage, log=True, profile=False, metrics=None):
+    """
+    Times a block of code as a pipeline stage.
+
+    The duration is recorded in the `etl_stage_seconds` summary. The block can
+    add fields to the yielded dictionary, which are logged with the duration
+    as one `key=value` line when it finishes.
+
+    Args:
+        stage (str): The stage name, used as the `stage` label.
+        log (bool): Whether to print the structured log line.
+        profile (bool): Whether to run the stage under cProfile when profiling is enabled.
+        metrics (Metrics, optional): The registry to record in. Defaults to `METRICS`.
+
+    Yields:
+        dict: Extra fields for the log line.
+    """
+    metrics = metrics or METRICS
+    fields = {}
+    start = time.perf_counter()
+    try:
+        if profile:
+            with _profiled(stage):
+                yield fields
+        else:
+            yield fields
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe(STAGE_SECONDS, seconds, stage=stage)
+        if log:
+            extra = "".join(f" {name}={value}" for name, value in fields.items())
+            print(f"[INFO] stage={stage} seconds={seconds:.4f}{extra}")
+
+
+def timed(stage, log=True, profile=False):
+    """
+    Decorator form of `timer`.
+
+    Args:
+        stage (str): The stage name.
+        log (bool): Whether to print the structured log line.
+        profile (bool): Whether to run the stage under cProfile when profiling is enabled.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage, log=log, profile=profile):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
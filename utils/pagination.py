@@ -0,0 +1,178 @@
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from utils import extract
+from utils.extract import HostRateLimiter, get_default_client, page_url
+from utils.metrics import BYTES_FETCHED, PAGES_FETCHED, increment, timer
+
+# Any link to a numbered catalogue page, e.g. href="/page2" or href="https://host/page12"
+PAGE_LINK = re.compile(rb"""href=["'][^"']*?page(\d+)/?["']""")
+CARD_MARKER = b"collection-card"
+
+
+def pagination_hint(content):
+    """
+    Finds the highest page number linked from a page's pagination.
+
+    Args:
+        content (bytes): The raw HTML of a catalogue page.
+
+    Returns:
+        int: The highest linked page number, or 1 if the page links to none.
+    """
+    return max((int(number) for number in PAGE_LINK.findall(content or b"")), default=1)
+
+
+def _probe(client, url):
+    # A page beyond the end of the catalogue is a 404, or a page without product cards
+    # and is not worth an error in the log
+    try:
+        with timer("fetch", log=False):
+            content = client.fetch(url)
+    except requests.exceptions.RequestException:
+        return None
+    if not content or CARD_MARKER not in content:
+        return None
+
+    increment(PAGES_FETCHED)
+    increment(BYTES_FETCHED, len(content))
+    return content
+
+
+def discover_page_count(base_url, client=None, max_pages=None, delay=0, rate=None):
+    """
+    Finds the number of catalogue pages before scraping them.
+
+    The highest page linked from page 1's pagination is taken as a first guess
+    and checked. From the highest page known to exist, the end is probed at
+    exponentially growing distances and then located by binary search, so
+    finding the last of N pages takes O(log N) requests, and only two extra
+    requests when the pagination already links the last page. Pages are assumed
+    to be contiguous: if page n exists, so does every page before it.
+
+    Args:
+        base_url (str): The base URL of the site (must end with a slash).
+        client (FetchClient, optional): The client used to fetch pages. Defaults to the shared client.
+        max_pages (int, optional): An upper bound on the result; pages beyond it are never requested.
+        delay (int or float): Minimum seconds between probes; used to derive `rate` when it is not given.
+        rate (float or None): Requests per second allowed while probing. None derives it from `delay`.
+
+    Returns:
+        tuple: `(page_count, prefetched)`, where `prefetched` maps the page numbers fetched
+            while probing to their content, so they need not be fetched again.
+    """
+    client = client or get_default_client()
+    if rate is None:
+        rate = 1 / delay if delay > 0 else None
+    limiter = HostRateLimiter(rate)
+    prefetched = {}
+
+    def exists(page):
+        if max_pages is not None and page > max_pages:
+            return False
+        if page not in prefetched:
+            url = page_url(base_url, page)
+            limiter.acquire(url)
+            content = _probe(client, url)
+            if content is None:
+                return False
+            prefetched[page] = content
+        return True
+
+    if not exists(1):
+        return 0, prefetched
+
+    hint = pagination_hint(prefetched[1])
+    if max_pages is not None:
+        hint = min(hint, max_pages)
+
+    if hint > 1 and not exists(hint):
+        low, high = 1, hint
+    else:
+        low, step = hint, 1
+        while exists(low + step):
+            low += step
+            step *= 2
+        high = low + step
+
+    # Invariant: page `low` exists and page `high` does not
+    while high - low > 1:
+        middle = (low + high) // 2
+        if exists(middle):
+            low = middle
+        else:
+            high = middle
+
+    print(f"[INFO] Discovered {low} catalogue page(s) with {len(prefetched)} probe(s).")
+    return low, prefetched
+
+
+def iter_pages_unordered(base_url, pages, delay=0, workers=1, rate=None, client=None, prefetched=None):
+    """
+    Fetches a work list of catalogue pages and yields them as they complete.
+
+    Unlike `utils.extract.iter_pages`, pages are not fetched or yielded in order
+    and a missing page does not end the scrape, so every worker stays busy even
+    when one page is slow. At most `workers` requests are in flight, and they
+    still start at least `delay` apart.
+
+    Args:
+        base_url (str): The base URL of the site to scrape.
+        pages (iterable): The page numbers to fetch, e.g. `range(1, page_count + 1)`.
+        delay (int or float): Minimum seconds between requests; used to derive `rate` when it is not given.
+        workers (int): The number of concurrent requests.
+        rate (float or None): Requests per second allowed per host. None derives it from `delay`.
+        client (FetchClient, optional): The client used to fetch pages. Defaults to the shared client.
+        prefetched (dict, optional): Page numbers mapped to content already fetched, e.g. by
+            `discover_page_count`; these are yielded first without another request.
+
+    Yields:
+        tuple: `(page, url, content)` for every page fetched successfully, in completion order.
+    """
+    if rate is None:
+        rate = 1 / delay if delay > 0 else None
+    # A bucket of one token: workers overlap slow responses, they never send a burst
+    limiter = HostRateLimiter(rate)
+    prefetched = prefetched or {}
+
+    def fetch(page):
+        url = page_url(base_url, page)
+        limiter.acquire(url)
+        print(f"[INFO] Scraping page: {url}")
+        return extract.fetching_content(url, client=client)
+
+    work = []
+    for page in pages:
+        if page in prefetched:
+            yield page, page_url(base_url, page), prefetched[page]
+        else:
+            work.append(page)
+
+    work = iter(work)
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+    pending = {}
+    try:
+        for page in work:
+            pending[executor.submit(fetch, page)] = page
+            if len(pending) >= workers:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = pending.pop(future)
+                next_page = next(work, None)
+                if next_page is not None:
+                    pending[executor.submit(fetch, next_page)] = next_page
+
+                content = future.result()
+                if not content:
+                    print(f"[WARN] No content on page {page}; skipping it.")
+                    continue
+                yield page, page_url(base_url, page), content
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,102 @@
+import os
+import uuid
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency of the Parquet sink
+    pa = pq = None
+
+from utils.atomic import atomic_path
+from utils.fields import SCHEMA
+from utils.metrics import timed
+
+PARQUET_DIR = "fashion_products_parquet"
+PARTITION_COLUMN = "scrape_date"
+UNKNOWN_PARTITION = "unknown"
+
+
+def product_schema():
+    """
+    Declares the Arrow schema of the cleaned fashion products.
+
+    There is one column per field in `utils.fields.SCHEMA`, typed by its dtype,
+    followed by the scrape `Timestamp`. Files written before a field was added
+    read back with nulls in its column.
+
+    Returns:
+        pyarrow.Schema: The column names and types written to every Parquet file.
+    """
+    _require_pyarrow()
+    arrow_types = {"object": pa.string(), "float64": pa.float64(), "int64": pa.int64(), "Int64": pa.int64()}
+    return pa.schema([
+        *((column, arrow_types[dtype]) for column, dtype in SCHEMA.dtypes.items()),
+        ("Timestamp", pa.timestamp("us")),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Parquet sink requires the pyarrow package (pip install pyarrow).")
+
+
+@timed("load_parquet", profile=True)
+def save_to_parquet(df, root_dir=PARQUET_DIR, compression="zstd", run_id=None):
+    """
+    Appends a DataFrame to a Parquet dataset partitioned by scrape date.
+
+    Rows are grouped by the date of their Timestamp into hive-style
+    `scrape_date=YYYY-MM-DD` directories. Each run adds new part files named
+    after its run ID, written to a temporary name and renamed into place, so
+    existing partitions are never rewritten.
+
+    Args:
+        df (pd.DataFrame): The cleaned, type-converted products.
+        root_dir (str): The root directory of the dataset.
+        compression (str): The Parquet compression codec (e.g. "zstd", "snappy", "gzip").
+        run_id (str, optional): Names the part files of this run. Defaults to a timestamped random ID.
+
+    Returns:
+        list: The paths of the files written.
+    """
+    _require_pyarrow()
+    schema = product_schema()
+    run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    dates = df["Timestamp"].dt.strftime("%Y-%m-%d").fillna(UNKNOWN_PARTITION)
+    written = []
+    for scrape_date, group in df.groupby(dates, sort=True):
+        partition_dir = os.path.join(root_dir, f"{PARTITION_COLUMN}={scrape_date}")
+        os.makedirs(partition_dir, exist_ok=True)
+
+        path = os.path.join(partition_dir, f"part-{run_id}.parquet")
+        if os.path.exists(path):
+            raise FileExistsError(f"Partition file {path} already exists; run IDs must be unique.")
+
+        table = pa.Table.from_pandas(group[schema.names], schema=schema, preserve_index=False)
+        with atomic_path(path) as tmp_path:
+            pq.write_table(table, tmp_path, compression=compression)
+        written.append(path)
+
+    print(f"Data successfully saved to {root_dir} ({len(df)} rows in {len(written)} partition file(s)).")
+    return written
+
+
+def read_parquet(root_dir=PARQUET_DIR, columns=None, filters=None):
+    """
+    Reads the Parquet dataset back with its declared dtypes.
+
+    Args:
+        root_dir (str): The root directory of the dataset.
+        columns (list, optional): The columns to read. Defaults to all of them.
+        filters (list, optional): pyarrow filters, e.g. `[("scrape_date", "=", "2025-01-01")]`,
+                                  used to prune partitions.
+
+    Returns:
+        pd.DataFrame: The products, including the `scrape_date` partition column.
+    """
+    _require_pyarrow()
+    schema = product_schema().append(pa.field(PARTITION_COLUMN, pa.string()))
+    table = pq.read_table(root_dir, columns=columns, filters=filters, schema=schema, partitioning="hive")
+    return table.to_pandas()
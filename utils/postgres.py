@@ -0,0 +1,328 @@
+import os
+import threading
+import time
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import (Column, DateTime, Float, Index, Integer, MetaData, PrimaryKeyConstraint, Table, Text,
+                        create_engine, inspect)
+
+from utils.fields import SCHEMA
+
+load_dotenv()
+
+DB_CONFIG = {
+    'username': os.getenv("DB_USERNAME"),
+    'password': os.getenv("DB_PASSWORD"),
+    'host': os.getenv("DB_HOST"),
+    'port': os.getenv("DB_PORT"),
+    'database': os.getenv("DB_NAME")
+}
+
+# One pool per process: a few warm connections, checked before use and recycled
+# before typical server/proxy idle timeouts close them
+POOL_SETTINGS = {
+    'pool_size': int(os.getenv("DB_POOL_SIZE", "5")),
+    'max_overflow': int(os.getenv("DB_MAX_OVERFLOW", "5")),
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+}
+
+# Rows are upserted on the same key remove_duplicates uses
+NATURAL_KEY = ("Title", "Price (IDR)", "Rating")
+INDEXED_COLUMNS = ("Title", "Gender", "Timestamp")
+# The column type of each cleaned dtype in `utils.fields.SCHEMA.dtypes`
+SQL_TYPES = {"object": Text, "float64": lambda: Float(precision=53), "int64": Integer, "Int64": Integer}
+COPY_CHUNK_ROWS = 50_000
+COPY_NULL = r"\N"
+
+_ensured_tables = set()
+_ensured_lock = threading.Lock()
+
+
+def database_url():
+    """
+    Builds the PostgreSQL connection URL from `DB_CONFIG`.
+
+    Returns:
+        str: The SQLAlchemy URL of the target database.
+    """
+    return (
+        f"postgresql+psycopg2://{DB_CONFIG['username']}:{DB_CONFIG['password']}"
+        f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
+    )
+
+
+@lru_cache(maxsize=None)
+def get_engine(url=None):
+    """
+    Returns the process-wide engine for a database URL, creating it on first use.
+
+    Args:
+        url (str, optional): The SQLAlchemy URL. Defaults to `database_url()`.
+
+    Returns:
+        sqlalchemy.engine.Engine: A cached engine with the `POOL_SETTINGS` connection pool.
+    """
+    return create_engine(url or database_url(), **POOL_SETTINGS)
+
+
+def product_table(table_name, metadata=None):
+    """
+    Declares the schema of a cleaned fashion products table.
+
+    There is one column per field in `utils.fields.SCHEMA`, typed by its dtype,
+    followed by the scrape `Timestamp`.
+
+    Args:
+        table_name (str): The name of the table.
+        metadata (sqlalchemy.MetaData, optional): The metadata to attach the table to.
+
+    Returns:
+        sqlalchemy.Table: The table with its primary key on `NATURAL_KEY` and
+                          indexes on `INDEXED_COLUMNS`.
+    """
+    return Table(
+        table_name,
+        metadata if metadata is not None else MetaData(),
+        *(Column(column, SQL_TYPES[dtype](), nullable=column not in NATURAL_KEY)
+          for column, dtype in SCHEMA.dtypes.items()),
+        Column("Timestamp", DateTime),
+        PrimaryKeyConstraint(*NATURAL_KEY, name=f"{table_name}_pkey"),
+        *(Index(f"ix_{table_name}_{column.lower()}", column) for column in INDEXED_COLUMNS),
+    )
+
+
+def ensure_schema(bind, table_name):
+    """
+    Creates the products table, its primary key and its indexes if they are missing.
+
+    Every step is idempotent, and each table is only checked once per process.
+    Tables created by the old `to_sql(if_exists='replace')` loader get their
+    primary key added in place, and columns of fields added to the spec since
+    the table was created are added as nullable columns.
+
+    The DDL runs in its own transaction on a separate connection and is
+    committed before the table is remembered as ensured. PostgreSQL rolls DDL
+    back with the transaction it ran in, so creating the table inside a load
+    that later fails would drop it again while the cache still said it exists.
+
+    Args:
+        bind (sqlalchemy.engine.Engine or sqlalchemy.engine.Connection): The database; only its engine is used.
+        table_name (str): The name of the table.
+
+    Returns:
+        sqlalchemy.Table: The declared table.
+    """
+    table = product_table(table_name)
+    engine = bind.engine
+    cache_key = (str(engine.url), table_name)
+    with _ensured_lock:
+        if cache_key in _ensured_tables:
+            return table
+
+        with engine.begin() as connection:
+            table.create(connection, checkfirst=True)
+            existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.exec_driver_sql(f"ALTER TABLE {_quote(table_name)} ADD COLUMN {_quote(column.name)} "
+                                               f"{column.type.compile(connection.dialect)}")
+            if not inspect(connection).get_pk_constraint(table_name).get("constrained_columns"):
+                key = ", ".join(_quote(column) for column in NATURAL_KEY)
+                connection.exec_driver_sql(f"ALTER TABLE {_quote(table_name)} ADD PRIMARY KEY ({key})")
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+        _ensured_tables.add(cache_key)
+    return table
+
+
+def drop_table(table_name, engine=None):
+    """
+    Drops a products table if it exists, so the next load creates it afresh.
+
+    Args:
+        table_name (str): The name of the table.
+        engine (sqlalchemy.engine.Engine, optional): The engine to use. Defaults to `get_engine()`.
+
+    Returns:
+        None
+    """
+    engine = engine or get_engine()
+    with _ensured_lock:
+        with engine.begin() as connection:
+            product_table(table_name).drop(connection, checkfirst=True)
+        _ensured_tables.discard((str(engine.url), table_name))
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class CsvStream:
+    """
+    A read-only file-like object that renders a DataFrame as CSV on demand.
+
+    `COPY ... FROM STDIN` pulls data through `read`, so only one chunk of rows
+    is serialized at a time instead of the whole frame.
+    """
+
+    def __init__(self, df, chunk_rows=COPY_CHUNK_ROWS):
+        self._chunks = (
+            df.iloc[start:start + chunk_rows].to_csv(index=False, header=False, na_rep=COPY_NULL).encode("utf-8")
+            for start in range(0, len(df), chunk_rows)
+        )
+        self._buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_upsert(connection, df, table_name):
+    """
+    Bulk-loads a DataFrame into a table inside the caller's transaction.
+
+    The frame is streamed with `COPY FROM STDIN` into a temporary staging table
+    and merged into the target with `INSERT ... ON CONFLICT` on `NATURAL_KEY`,
+    so existing products are updated and new ones inserted. The target schema
+    is ensured first.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): A connection with an open transaction.
+        df (pd.DataFrame): The DataFrame to load; it must contain the `NATURAL_KEY` columns.
+        table_name (str): The name of the target table.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    missing = [column for column in NATURAL_KEY if column not in df.columns]
+    if missing:
+        raise ValueError(f"DataFrame is missing natural key column(s): {missing}")
+
+    ensure_schema(connection, table_name)
+
+    table = _quote(table_name)
+    staging = _quote(f"{table_name}_staging")
+    columns = ", ".join(_quote(column) for column in df.columns)
+    key = ", ".join(_quote(column) for column in NATURAL_KEY)
+    updates = ", ".join(
+        f"{_quote(column)} = EXCLUDED.{_quote(column)}" for column in df.columns if column not in NATURAL_KEY
+    )
+
+    connection.exec_driver_sql(f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", CsvStream(df)
+        )
+    finally:
+        cursor.close()
+
+    connection.exec_driver_sql(
+        f"INSERT INTO {table} ({columns}) SELECT DISTINCT ON ({key}) {columns} FROM {staging} "
+        f"ON CONFLICT ({key}) " + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+    )
+    return len(df)
+
+
+def copy_delete(connection, keys, table_name):
+    """
+    Deletes the rows matching a set of natural keys inside the caller's transaction.
+
+    The keys are streamed with `COPY FROM STDIN` into a temporary table and
+    removed from the target with a single `DELETE ... USING`.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): A connection with an open transaction.
+        keys (pd.DataFrame): The rows to delete; only its `NATURAL_KEY` columns are used.
+        table_name (str): The name of the target table.
+
+    Returns:
+        int: The number of keys copied.
+    """
+    missing = [column for column in NATURAL_KEY if column not in keys.columns]
+    if missing:
+        raise ValueError(f"DataFrame is missing natural key column(s): {missing}")
+    if keys.empty:
+        return 0
+
+    ensure_schema(connection, table_name)
+
+    table = _quote(table_name)
+    staging = _quote(f"{table_name}_deleted")
+    columns = ", ".join(_quote(column) for column in NATURAL_KEY)
+    matches = " AND ".join(f"t.{_quote(column)} = s.{_quote(column)}" for column in NATURAL_KEY)
+
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA"
+    )
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            CsvStream(keys[list(NATURAL_KEY)]),
+        )
+    finally:
+        cursor.close()
+
+    connection.exec_driver_sql(f"DELETE FROM {table} t USING {staging} s WHERE {matches}")
+    return len(keys)
+
+
+def apply_changes(changed, deleted, table_name, engine=None):
+    """
+    Upserts changed rows and deletes removed ones in a single transaction.
+
+    Args:
+        changed (pd.DataFrame): The new and changed rows.
+        deleted (pd.DataFrame): The rows that disappeared; only the `NATURAL_KEY` columns are used.
+        table_name (str): The name of the target table.
+        engine (sqlalchemy.engine.Engine, optional): The engine to use. Defaults to `get_engine()`.
+
+    Returns:
+        float: The load duration in seconds.
+    """
+    start = time.perf_counter()
+    with (engine or get_engine()).begin() as connection:
+        upserted = copy_upsert(connection, changed, table_name) if not changed.empty else 0
+        removed = copy_delete(connection, deleted, table_name)
+    elapsed = time.perf_counter() - start
+
+    print(f"[INFO] Applied {upserted} upserts and {removed} deletes to PostgreSQL table '{table_name}' "
+          f"in {elapsed:.2f}s.")
+    return elapsed
+
+
+def timed_upsert(df, table_name, engine=None):
+    """
+    Upserts a DataFrame in its own transaction and reports how long it took.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to load.
+        table_name (str): The name of the target table.
+        engine (sqlalchemy.engine.Engine, optional): The engine to use. Defaults to `get_engine()`.
+
+    Returns:
+        float: The load duration in seconds.
+    """
+    start = time.perf_counter()
+    with (engine or get_engine()).begin() as connection:
+        rows = copy_upsert(connection, df, table_name)
+    elapsed = time.perf_counter() - start
+
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"[INFO] Loaded {rows} rows into PostgreSQL table '{table_name}' in {elapsed:.2f}s ({rate:,.0f} rows/s).")
+    return elapsed
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+from utils.transform import DEDUP_KEY
+
+INDEX_FILE = os.path.join(".cache", "products.sqlite")
+KEY_COLUMNS = DEDUP_KEY
+# Columns that change on every scrape and so are not part of a product's content
+VOLATILE_COLUMNS = ("Timestamp",)
+
+ChangeSet = namedtuple("ChangeSet", ["inserted", "updated", "deleted", "unchanged"])
+ChangeSet.__doc__ = """
+The difference between a scrape and the index.
+
+`inserted` and `updated` are the rows of the scraped frame, with its dtypes;
+`deleted` holds the last indexed version of each product that disappeared;
+`unchanged` is the number of rows that matched the index exactly.
+"""
+
+
+def changed_rows(changes):
+    """
+    Returns:
+        pd.DataFrame: The inserted and updated rows of a `ChangeSet`, i.e. what an upsert must load.
+    """
+    return pd.concat([changes.inserted, changes.updated]).sort_index()
+
+
+def _stable_text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # 1634400 and 1634400.0 are the same price whichever dtype the frame happened to use
+        return str(int(value))
+    return str(value)
+
+
+def product_hash(values):
+    """
+    Hashes a sequence of field values in a way that is stable across runs, processes and library versions.
+
+    Args:
+        values (iterable): The field values, in a fixed column order.
+
+    Returns:
+        str: The hex SHA-1 digest.
+    """
+    text = "\x1f".join(_stable_text(value) for value in values)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _json_default(value):
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+class ProductIndex:
+    """
+    A persistent index of every product seen, used to load only what changed between runs.
+
+    Products are keyed by a stable hash of `key_columns` and carry a hash of
+    their remaining, non-volatile fields. Comparing a scrape with the index
+    classifies each row as new, changed or unchanged, and finds the indexed
+    products that disappeared. With `history` enabled, every version of a
+    product is also kept in a `product_history` table with `valid_from` and `valid_to`.
+
+    The index is a single SQLite file; each `apply` runs in one transaction.
+    """
+
+    def __init__(self, path=INDEX_FILE, key_columns=KEY_COLUMNS, history=False):
+        self.path = path
+        self.key_columns = tuple(key_columns)
+        self.history = history
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "key_hash TEXT PRIMARY KEY, content_hash TEXT NOT NULL, row TEXT NOT NULL, "
+                "first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)"
+            )
+            if self.history:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS product_history ("
+                    "key_hash TEXT NOT NULL, content_hash TEXT NOT NULL, row TEXT NOT NULL, "
+                    "valid_from TEXT NOT NULL, valid_to TEXT, PRIMARY KEY (key_hash, valid_from))"
+                )
+                self.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_product_history_current ON product_history (key_hash) "
+                    "WHERE valid_to IS NULL"
+                )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def _hashes(self, df):
+        missing = [column for column in self.key_columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing key column(s): {missing}")
+
+        content_columns = [column for column in df.columns
+                           if column not in self.key_columns and column not in VOLATILE_COLUMNS]
+        keys = [product_hash(values) for values in df[list(self.key_columns)].itertuples(index=False)]
+        contents = [product_hash(values) for values in df[content_columns].itertuples(index=False)]
+        return keys, contents
+
+    def _stage(self, df):
+        # Loads the scrape into a temporary `incoming` table keyed like `products`
+        keys, contents = self._hashes(df)
+        rows = [json.dumps(row, default=_json_default) for row in df.to_dict("records")]
+        self.connection.execute("DROP TABLE IF EXISTS temp.incoming")
+        self.connection.execute(
+            "CREATE TEMP TABLE incoming (key_hash TEXT PRIMARY KEY, content_hash TEXT, row TEXT, position INTEGER)"
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO incoming VALUES (?, ?, ?, ?)",
+            zip(keys, contents, rows, range(len(df))),
+        )
+
+    def _classify(self, df):
+        classified = self.connection.execute(
+            "SELECT i.position, CASE WHEN p.key_hash IS NULL THEN 'inserted' "
+            "WHEN p.content_hash != i.content_hash THEN 'updated' ELSE 'unchanged' END "
+            "FROM incoming i LEFT JOIN products p ON p.key_hash = i.key_hash"
+        ).fetchall()
+        deleted = self.connection.execute(
+            "SELECT p.key_hash, p.row FROM products p "
+            "WHERE NOT EXISTS (SELECT 1 FROM incoming i WHERE i.key_hash = p.key_hash)"
+        ).fetchall()
+
+        positions = {"inserted": [], "updated": [], "unchanged": []}
+        for position, status in classified:
+            positions[status].append(position)
+
+        deleted_rows = pd.DataFrame([json.loads(row) for _, row in deleted], columns=list(df.columns))
+        if "Timestamp" in deleted_rows.columns:
+            deleted_rows["Timestamp"] = pd.to_datetime(deleted_rows["Timestamp"], errors="coerce")
+
+        changes = ChangeSet(
+            inserted=df.iloc[sorted(positions["inserted"])],
+            updated=df.iloc[sorted(positions["updated"])],
+            deleted=deleted_rows,
+            unchanged=len(positions["unchanged"]),
+        )
+        print(f"[INFO] Product index: {len(changes.inserted)} new, {len(changes.updated)} changed, "
+              f"{len(changes.deleted)} deleted, {changes.unchanged} unchanged.")
+        return changes
+
+    def _update(self, as_of):
+        if self.history:
+            self.connection.execute(
+                "UPDATE product_history SET valid_to = ? WHERE valid_to IS NULL AND key_hash IN ("
+                "SELECT p.key_hash FROM products p LEFT JOIN incoming i ON i.key_hash = p.key_hash "
+                "WHERE i.key_hash IS NULL OR i.content_hash != p.content_hash)",
+                (as_of,),
+            )
+            self.connection.execute(
+                "INSERT INTO product_history (key_hash, content_hash, row, valid_from) "
+                "SELECT i.key_hash, i.content_hash, i.row, ? FROM incoming i "
+                "LEFT JOIN products p ON p.key_hash = i.key_hash "
+                "WHERE p.key_hash IS NULL OR p.content_hash != i.content_hash",
+                (as_of,),
+            )
+
+        self.connection.execute(
+            "DELETE FROM products WHERE key_hash NOT IN (SELECT key_hash FROM incoming)"
+        )
+        self.connection.execute(
+            "INSERT INTO products (key_hash, content_hash, row, first_seen, last_seen) "
+            "SELECT key_hash, content_hash, row, ?, ? FROM incoming WHERE true "
+            "ON CONFLICT (key_hash) DO UPDATE SET content_hash = excluded.content_hash, row = excluded.row, "
+            "last_seen = excluded.last_seen",
+            (as_of, as_of),
+        )
+
+    def diff(self, df):
+        """
+        Classifies the rows of a scrape against the index without changing it.
+
+        Pair it with `commit` once the changes were loaded, so a failed load is
+        classified as changed again by the next run.
+
+        Args:
+            df (pd.DataFrame): The cleaned scrape; it must contain the key columns.
+
+        Returns:
+            ChangeSet: The inserted, updated and deleted products.
+        """
+        with self.connection:
+            self._stage(df)
+            changes = self._classify(df)
+            self.connection.execute("DROP TABLE temp.incoming")
+        return changes
+
+    def commit(self, df, as_of=None):
+        """
+        Updates the index to match a scrape, e.g. one whose `diff` was loaded.
+
+        Args:
+            df (pd.DataFrame): The cleaned scrape; it must contain the key columns.
+            as_of (datetime, optional): When the scrape was taken. Defaults to now.
+
+        Returns:
+            None
+        """
+        as_of = (as_of or datetime.now()).isoformat()
+        with self.connection:
+            self._stage(df)
+            self._update(as_of)
+            self.connection.execute("DROP TABLE temp.incoming")
+
+    def apply(self, df, as_of=None):
+        """
+        Classifies the rows of a scrape against the index, then updates the index to match it.
+
+        Rows whose key appears more than once keep their last occurrence, as with an upsert.
+
+        Args:
+            df (pd.DataFrame): The cleaned scrape; it must contain the key columns.
+            as_of (datetime, optional): When the scrape was taken. Defaults to now.
+
+        Returns:
+            ChangeSet: The inserted, updated and deleted products.
+        """
+        as_of = (as_of or datetime.now()).isoformat()
+        with self.connection:
+            self._stage(df)
+            changes = self._classify(df)
+            self._update(as_of)
+            self.connection.execute("DROP TABLE temp.incoming")
+        return changes
+
+    def last_seen(self):
+        """
+        Returns:
+            datetime or None: When the most recent scrape was committed, or None for an empty index.
+        """
+        value = self.connection.execute("SELECT MAX(last_seen) FROM products").fetchone()[0]
+        return None if value is None else datetime.fromisoformat(value)
+
+    def history_of(self, key_values):
+        """
+        Returns every indexed version of one product.
+
+        Args:
+            key_values (tuple): The product's values for the key columns.
+
+        Returns:
+            list: `(row, valid_from, valid_to)` tuples, oldest first; `valid_to` is None for the current version.
+        """
+        if not self.history:
+            raise ValueError("The index was opened without history")
+        versions = self.connection.execute(
+            "SELECT row, valid_from, valid_to FROM product_history WHERE key_hash = ? ORDER BY valid_from",
+            (product_hash(key_values),),
+        ).fetchall()
+        return [(json.loads(row), valid_from, valid_to) for row, valid_from, valid_to in versions]
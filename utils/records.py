@@ -0,0 +1,252 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.transform import clean_item
+
+# The typed records have one attribute per column, so a field added to utils.fields.FIELDS has to be added here too
+CLEAN_COLUMNS = ("Title", "Price (IDR)", "Rating", "Colors", "Size", "Gender", "Timestamp")
+NAT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class RawProduct(NamedTuple):
+    """A product as scraped from a collection card, before cleaning."""
+    title: Optional[str]
+    price: Optional[str]
+    rating: Optional[str]
+    colors: Optional[str]
+    size: Optional[str]
+    gender: Optional[str]
+    timestamp: Optional[str]
+
+    @classmethod
+    def from_dict(cls, item):
+        """
+        Builds a record from a raw product dictionary.
+
+        Args:
+            item (dict): A raw product, as returned by `utils.extract.extract_fashion_data`.
+
+        Returns:
+            RawProduct: The same product as a tuple.
+        """
+        return cls(item.get("Title"), item.get("Price"), item.get("Rating"), item.get("Colors"),
+                   item.get("Size"), item.get("Gender"), item.get("Timestamp"))
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The product in the dictionary shape `utils.transform.clean_item` expects.
+        """
+        return dict(zip(("Title", "Price", "Rating", "Colors", "Size", "Gender", "Timestamp"), self))
+
+
+class CleanProduct(NamedTuple):
+    """A cleaned product, with the same fields as a row of the output DataFrame."""
+    title: str
+    price_idr: float
+    rating: float
+    colors: int
+    size: str
+    gender: str
+    timestamp: Optional[str]
+
+    @classmethod
+    def from_dict(cls, item):
+        """
+        Builds a record from a cleaned product dictionary.
+
+        Args:
+            item (dict): A cleaned product, as returned by `utils.transform.clean_item`.
+
+        Returns:
+            CleanProduct: The same product as a tuple.
+        """
+        return cls(*(item.get(column) for column in CLEAN_COLUMNS))
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The product keyed by its DataFrame column names.
+        """
+        return dict(zip(CLEAN_COLUMNS, self))
+
+
+def clean_record(raw):
+    """
+    Cleans a raw product record.
+
+    Args:
+        raw (RawProduct): The product to clean.
+
+    Returns:
+        CleanProduct or None: The cleaned product, or None if it is invalid.
+    """
+    item = clean_item(raw.to_dict())
+    return None if item is None else CleanProduct.from_dict(item)
+
+
+def _timestamp_ns(value):
+    if value is None:
+        return NAT
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return (value - _EPOCH) // _MICROSECOND * 1000
+
+
+class ProductBatch:
+    """
+    A columnar batch of cleaned products.
+
+    Numeric columns and timestamps are kept in typed `array.array` buffers and
+    Size and Gender as small-integer codes into a shared category list, so a
+    row costs a few dozen bytes instead of a dictionary with seven keys. The
+    batch converts to a DataFrame whose numeric, timestamp and code columns are
+    views of those buffers rather than copies.
+
+    While a DataFrame built by `to_frame` is alive the buffers are exported, so
+    the batch cannot grow until the frame is released; its columns are read-only.
+    """
+    __slots__ = ("titles", "prices", "ratings", "colors", "timestamps", "size_codes", "gender_codes",
+                 "sizes", "genders")
+
+    def __init__(self):
+        self.titles = []
+        self.prices = array("d")
+        self.ratings = array("d")
+        self.colors = array("q")
+        self.timestamps = array("q")
+        self.size_codes = array("h")
+        self.gender_codes = array("h")
+        self.sizes = {}
+        self.genders = {}
+
+    @classmethod
+    def from_records(cls, products):
+        """
+        Builds a batch from cleaned products.
+
+        Args:
+            products (iterable): `CleanProduct` records or cleaned product dictionaries.
+
+        Returns:
+            ProductBatch: The products, in order.
+        """
+        batch = cls()
+        batch.extend(products)
+        return batch
+
+    def __len__(self):
+        return len(self.titles)
+
+    @staticmethod
+    def _code(categories, value):
+        if value is None:
+            return -1
+        return categories.setdefault(value, len(categories))
+
+    def append(self, product):
+        """
+        Appends one cleaned product.
+
+        Args:
+            product (CleanProduct or dict): The product to append.
+        """
+        if isinstance(product, dict):
+            product = CleanProduct.from_dict(product)
+
+        # Converted up front so a bad value cannot leave the columns with different lengths
+        price = np.nan if product.price_idr is None else float(product.price_idr)
+        rating = np.nan if product.rating is None else float(product.rating)
+        colors = int(product.colors)
+        timestamp = _timestamp_ns(product.timestamp)
+
+        self.prices.append(price)
+        self.ratings.append(rating)
+        self.colors.append(colors)
+        self.timestamps.append(timestamp)
+        self.size_codes.append(self._code(self.sizes, product.size))
+        self.gender_codes.append(self._code(self.genders, product.gender))
+        self.titles.append(product.title)
+
+    def extend(self, products):
+        """
+        Appends several cleaned products.
+
+        Args:
+            products (iterable): `CleanProduct` records or cleaned product dictionaries.
+        """
+        for product in products:
+            self.append(product)
+
+    def records(self):
+        """
+        Yields:
+            CleanProduct: Every product in the batch, with ISO-formatted timestamps.
+        """
+        sizes, genders = list(self.sizes), list(self.genders)
+        timestamps = np.frombuffer(self.timestamps, dtype=np.int64).view("datetime64[ns]")
+        for row, title in enumerate(self.titles):
+            size, gender = self.size_codes[row], self.gender_codes[row]
+            timestamp = None if self.timestamps[row] == NAT else pd.Timestamp(timestamps[row]).isoformat()
+            yield CleanProduct(title, self.prices[row], self.ratings[row], self.colors[row],
+                               sizes[size] if size >= 0 else None, genders[gender] if gender >= 0 else None,
+                               timestamp)
+
+    def to_frame(self, categorical=True):
+        """
+        Converts the batch to a DataFrame without copying its numeric columns.
+
+        Args:
+            categorical (bool): Whether Size and Gender are returned as categoricals
+                sharing the batch's codes. If False they are materialised as object
+                columns, matching the output of `utils.transform.convert_dtypes`.
+
+        Returns:
+            pd.DataFrame: One row per product with the `CLEAN_COLUMNS` columns.
+        """
+        def category(codes, categories):
+            values = pd.Categorical.from_codes(np.frombuffer(codes, dtype=np.int16), categories=list(categories))
+            return values if categorical else np.asarray(values, dtype=object)
+
+        columns = {
+            "Title": np.array(self.titles, dtype=object),
+            "Price (IDR)": np.frombuffer(self.prices, dtype=np.float64),
+            "Rating": np.frombuffer(self.ratings, dtype=np.float64),
+            "Colors": np.frombuffer(self.colors, dtype=np.int64),
+            "Size": category(self.size_codes, self.sizes),
+            "Gender": category(self.gender_codes, self.genders),
+            "Timestamp": np.frombuffer(self.timestamps, dtype=np.int64).view("datetime64[ns]"),
+        }
+        return pd.DataFrame(columns, copy=False)
+
+
+def iter_batches(items, batch_rows=10_000):
+    """
+    Groups a stream of cleaned products into columnar batches.
+
+    This is the compact counterpart of `utils.transform.iter_frames`.
+
+    Args:
+        items (iterable): `CleanProduct` records or cleaned product dictionaries.
+        batch_rows (int): The maximum number of rows per batch.
+
+    Yields:
+        ProductBatch: A batch of at most `batch_rows` products.
+    """
+    batch = ProductBatch()
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_rows:
+            yield batch
+            batch = ProductBatch()
+
+    if len(batch):
+        yield batch
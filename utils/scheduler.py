@@ -0,0 +1,158 @@
+import os
+import signal
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = os.path.join(".cache", "pipeline.lock")
+
+
+class RunLock:
+    """
+    An exclusive, non-blocking lock on a file, held for the duration of a pipeline run.
+
+    The lock is taken with `flock` (or `msvcrt.locking` on Windows). The
+    operating system releases it when the process exits, so a crashed run
+    never leaves a stale lock behind. The lock file holds the PID of its holder.
+    """
+
+    def __init__(self, path=LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """
+        Takes the lock if no other process holds it.
+
+        Returns:
+            bool: True if the lock was acquired, False if another run holds it.
+        """
+        if self._file is not None:
+            return False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        """
+        Releases the lock if it is held.
+
+        Returns:
+            None
+        """
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def holder(self):
+        """
+        Returns:
+            str or None: The PID written by the current holder, if any.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def stop_on_signals(stop_event, signals=(signal.SIGINT, signal.SIGTERM)):
+    """
+    Sets `stop_event` when the process receives one of `signals`, so a daemon can finish its current run and exit.
+
+    Args:
+        stop_event (threading.Event): The event to set.
+        signals (tuple): The signals to handle.
+
+    Returns:
+        None
+    """
+    def handle(signum, frame):
+        print(f"[INFO] Received signal {signum}; stopping after the current run.")
+        stop_event.set()
+
+    for signum in signals:
+        signal.signal(signum, handle)
+
+
+def run_forever(job, interval, lock=None, stop_event=None, max_runs=None):
+    """
+    Runs a job on a fixed interval until stopped.
+
+    Runs start `interval` seconds apart. A run that overruns its slot is
+    followed immediately by the next one, and the missed slots are skipped
+    rather than run back to back. When `lock` is given, a slot whose lock is
+    held by another process is skipped, so runs never overlap. Exceptions
+    raised by the job are reported and do not stop the loop.
+
+    Args:
+        job (callable): The job to run; its return value is treated as an exit code.
+        interval (float): Seconds between the starts of consecutive runs.
+        lock (RunLock, optional): The lock held while the job runs.
+        stop_event (threading.Event, optional): Stops the loop when set.
+        max_runs (int, optional): Stops after this many slots. Defaults to running forever.
+
+    Returns:
+        int: The number of runs that completed with exit code 0.
+    """
+    stop_event = stop_event or threading.Event()
+    slots = succeeded = 0
+    next_start = time.monotonic()
+
+    while not stop_event.is_set() and (max_runs is None or slots < max_runs):
+        slots += 1
+        if lock is not None and not lock.acquire():
+            print(f"[WARN] Another pipeline run holds {lock.path} (pid {lock.holder()}); skipping this run.")
+        else:
+            try:
+                if job() == 0:
+                    succeeded += 1
+            except Exception as e:
+                print(f"[ERROR] Scheduled run failed: {e}")
+            finally:
+                if lock is not None:
+                    lock.release()
+
+        next_start += interval
+        now = time.monotonic()
+        if next_start < now:
+            # The run overran its slot: start the next one now and realign the schedule
+            next_start = now
+        if max_runs is None or slots < max_runs:
+            print(f"[INFO] Next run in {max(next_start - now, 0):.0f}s.")
+            stop_event.wait(max(next_start - now, 0))
+
+    return succeeded
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from functools import lru_cache
+
+from google.oauth2.service_account import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from utils.atomic import atomic_write
+
+SERVICE_ACCOUNT_FILE = './client_secret.json'
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+SNAPSHOT_DIR = ".cache/sheets"
+MAX_CELLS_PER_REQUEST = 50_000
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@lru_cache(maxsize=None)
+def get_service(api_endpoint=None):
+    """
+    Returns the process-wide Sheets API client, building it on first use.
+
+    Args:
+        api_endpoint (str, optional): Overrides the API root URL, e.g. to target a local fake
+                                      endpoint. Defaults to the `SHEETS_API_ENDPOINT` environment
+                                      variable, or Google's endpoint when unset.
+
+    Returns:
+        googleapiclient.discovery.Resource: The `sheets` v4 service.
+    """
+    api_endpoint = api_endpoint or os.getenv("SHEETS_API_ENDPOINT")
+    credential = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE).with_scopes(SCOPES)
+    client_options = {"api_endpoint": api_endpoint} if api_endpoint else None
+    return build('sheets', 'v4', credentials=credential, client_options=client_options, cache_discovery=False)
+
+
+def frame_to_values(df):
+    """
+    Converts a DataFrame to the list of rows sent to Sheets, header first.
+
+    The caller's DataFrame is left untouched: timestamps are rendered as strings
+    and missing values as empty cells on the way out.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to convert.
+
+    Returns:
+        list: A list of rows, each a list of JSON-serializable cell values.
+    """
+    if "Timestamp" in df.columns:
+        df = df.assign(Timestamp=df["Timestamp"].astype(str))
+    rows = df.astype(object).where(df.notna(), "").values.tolist()
+    return [df.columns.tolist()] + rows
+
+
+def column_letter(index):
+    """
+    Converts a 0-based column index to its A1 letters.
+
+    Args:
+        index (int): The column index (0 is "A").
+
+    Returns:
+        str: The column letters, e.g. "A", "Z", "AA".
+    """
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def parse_anchor(range_name):
+    """
+    Splits an A1 range into its sheet name and top-left cell.
+
+    Args:
+        range_name (str): A range such as "Sheet1!A1" or "Sheet1!B3:F10".
+
+    Returns:
+        tuple: `(sheet, row, column)` with a 0-based row and column.
+    """
+    sheet, _, cells = range_name.rpartition("!")
+    match = re.match(r"([A-Za-z]+)(\d+)", cells)
+    if not match:
+        raise ValueError(f"Range {range_name!r} does not start with an A1 cell reference.")
+    return sheet, int(match.group(2)) - 1, _column_index(match.group(1))
+
+
+def diff_rows(old, new):
+    """
+    Finds the blocks of consecutive rows that differ between two snapshots.
+
+    Rows that disappeared are blanked, and shorter rows are padded with empty
+    cells so that stale trailing values are cleared too.
+
+    Args:
+        old (list): The previously uploaded rows.
+        new (list): The rows to upload now.
+
+    Returns:
+        list: `(first_row_index, rows)` tuples, one per block of changed rows.
+    """
+    blocks = []
+    for index in range(max(len(old), len(new))):
+        old_row = old[index] if index < len(old) else []
+        new_row = new[index] if index < len(new) else []
+        if old_row == new_row:
+            continue
+
+        row = list(new_row) + [""] * (len(old_row) - len(new_row))
+        if blocks and blocks[-1][0] + len(blocks[-1][1]) == index:
+            blocks[-1][1].append(row)
+        else:
+            blocks.append((index, [row]))
+    return blocks
+
+
+def plan_batches(blocks, range_name, max_cells=MAX_CELLS_PER_REQUEST):
+    """
+    Turns changed row blocks into `batchUpdate` payloads of bounded size.
+
+    Args:
+        blocks (list): `(first_row_index, rows)` tuples from `diff_rows`.
+        range_name (str): The A1 anchor of the table, e.g. "Sheet1!A1".
+        max_cells (int): The maximum number of cells per request.
+
+    Returns:
+        list: Lists of `{"range", "values"}` entries, one list per request.
+    """
+    sheet, top, left = parse_anchor(range_name)
+    prefix = f"{sheet}!" if sheet else ""
+
+    batches, batch, cells = [], [], 0
+    for first, rows in blocks:
+        for offset, row in enumerate(rows):
+            width = max(len(row), 1)
+            if batch and cells + width > max_cells:
+                batches.append(batch)
+                batch, cells = [], 0
+
+            row_number = top + first + offset + 1
+            previous = batch[-1] if batch else None
+            if previous and previous["_next_row"] == row_number and previous["_width"] == width:
+                previous["values"].append(row)
+                previous["_next_row"] += 1
+            else:
+                batch.append({"_start": row_number, "_next_row": row_number + 1, "_width": width, "values": [row]})
+            cells += width
+
+    if batch:
+        batches.append(batch)
+
+    return [
+        [
+            {
+                "range": f"{prefix}{column_letter(left)}{entry['_start']}:"
+                         f"{column_letter(left + entry['_width'] - 1)}{entry['_next_row'] - 1}",
+                "values": entry["values"],
+            }
+            for entry in batch
+        ]
+        for batch in batches
+    ]
+
+
+def execute_with_backoff(request, retries=5, base_delay=1.0):
+    """
+    Executes an API request, retrying quota and server errors with exponential backoff.
+
+    Args:
+        request (googleapiclient.http.HttpRequest): The request to execute.
+        retries (int): The maximum number of retries.
+        base_delay (float): The delay before the first retry, doubled on every attempt.
+
+    Returns:
+        dict: The API response.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRY_STATUSES or attempt == retries:
+                raise
+            delay = base_delay * 2 ** attempt
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def _snapshot_path(snapshot_dir, spreadsheet_id, range_name):
+    digest = hashlib.sha256(f"{spreadsheet_id}|{range_name}".encode("utf-8")).hexdigest()
+    return os.path.join(snapshot_dir, f"{digest}.json")
+
+
+def load_snapshot(spreadsheet_id, range_name, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Reads the rows last uploaded to a range.
+
+    Args:
+        spreadsheet_id (str): The ID of the Google Sheets document.
+        range_name (str): The A1 anchor of the table.
+        snapshot_dir (str): The directory holding the snapshots.
+
+    Returns:
+        list: The previously uploaded rows, or an empty list if there is no snapshot.
+    """
+    try:
+        with open(_snapshot_path(snapshot_dir, spreadsheet_id, range_name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_snapshot(values, spreadsheet_id, range_name, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Records the rows just uploaded to a range.
+
+    Args:
+        values (list): The uploaded rows.
+        spreadsheet_id (str): The ID of the Google Sheets document.
+        range_name (str): The A1 anchor of the table.
+        snapshot_dir (str): The directory holding the snapshots.
+
+    Returns:
+        None
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    atomic_write(_snapshot_path(snapshot_dir, spreadsheet_id, range_name), json.dumps(values))
+
+
+def write_frame(df, spreadsheet_id, range_name, service=None, snapshot_dir=SNAPSHOT_DIR,
+                max_cells=MAX_CELLS_PER_REQUEST):
+    """
+    Writes a DataFrame to Google Sheets, sending only the rows that changed.
+
+    The frame is compared row by row with the snapshot of the last successful
+    upload to the same range. Changed rows are grouped into ranges and sent in
+    `values.batchUpdate` requests of at most `max_cells` cells each, with
+    backoff on quota errors. The snapshot is only updated once every request
+    has succeeded.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to upload.
+        spreadsheet_id (str): The ID of the target Google Sheets document.
+        range_name (str): The A1 anchor of the table (e.g., "Sheet1!A1").
+        service (googleapiclient.discovery.Resource, optional): The Sheets client. Defaults to `get_service()`.
+        snapshot_dir (str): The directory holding the upload snapshots.
+        max_cells (int): The maximum number of cells per request.
+
+    Returns:
+        int: The number of cells written.
+    """
+    values = frame_to_values(df)
+    batches = plan_batches(diff_rows(load_snapshot(spreadsheet_id, range_name, snapshot_dir), values),
+                           range_name, max_cells)
+
+    if batches:
+        sheet_values = (service or get_service()).spreadsheets().values()
+        for data in batches:
+            execute_with_backoff(sheet_values.batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': data}
+            ))
+
+    save_snapshot(values, spreadsheet_id, range_name, snapshot_dir)
+    return sum(len(row) for data in batches for entry in data for row in entry["values"])
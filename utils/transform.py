@@ -1,6 +1,23 @@
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+import numpy as np
 import pandas as pd
 
-EXCHANGE_RATE_USD_TO_IDR = 16000
+from utils.fields import EXCHANGE_RATE_USD_TO_IDR, SCHEMA, usd_to_idr
+from utils.metrics import ROWS_DROPPED, ROWS_IN, ROWS_OUT, increment, timer
+
+DEDUP_KEY = ("Title", "Price (IDR)", "Rating")
+REQUIRED_FIELDS = SCHEMA.required
+# Column-wise equivalents of field types, for clean_frame; other types are called once per distinct text
+VECTORIZED_TYPES = {
+    float: lambda texts: pd.to_numeric(texts, errors="coerce").astype("float64"),
+    usd_to_idr: lambda texts: np.round(pd.to_numeric(texts, errors="coerce").astype("float64")
+                                       * EXCHANGE_RATE_USD_TO_IDR),
+}
 
 
 def clean_price(price_str):
@@ -13,7 +30,7 @@ def clean_price(price_str):
     Returns:
         int: The price in Indonesian Rupiah (IDR).
     """
-    return round(float(price_str.replace("$", "").strip()) * EXCHANGE_RATE_USD_TO_IDR)
+    return SCHEMA.parse("Price", price_str)
 
 
 def clean_rating(rating_str):
@@ -26,7 +43,7 @@ def clean_rating(rating_str):
     Returns:
         float: The numerical rating (e.g., 4.5).
     """
-    return float(rating_str.replace("Rating: ⭐", "").replace("/ 5", "").strip())
+    return SCHEMA.parse("Rating", rating_str)
 
 
 def clean_colors(colors_str):
@@ -39,7 +56,7 @@ def clean_colors(colors_str):
     Returns:
         int: The number of colors (e.g., 5).
     """
-    return int(colors_str.replace("Colors", "").strip())
+    return SCHEMA.parse("Colors", colors_str)
 
 
 def clean_field(field_str, prefix):
@@ -60,20 +77,15 @@ def is_valid_item(item):
     """
     Validates a raw data item by checking required fields and filtering out invalid values.
 
+    The required fields and sentinel values are declared in `utils.fields.FIELDS`.
+
     Args:
         item (dict): A dictionary containing raw product data.
 
     Returns:
         bool: True if item is valid, otherwise False.
     """
-    required_fields = ["Title", "Price", "Rating", "Colors", "Size", "Gender"]
-    if any(item.get(field) is None for field in required_fields):
-        return False
-    if item["Title"] == "Unknown Product" or item["Price"] == "Price Unavailable":
-        return False
-    if "Invalid" in item["Rating"]:
-        return False
-    return True
+    return SCHEMA.is_valid(item)
 
 
 def remove_duplicates(data):
@@ -90,7 +102,7 @@ def remove_duplicates(data):
     seen = set()
 
     for item in data:
-        key = (item["Title"], item["Price (IDR)"], item["Rating"])
+        key = tuple(item[field] for field in DEDUP_KEY)
         if key not in seen:
             seen.add(key)
             unique_data.append(item)
@@ -98,6 +110,67 @@ def remove_duplicates(data):
     return unique_data
 
 
+class BoundedSeenSet:
+    """
+    A set of recently seen keys that never holds more than `capacity` entries.
+
+    Once full, the least recently seen key is forgotten, so a duplicate whose
+    previous occurrence lies further back than `capacity` distinct keys is no
+    longer detected. Memory stays constant however long the stream is.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._keys = OrderedDict()
+
+    def add(self, key):
+        """
+        Records a key.
+
+        Args:
+            key (hashable): The key to record.
+
+        Returns:
+            bool: True if the key was not in the set, False if it is a duplicate.
+        """
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return False
+
+        self._keys[key] = None
+        if len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+        return True
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def clean_item(item):
+    """
+    Cleans a single raw product.
+
+    Args:
+        item (dict): A raw product dictionary scraped from the web.
+
+    Returns:
+        dict or None: The cleaned product, or None if the item is invalid or cannot be cleaned.
+    """
+    try:
+        # Validation and parsing of every field declared in utils.fields, in one pass
+        cleaned = SCHEMA.clean(item)
+        if cleaned is None:
+            increment(ROWS_DROPPED, reason="invalid")
+            return None
+
+        cleaned["Timestamp"] = item.get("Timestamp")
+        return cleaned
+    except Exception as e:
+        print(f"Error cleaning item {item.get('Title', 'Unknown')}: {e}")
+        increment(ROWS_DROPPED, reason="error")
+        return None
+
+
 def clean_data(raw_data):
     """
     Cleans and transforms raw fashion product data.
@@ -108,29 +181,108 @@ def clean_data(raw_data):
     Returns:
         list: A cleaned list of dictionaries with normalized data and duplicates removed.
     """
-    cleaned_data = []
-
-    for item in raw_data:
-        try:
-            if not is_valid_item(item):
-                continue
-
-            cleaned_item = {
-                "Title": item["Title"],
-                "Price (IDR)": clean_price(item["Price"]),
-                "Rating": clean_rating(item["Rating"]),
-                "Colors": clean_colors(item["Colors"]),
-                "Size": clean_field(item["Size"], "Size:"),
-                "Gender": clean_field(item["Gender"], "Gender:"),
-                "Timestamp": item.get("Timestamp"),
-            }
-
-            cleaned_data.append(cleaned_item)
-        except Exception as e:
-            print(f"Error cleaning item {item.get('Title', 'Unknown')}: {e}")
-            continue
+    with timer("clean_data", profile=True) as span:
+        cleaned_data = []
+        rows_in = 0
+
+        for item in raw_data:
+            rows_in += 1
+            cleaned_item = clean_item(item)
+            if cleaned_item is not None:
+                cleaned_data.append(cleaned_item)
+
+        unique_data = remove_duplicates(cleaned_data)
+        duplicates = len(cleaned_data) - len(unique_data)
+        increment(ROWS_IN, rows_in, stage="clean_data")
+        increment(ROWS_OUT, len(unique_data), stage="clean_data")
+        increment(ROWS_DROPPED, duplicates, reason="duplicate")
+        span.update(rows_in=rows_in, rows_out=len(unique_data), dropped=rows_in - len(unique_data))
+
+    return unique_data
+
 
-    return remove_duplicates(cleaned_data)
+def _clean_chunk(chunk):
+    # Runs in a worker process; deduplicating locally keeps the first occurrence within
+    # the chunk, which is also the one the global pass keeps, and shrinks what is sent back.
+    return remove_duplicates(cleaned for cleaned in map(clean_item, chunk) if cleaned is not None)
+
+
+def _iter_chunks(items, chunk_size):
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+
+
+def clean_data_parallel(raw_data, workers=None, chunk_size=10_000, start_method=None):
+    """
+    Cleans raw fashion product data across a pool of worker processes.
+
+    The raw records are split into chunks that are cleaned in parallel, then the
+    results are merged in chunk order and deduplicated globally, so the output
+    is identical to `clean_data` (including its first-seen order).
+
+    Args:
+        raw_data (iterable): Raw product dictionaries scraped from the web.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int): The number of raw records sent to a worker at a time.
+        start_method (str, optional): The multiprocessing start method ("fork", "spawn" or
+                                      "forkserver"). Defaults to the platform default.
+
+    Returns:
+        list: A cleaned list of dictionaries with normalized data and duplicates removed.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return clean_data(raw_data)
+
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        cleaned_chunks = executor.map(_clean_chunk, _iter_chunks(raw_data, chunk_size))
+        return remove_duplicates(chain.from_iterable(cleaned_chunks))
+
+
+def iter_clean_data(raw_items, max_seen=1_000_000):
+    """
+    Cleans a stream of raw products, yielding each unique cleaned product as it arrives.
+
+    Deduplication uses a `BoundedSeenSet`, so memory stays flat on arbitrarily
+    long streams; within `max_seen` distinct keys the result matches `clean_data`.
+
+    Args:
+        raw_items (iterable): Raw product dictionaries, e.g. from `iter_scrape`.
+        max_seen (int): The number of most recently seen keys remembered for deduplication.
+
+    Yields:
+        dict: A cleaned, unique product.
+    """
+    seen = BoundedSeenSet(max_seen)
+
+    for item in raw_items:
+        cleaned_item = clean_item(item)
+        if cleaned_item is not None and seen.add(tuple(cleaned_item[field] for field in DEDUP_KEY)):
+            yield cleaned_item
+
+
+def iter_frames(items, chunk_size=10_000):
+    """
+    Groups a stream of cleaned products into type-converted DataFrame chunks.
+
+    Args:
+        items (iterable): Cleaned product dictionaries.
+        chunk_size (int): The maximum number of rows per chunk.
+
+    Yields:
+        pandas.DataFrame: A chunk with the same dtypes `convert_dtypes` produces.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield convert_dtypes(pd.DataFrame(chunk))
+            chunk = []
+
+    if chunk:
+        yield convert_dtypes(pd.DataFrame(chunk))
 
 
 def convert_dtypes(df):
@@ -143,8 +295,105 @@ def convert_dtypes(df):
     Returns
         df (pandas.DataFrame): The DataFrame with updated data types for applicable columns.
     """
+    with timer("convert_dtypes", profile=True) as span:
+        _coerce_dtypes(df)
+        span.update(rows=len(df))
+    return df
+
+
+def _coerce_dtypes(df):
     if "Price (IDR)" in df.columns:
         df["Price (IDR)"] = df["Price (IDR)"].astype("float64")
     if "Timestamp" in df.columns:
         df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors='coerce')
     return df
+
+
+def _per_distinct(series, transform):
+    # Scraped columns repeat a small set of values, so the string work is done once per
+    # distinct value and broadcast back to every row with the factorized codes.
+    codes, uniques = pd.factorize(series)
+    values = transform(pd.Series(uniques, dtype=object))
+    # Typing the distinct values is cheap; with gaps they stay objects, as NaN would turn integers into floats
+    values = (values if values.isna().any() else values.infer_objects()).to_numpy()
+    if (codes < 0).any():
+        # Missing values have code -1, which picks this trailing None
+        values = np.append(values.astype(object), None)
+    return pd.Series(values[codes], index=series.index)
+
+
+def _convert_or_none(convert, text):
+    try:
+        return convert(text)
+    except ValueError:
+        return None
+
+
+def _parse_texts(field, texts):
+    # The pattern runs as one pandas string operation; the type only converts the captured texts
+    captured = texts.str.extract(SCHEMA.patterns[field.name], expand=True).iloc[:, 0]
+    if field.type is str:
+        return captured
+    if field.type in VECTORIZED_TYPES:
+        return VECTORIZED_TYPES[field.type](captured)
+    # Converting only the matches keeps the gaps from turning integers into floats
+    matched = captured.notna().to_numpy()
+    values = np.full(len(captured), None, dtype=object)
+    values[matched] = captured[matched].map(lambda text: _convert_or_none(field.type, text)).to_numpy(dtype=object)
+    return pd.Series(values, index=captured.index)
+
+
+def clean_frame(df):
+    """
+    Cleans a DataFrame of raw fashion products with vectorized operations.
+
+    This is the column-wise equivalent of `clean_data` followed by
+    `convert_dtypes`: invalid items are filtered out, every field declared in
+    `utils.fields.FIELDS` is parsed, duplicates are removed (keeping the first
+    occurrence) and dtypes are coerced. Each field's pattern runs once per
+    distinct value rather than once per row.
+
+    Args:
+        df (pandas.DataFrame): Raw products with the columns produced by `extract_fashion_data`.
+
+    Returns:
+        pandas.DataFrame: The cleaned, deduplicated and type-converted products.
+    """
+    raw = df.reindex(columns=[*SCHEMA.names, "Timestamp"])
+
+    # Validation, mirroring is_valid_item
+    valid = raw[list(SCHEMA.required)].notna().all(axis=1)
+    for field in SCHEMA.fields:
+        if not field.invalid:
+            continue
+        if not field.contains:
+            valid &= ~raw[field.name].isin(field.invalid)
+        elif field.name in SCHEMA.verbatim:
+            # Verbatim fields such as titles are mostly distinct, so factorizing them would not pay off
+            valid &= ~raw[field.name].str.contains(SCHEMA.sentinels[field.name], na=False).astype(bool)
+        else:
+            sentinel = SCHEMA.sentinels[field.name]
+            valid &= ~_per_distinct(raw[field.name], lambda s: s.str.contains(sentinel, na=False)).astype(bool)
+    raw = raw[valid]
+
+    # Extraction; anything that does not parse is dropped, as clean_data does on an exception
+    columns = {}
+    parsed = pd.Series(True, index=raw.index)
+    for field in SCHEMA.fields:
+        if field.name in SCHEMA.verbatim:
+            values = raw[field.name].str.strip()
+        else:
+            values = _per_distinct(raw[field.name], lambda s: _parse_texts(field, s))
+        if field.required:
+            parsed &= values.notna()
+        columns[field.column] = values
+
+    cleaned = pd.DataFrame({column: values[parsed] for column, values in columns.items()})
+    # Columns with unparsable values were left as objects; they are typed once those rows are gone
+    for field in SCHEMA.fields:
+        if field.name not in SCHEMA.verbatim and cleaned[field.column].dtype == object:
+            cleaned[field.column] = cleaned[field.column].infer_objects()
+    cleaned["Timestamp"] = raw["Timestamp"][parsed]
+
+    cleaned = cleaned.drop_duplicates(subset=list(DEDUP_KEY), keep="first").reset_index(drop=True)
+    return _coerce_dtypes(cleaned)